@@ -1,35 +1,93 @@
-#  Code is used for collision checking. It defines an Axis-Aligned Bounding Box (AABB) class for 3D point clouds.
+#  Code is used for collision checking. It defines an Axis-Aligned Bounding Box (AABB) class for point clouds.
+#  Boxes work in any number of dimensions (3D for LiDAR clouds, 2D (row, col) for the grid planner) and the
+#  corners are NumPy arrays, so whole clouds / lists of boxes are handled with one vectorized call.
+import numpy as np
+
+
 class AABB:
     def __init__(self, min_point, max_point):
-        self.min = min_point
-        self.max = max_point
+        self.min = np.asarray(min_point, dtype=np.float64)
+        self.max = np.asarray(max_point, dtype=np.float64)
+        if self.min.shape != self.max.shape or self.min.ndim != 1:
+            raise ValueError(f"corners must be 1-D and of equal length, got shapes {self.min.shape} and {self.max.shape}")
+
+    @property
+    def ndim(self) -> int:
+        return self.min.shape[0]
+
+    def __repr__(self):
+        return f"AABB(min={self.min.tolist()}, max={self.max.tolist()})"
 
     @classmethod
-    # Identifies the minimum and maximum corners of the bounding box from a set of 3D points.
+    # Identifies the minimum and maximum corners of the bounding box from an (N, D) set of points.
     def from_points(cls, points):
-        min_p = [float('inf'), float('inf'), float('inf')]
-        max_p = [float('-inf'), float('-inf'), float('-inf')]
-        for p in points:
-            min_p = [min(min_p[i], p[i]) for i in range(3)] # component-wise min
-            max_p = [max(max_p[i], p[i]) for i in range(3)] # component-wise max
-        return cls(min_p, max_p)
-    
+        points = _as_points(points)
+        if points.shape[0] == 0:
+            raise ValueError("cannot build a bounding box from zero points")
+        # component-wise min / max, one reduction per column (much faster than axis=0 on a narrow (N, D) array)
+        return cls([points[:, i].min() for i in range(points.shape[1])],
+                   [points[:, i].max() for i in range(points.shape[1])])
+
     def point_inside(self, point):
-        return all(self.min[i] <= point[i] <= self.max[i] for i in range(3))
+        point = np.asarray(point, dtype=np.float64)
+        return bool(np.all((self.min <= point) & (point <= self.max)))
+
+    # Boolean mask over an (N, D) array of points: True where the point lies in the box (borders included).
+    def points_inside(self, points):
+        points = _as_points(points, self.ndim)
+        mask = np.ones(points.shape[0], dtype=bool)
+        for i in range(self.ndim):  # column by column, in place
+            column = points[:, i]
+            mask &= column >= self.min[i]
+            mask &= column <= self.max[i]
+        return mask
 
     def boxes_intersect(self, other):
-        for i in range(3):
-            if self.max[i] < other.min[i] or self.min[i] > other.max[i]:
-                return False
-        return True
-
-cloud_data = [
-    [1.0,  5.0,  2.0],
-    [-2.0, 3.0,  0.0],
-    [4.0, -1.0,  1.0],
-    [0.0,  0.0,  9.0]
-]
-my_box = AABB.from_points(cloud_data)
-print("Box Min Corner:", my_box.min)
-print("Box Max Corner:", my_box.max)
-print("Is Point [0.0, 0.0, 0.0] inside box:", my_box.point_inside([0.0, 0.0, 0.0]))
\ No newline at end of file
+        return bool(np.all((self.max >= other.min) & (self.min <= other.max)))
+
+    # Boolean mask over many boxes: a sequence of AABBs, or an (M, 2, D) array of [min corner, max corner] rows.
+    def boxes_intersect_many(self, boxes):
+        mins, maxs = as_bounds(boxes, self.ndim)
+        return np.all((self.max >= mins) & (self.min <= maxs), axis=1)
+
+
+def _as_points(points, ndim=None):
+    points = np.asarray(points)
+    if not np.issubdtype(points.dtype, np.floating):
+        points = points.astype(np.float64)  # float32 clouds are used as they are, without a copy
+    if points.ndim != 2 or (ndim is not None and points.shape[1] != ndim):
+        expected = 'D' if ndim is None else ndim
+        raise ValueError(f"expected an (N, {expected}) array of points, got shape {points.shape}")
+    return points
+
+
+# (mins, maxs) of a sequence of AABBs or an (M, 2, D) array of [min corner, max corner] rows, each an (M, D)
+# float64 array. ndim, when given, is the D the boxes must have; an empty list without it gives (0, 0) arrays.
+def as_bounds(boxes, ndim=None):
+    expected = 'D' if ndim is None else ndim
+    if isinstance(boxes, np.ndarray):
+        if boxes.ndim != 3 or boxes.shape[1] != 2 or (ndim is not None and boxes.shape[2] != ndim):
+            raise ValueError(f"expected an (M, 2, {expected}) array of boxes, got shape {boxes.shape}")
+        return boxes[:, 0].astype(np.float64, copy=False), boxes[:, 1].astype(np.float64, copy=False)
+    boxes = list(boxes)
+    if not boxes:
+        return np.empty((0, ndim or 0)), np.empty((0, ndim or 0))
+    mins = np.array([box.min for box in boxes], dtype=np.float64)
+    maxs = np.array([box.max for box in boxes], dtype=np.float64)
+    if mins.ndim != 2 or (ndim is not None and mins.shape[1] != ndim):
+        raise ValueError(f"expected boxes of dimension {expected}, got corners of shape {mins.shape[1:]}")
+    return mins, maxs
+
+if __name__ == "__main__":
+    cloud_data = [
+        [1.0,  5.0,  2.0],
+        [-2.0, 3.0,  0.0],
+        [4.0, -1.0,  1.0],
+        [0.0,  0.0,  9.0]
+    ]
+    my_box = AABB.from_points(cloud_data)
+    print("Box Min Corner:", my_box.min)
+    print("Box Max Corner:", my_box.max)
+    print("Is Point [0.0, 0.0, 0.0] inside box:", my_box.point_inside([0.0, 0.0, 0.0]))
+    print("Points inside box:", my_box.points_inside([[0.0, 0.0, 0.0], [5.0, 0.0, 0.0]]))
+    print("Boxes intersecting:", my_box.boxes_intersect_many([AABB([3, 4, 8], [6, 6, 10]), AABB([5, 5, 5], [6, 6, 6])]))
@@ -1,10 +1,35 @@
 import pygame
 from typing import List, Tuple
 import argparse
+import os
+
+import numpy as np
+
+import astar
+import jps
+from dstar_lite import DStarLite
+from grid_map import GridMap
+from hpa import HPAGraph
+from instrument import SearchProbe, TraceBuffer
+import map_io
+from path_cache import MISS, PathCache
+from rasterize import rasterize_boxes
+from replay import Replay
+import theta_star
+
+FPS = 60
+FRAME_MS = 1000 / FPS
+
+# search events kept from the last A* run for its replay, and where T writes them
+TRACE_CAPACITY = 1 << 20
+TRACE_PATH = 'search.trace'
+
+# colors a search leaves behind (visited, open set, path)
+SEARCH_COLORS = {(255, 165, 0), (0, 255, 255), (255, 0, 255)}
 
 
 class Cell:
-    def __init__(self, row: int, col: int, width: int, height: int):
+    def __init__(self, row: int, col: int, width: int, height: int, gmap: GridMap = None):
         self.row = row
         self.col = col
         self.x = col * width
@@ -17,6 +42,8 @@ class Cell:
         self.h = float('inf')
         self.f = float('inf')
         self.parent = None
+        # the headless map this cell is a view of; obstacle edits are written through
+        self.gmap = gmap
 
     def get_pos(self) -> Tuple[int, int]:
         return self.row, self.col
@@ -26,11 +53,19 @@ class Cell:
 
     def make_clicked(self):
         self.color = (255, 255, 255)  # will use for obstacles. 
+        self._set_blocked(True)
+
     def make_start(self):
         self.color = (0, 255, 0)  # green
+        self._set_blocked(False)
 
     def make_goal(self):
         self.color = (0, 0, 255)  # blue
+        self._set_blocked(False)
+
+    def _set_blocked(self, blocked: bool):
+        if self.gmap is not None:
+            self.gmap.set_obstacle(self.row, self.col, blocked)
 
     def is_start(self) -> bool:
         return self.color == (0, 255, 0)
@@ -39,10 +74,13 @@ class Cell:
         return self.color == (0, 0, 255)
     
     def is_obstacle(self) -> bool:
+        if self.gmap is not None:
+            return self.gmap.is_obstacle(self.row, self.col)
         return self.color == (255, 255, 255)
 
     def reset(self):
         self.color = (0, 0, 0)
+        self._set_blocked(False)
 
     def draw(self, win: pygame.Surface):
         rect = pygame.Rect(self.x, self.y, self.width, self.height)
@@ -65,87 +103,106 @@ class Cell:
 
 
 
-def create_grid(rows: int, cols: int, width: int, height: int) -> Tuple[List[List[Cell]], int, int]:
+def create_grid(rows: int, cols: int, width: int, height: int, gmap: GridMap = None) -> Tuple[List[List[Cell]], int, int]:
     """Create an RxC grid of Cell objects sized to the given window width/height.
+    The cells are a view over gmap (a new empty GridMap if not given).
     Returns (grid, node_width, node_height).
     """
+    if gmap is None:
+        gmap = GridMap(rows, cols)
     node_w = width // cols
     node_h = height // rows
     grid: List[List[Cell]] = []
     for r in range(rows):
         grid.append([])
         for c in range(cols):
-            grid[r].append(Cell(r, c, node_w, node_h))
+            grid[r].append(Cell(r, c, node_w, node_h, gmap))
     return grid, node_w, node_h
 
 
-def draw_grid(win: pygame.Surface, grid: List[List[Cell]], rows: int, cols: int, width: int, height: int, slider_ratio: float = 0.5, info_mode: bool = False):
-    win.fill((0, 0, 0))  # black background
-
-    # prepare a small font for info mode
-    try:
-        font = pygame.font.SysFont(None, 12)
-        small_font = pygame.font.SysFont(None, 10)
-    except Exception:
-        font = None
-        small_font = None
-
-    for row in grid:
-        for node in row:
-            node.draw(win)
-            # draw numeric info if enabled
-            if info_mode and font is not None:
-                # prepare display strings (empty if not set)
-                g_text = '' if node.g == float('inf') else f"{node.g:.1f}"
-                h_text = '' if node.h == float('inf') else f"{node.h:.1f}"
-                f_text = '' if node.f == float('inf') else f"{node.f:.1f}"
-
-                # determine if cell is "big enough" for full info (g top-left, h top-right, f center)
-                if node.width >= 36 and node.height >= 20 and (g_text or h_text or f_text):
-                    # center f
-                    if f_text:
-                        surf_f = font.render(f_text, True, (220, 220, 220))
-                        rect_f = surf_f.get_rect()
-                        rect_f.center = (node.x + node.width // 2, node.y + node.height // 2)
-                        win.blit(surf_f, rect_f)
-
-                    # top-left g
-                    if g_text:
-                        surf_g = small_font.render(g_text, True, (200, 200, 200)) if small_font else font.render(g_text, True, (200, 200, 200))
-                        rect_g = surf_g.get_rect()
-                        rect_g.topleft = (node.x + 2, node.y + 1)
-                        win.blit(surf_g, rect_g)
-
-                    # top-right h
-                    if h_text:
-                        surf_h = small_font.render(h_text, True, (200, 200, 200)) if small_font else font.render(h_text, True, (200, 200, 200))
-                        rect_h = surf_h.get_rect()
-                        rect_h.topright = (node.x + node.width - 2, node.y + 1)
-                        win.blit(surf_h, rect_h)
-
-                else:
-                    # fall back to a single centered value (prefer f, then g)
-                    text = ''
-                    if f_text:
-                        text = f_text
-                    elif g_text:
-                        text = g_text
-
-                    if text and node.width > 18 and node.height > 12:
-                        surf = font.render(text, True, (220, 220, 220))
-                        rect = surf.get_rect()
-                        rect.center = (node.x + node.width // 2, node.y + node.height // 2)
-                        win.blit(surf, rect)
-
-    # draw subtle grid lines
-    line_color = (40, 40, 40)
-    node_h = height // rows
-    node_w = width // cols
-    for r in range(rows + 1):
-        pygame.draw.line(win, line_color, (0, r * node_h), (width, r * node_h))
-    for c in range(cols + 1):
-        pygame.draw.line(win, line_color, (c * node_w, 0), (c * node_w, height))
-
+# fonts and the static grid-line layer are built once and reused every frame
+_fonts = {}
+_grid_lines = {}
+
+
+def get_font(size: int):
+    """pygame.font.SysFont(None, size), created once per size (None if fonts are unavailable)."""
+    if size not in _fonts:
+        try:
+            _fonts[size] = pygame.font.SysFont(None, size)
+        except Exception:
+            _fonts[size] = None
+    return _fonts[size]
+
+
+def get_grid_lines(rows: int, cols: int, width: int, height: int) -> pygame.Surface:
+    """Transparent layer with the subtle grid lines, built once per grid/window size."""
+    key = (rows, cols, width, height)
+    layer = _grid_lines.get(key)
+    if layer is None:
+        layer = pygame.Surface((width, height), pygame.SRCALPHA)
+        line_color = (40, 40, 40)
+        node_h = height // rows
+        node_w = width // cols
+        for r in range(rows + 1):
+            pygame.draw.line(layer, line_color, (0, r * node_h), (width, r * node_h))
+        for c in range(cols + 1):
+            pygame.draw.line(layer, line_color, (c * node_w, 0), (c * node_w, height))
+        _grid_lines[key] = layer
+    return layer
+
+
+def draw_cell_info(win: pygame.Surface, node: Cell):
+    """Draw the numeric g/h/f values of a cell (info mode)."""
+    font = get_font(12)
+    small_font = get_font(10)
+    if font is None:
+        return
+    # prepare display strings (empty if not set)
+    g_text = '' if node.g == float('inf') else f"{node.g:.1f}"
+    h_text = '' if node.h == float('inf') else f"{node.h:.1f}"
+    f_text = '' if node.f == float('inf') else f"{node.f:.1f}"
+
+    # determine if cell is "big enough" for full info (g top-left, h top-right, f center)
+    if node.width >= 36 and node.height >= 20 and (g_text or h_text or f_text):
+        # center f
+        if f_text:
+            surf_f = font.render(f_text, True, (220, 220, 220))
+            rect_f = surf_f.get_rect()
+            rect_f.center = (node.x + node.width // 2, node.y + node.height // 2)
+            win.blit(surf_f, rect_f)
+
+        # top-left g
+        if g_text:
+            surf_g = small_font.render(g_text, True, (200, 200, 200)) if small_font else font.render(g_text, True, (200, 200, 200))
+            rect_g = surf_g.get_rect()
+            rect_g.topleft = (node.x + 2, node.y + 1)
+            win.blit(surf_g, rect_g)
+
+        # top-right h
+        if h_text:
+            surf_h = small_font.render(h_text, True, (200, 200, 200)) if small_font else font.render(h_text, True, (200, 200, 200))
+            rect_h = surf_h.get_rect()
+            rect_h.topright = (node.x + node.width - 2, node.y + 1)
+            win.blit(surf_h, rect_h)
+
+    else:
+        # fall back to a single centered value (prefer f, then g)
+        text = ''
+        if f_text:
+            text = f_text
+        elif g_text:
+            text = g_text
+
+        if text and node.width > 18 and node.height > 12:
+            surf = font.render(text, True, (220, 220, 220))
+            rect = surf.get_rect()
+            rect.center = (node.x + node.width // 2, node.y + node.height // 2)
+            win.blit(surf, rect)
+
+
+def draw_controls(win: pygame.Surface, height: int, slider_ratio: float, info_mode: bool) -> pygame.Rect:
+    """Draw the speed slider and info-mode checkbox; returns the area they cover."""
     # Draw a simple slider at bottom to control search speed
     slider_w = 200
     slider_h = 10
@@ -162,14 +219,12 @@ def draw_grid(win: pygame.Surface, grid: List[List[Cell]], rows: int, cols: int,
     pygame.draw.rect(win, (200, 200, 200), knob_rect)
 
     # label above the slider to indicate purpose
-    try:
-        label_font = pygame.font.SysFont(None, 18)
-        label = label_font.render("Search speed", True, (200, 200, 200))
+    label_font = get_font(18)
+    if label_font is not None:
+        label = label_font.render("Replay speed", True, (200, 200, 200))
         label_rect = label.get_rect()
         label_rect.topleft = (slider_x, slider_y - 22)
         win.blit(label, label_rect)
-    except Exception:
-        pass
 
     # Draw an "Info mode" checkbox to the right of the slider
     checkbox_size = 16
@@ -182,18 +237,67 @@ def draw_grid(win: pygame.Surface, grid: List[List[Cell]], rows: int, cols: int,
         inner = checkbox_rect.inflate(-6, -6)
         pygame.draw.rect(win, (200, 200, 200), inner)
 
-    try:
-        chk_font = pygame.font.SysFont(None, 16)
+    chk_font = get_font(16)
+    if chk_font is not None:
         chk_label = chk_font.render("Info mode", True, (200, 200, 200))
         chk_rect = chk_label.get_rect()
         chk_rect.midleft = (checkbox_x + checkbox_size + 8, checkbox_y + checkbox_size // 2)
         win.blit(chk_label, chk_rect)
-    except Exception:
-        pass
+
+    # generous bounding box of everything drawn above (label and checkbox text included)
+    return pygame.Rect(slider_x - knob_w, slider_y - 24, slider_w + 150, 50)
+
+
+def progress_rect(width: int, height: int) -> pygame.Rect:
+    """Where the replay progress bar goes: right of the slider and info checkbox."""
+    return pygame.Rect(380, height - 30, width - 400, 10)
+
+
+def draw_progress(win: pygame.Surface, width: int, height: int, step: int, steps: int):
+    """Draw the replay progress bar with the current step."""
+    bar = progress_rect(width, height)
+    pygame.draw.rect(win, (80, 80, 80), bar)
+    done = bar.copy()
+    done.width = int(bar.width * step / steps) if steps else bar.width
+    pygame.draw.rect(win, (200, 200, 200), done)
+    font = get_font(18)
+    if font is not None:
+        label = font.render(f"Replay {step}/{steps}", True, (200, 200, 200))
+        win.blit(label, (bar.x, bar.y - 22))
+
+
+def draw_grid(win: pygame.Surface, grid: List[List[Cell]], rows: int, cols: int, width: int, height: int, slider_ratio: float = 0.5, info_mode: bool = False,
+              progress: Tuple[int, int] = None):
+    """Draw every cell, the grid lines and the controls; progress=(step, steps) adds the replay bar."""
+    win.fill((0, 0, 0))  # black background
+
+    for row in grid:
+        for node in row:
+            node.draw(win)
+            # draw numeric info if enabled
+            if info_mode:
+                draw_cell_info(win, node)
+
+    # draw subtle grid lines
+    win.blit(get_grid_lines(rows, cols, width, height), (0, 0))
+
+    draw_controls(win, height, slider_ratio, info_mode)
+    if progress is not None:
+        draw_progress(win, width, height, *progress)
 
     pygame.display.update()
 
 
+def draw_replay(win: pygame.Surface, replay: Replay, step: int, rows: int, cols: int, width: int, height: int, slider_ratio: float = 0.5, info_mode: bool = False):
+    """Draw a step of a recorded search: one scaled image of the grid instead of a rectangle per cell."""
+    win.fill((0, 0, 0))
+    replay.render(win, step, pygame.Rect(0, 0, cols * (width // cols), rows * (height // rows)))
+    win.blit(get_grid_lines(rows, cols, width, height), (0, 0))
+    draw_controls(win, height, slider_ratio, info_mode)
+    draw_progress(win, width, height, step, replay.steps)
+    pygame.display.update()
+
+
 def get_clicked_pos(pos: Tuple[int, int], rows: int, cols: int, width: int, height: int) -> Tuple[int, int]:
     x, y = pos
     node_w = width // cols
@@ -221,7 +325,7 @@ def visual():
     run = True
     clock = pygame.time.Clock()
     while run:
-        clock.tick(60)
+        clock.tick(FPS)
         draw_grid(WIN, grid, ROWS, COLS, WIDTH, HEIGHT)
 
         for event in pygame.event.get():
@@ -296,97 +400,192 @@ def get_neighbors(grid, cell):
     return neighbors
 
 
-def astar_search(grid, start, goal, win, rows, cols, width, height, delay_ms=10, slider_ratio: float = 0.5, info_mode: bool = False):
-    """Perform A* search and visualize the process
+def astar_search(grid, start, goal, info_mode: bool = False, heuristic: str = 'octile', weight: float = 1.0,
+                 probe: SearchProbe = None, min_clearance: float = 0.0):
+    """Perform A* search on the grid's GridMap at full speed; returns the path as a list of Cells.
 
-    When info_mode is True, numeric details (g/h/f and neighbor tentative scores)
-    are printed to the terminal to help debugging/learning.
+    Nothing is drawn while it runs: the cells are left in the final state
+    (colors and g/h/f), and the animation is a replay.Replay of the events
+    recorded by probe's trace (instrument.SearchProbe with a TraceBuffer).
+    When info_mode is True the counters and timings of the run are printed
+    once it ends. heuristic/weight select the heuristic (see
+    astar.HEURISTICS) and the weighted-A* factor; min_clearance keeps the
+    path that far from obstacles (a robot of that radius).
     """
     if start is None or goal is None:
         print("Please set both start and goal nodes!")
         return None
 
-    # Initialize start node
-    start.g = 0
-    start.h = start.h_cost(goal)
-    start.f = start.g + start.h
+    gmap = start.gmap
+    if info_mode and probe is None:
+        probe = SearchProbe()
+
+    stats = {}
+    steps = astar.astar_steps(gmap, start.get_pos(), goal.get_pos(), 4096, heuristic, weight, stats, probe,
+                              min_clearance)
+    while True:
+        try:
+            batch = next(steps)
+        except StopIteration as done:
+            path = done.value
+            break
+
+        for idx, kind, g, h in batch:
+            row, col = gmap.pos(idx)
+            node = grid[row][col]
+            node.g, node.h, node.f = g, h, g + h
+            if kind == astar.EXPANDED:
+                if node != start and node != goal:
+                    node.color = (255, 165, 0)  # Orange for visited
+            else:
+                if node != start and node != goal:
+                    node.color = (0, 255, 255)  # Cyan for open set
+
+    if info_mode:
+        print(f"A* {probe.summary()}, cost={stats['cost']}")
+    if path is None:
+        print("No path found!")
+        return None
+    return [grid[row][col] for row, col in path]
+
 
-    open_set = {start}
-    closed_set = set()
+def jump_point_search(grid, start, goal, info_mode: bool = False):
+    """Run Jump Point Search on the grid's GridMap; returns the path as a list of Cells.
 
-    iter_count = 0
+    JPS only expands a handful of jump points, so there is nothing to animate:
+    the path is computed in one go.
+    """
+    if start is None or goal is None:
+        print("Please set both start and goal nodes!")
+        return None
+    stats = {}
+    path = jps.jps_search(start.gmap, start.get_pos(), goal.get_pos(), stats)
     if info_mode:
-        print(f"A* start: start=({start.row},{start.col}) goal=({goal.row},{goal.col})")
-
-    while open_set:
-        iter_count += 1
-        # Find node with lowest f cost
-        current = min(open_set, key=lambda n: (n.f, n.h))
-
-        # Info output for current node
-        if info_mode:
-            g = current.g if current.g != float('inf') else None
-            h = current.h if current.h != float('inf') else None
-            f = current.f if current.f != float('inf') else None
-            print(f"Iter {iter_count}: current=({current.row},{current.col}) g={g} h={h} f={f} open={len(open_set)} closed={len(closed_set)}")
-
-        # Check if we reached the goal
-        if current == goal:
-            if info_mode:
-                print("Path found! Reconstructing path...")
-            return reconstruct_path(current)
-
-        # Move current from open to closed
-        open_set.remove(current)
-        closed_set.add(current)
-
-        # Visualize the search (optional - can be removed for speed)
-        if current != start and current != goal:
-            current.color = (255, 165, 0)  # Orange for visited
-        # pass the current slider_ratio and info_mode so the UI stays consistent
-        draw_grid(win, grid, rows, cols, width, height, slider_ratio, info_mode)
-        pygame.time.delay(delay_ms)  # controlled delay
-
-        # Check all neighbors
-        neighbors = get_neighbors(grid, current)
-        for neighbor in neighbors:
-            if neighbor in closed_set:
-                if info_mode:
-                    print(f"  Neighbor ({neighbor.row},{neighbor.col}) in closed set; skipping")
-                continue
+        print(f"JPS expanded {stats['expanded']} jump points, cost={stats['cost']}")
+    if path is None:
+        print("No path found!")
+        return None
+    return [grid[row][col] for row, col in path]
 
-            # Calculate tentative g score
-            tentative_g = current.g + current.g_cost(neighbor)
 
-            if info_mode:
-                old_g = neighbor.g if neighbor.g != float('inf') else None
-                print(f"  Neighbor ({neighbor.row},{neighbor.col}) tentative_g={tentative_g:.2f} old_g={old_g}")
-
-            # If this path to neighbor is better than any previous one
-            if neighbor not in open_set:
-                open_set.add(neighbor)
-                neighbor.h = neighbor.h_cost(goal)
-                if info_mode:
-                    print(f"    Added to open set with h={neighbor.h:.2f}")
-            elif tentative_g >= neighbor.g:
-                if info_mode:
-                    print("    Not a better path; skipping")
-                continue  # This is not a better path
-
-            # This path is the best so far, record it
-            neighbor.parent = current
-            neighbor.g = tentative_g
-            neighbor.f = neighbor.g + neighbor.h
+def any_angle_search(grid, start, goal, info_mode: bool = False):
+    """Run Lazy Theta* on the grid's GridMap; returns the cells along its straight segments.
+
+    The waypoints themselves are printed in info mode.
+    """
+    if start is None or goal is None:
+        print("Please set both start and goal nodes!")
+        return None
+    stats = {}
+    waypoints = theta_star.theta_star_search(start.gmap, start.get_pos(), goal.get_pos(), stats=stats)
+    if info_mode:
+        print(f"Lazy Theta* expanded {stats['expanded']} cells, {stats['los_checks']} line-of-sight checks, "
+              f"cost={stats['cost']}")
+    if waypoints is None:
+        print("No path found!")
+        return None
+    if info_mode:
+        print(f"{len(waypoints)} waypoints: {waypoints.tolist()}")
+    return [grid[row][col] for row, col in theta_star.expand_waypoints(waypoints).tolist()]
+
+
+def incremental_search(grid, planner: DStarLite, start, goal, info_mode: bool = False):
+    """Replan with a D* Lite planner kept between runs; returns the path as a list of Cells.
+
+    The planner already heard about every obstacle edit since its last run
+    (it listens to the GridMap), so only the affected cells are repaired. A
+    moved start is handled incrementally, a moved goal restarts the search.
+    """
+    if start is None or goal is None:
+        print("Please set both start and goal nodes!")
+        return None
+    planner.move_start(start.get_pos())
+    planner.set_goal(goal.get_pos())
+    path = planner.plan()
+    if info_mode:
+        print(f"D* Lite expanded {planner.expanded} cells ({planner.total_expanded} since created), "
+              f"cost={planner.cost()}")
+    if path is None:
+        print("No path found!")
+        return None
+    return [grid[row][col] for row, col in path]
+
+
+def hierarchical_search(grid, graph: HPAGraph, start, goal, info_mode: bool = False):
+    """Answer the query on an HPA* abstract graph kept between runs; returns the path as a list of Cells.
+
+    The graph listens to the GridMap, so clusters touched by obstacle edits
+    are rebuilt on the next query.
+    """
+    if start is None or goal is None:
+        print("Please set both start and goal nodes!")
+        return None
+    stats = {}
+    path = graph.search(start.get_pos(), goal.get_pos(), stats=stats)
+    if info_mode:
+        how = "flat A*" if stats['flat'] else f"{stats['expanded']} abstract nodes expanded"
+        print(f"HPA* ({graph.num_clusters} clusters, {graph.num_nodes()} nodes): {how}, cost={stats['cost']}")
+    if path is None:
+        print("No path found!")
+        return None
+    return [grid[row][col] for row, col in path]
+
+
+def clear_search(grid):
+    """Forget what the previous run left on the cells (colors and g/h/f/parent)."""
+    for row in grid:
+        for node in row:
+            if node.color in SEARCH_COLORS:
+                node.color = (0, 0, 0)
+            node.g = node.h = node.f = float('inf')
+            node.parent = None
 
-            if info_mode:
-                print(f"    Updated neighbor ({neighbor.row},{neighbor.col}) g={neighbor.g:.2f} h={neighbor.h:.2f} f={neighbor.f:.2f}")
 
-            # Visualize open set (optional)
-            if neighbor != start and neighbor != goal:
-                neighbor.color = (0, 255, 255)  # Cyan for open set
+def sync_obstacles(grid, start, goal):
+    """Paint cells blocked in the GridMap (e.g. by rasterize_boxes) white; start and goal stay free."""
+    for cell in (start, goal):
+        if cell is not None and cell.is_obstacle():
+            cell._set_blocked(False)
+    occ = grid[0][0].gmap.occupancy_array()
+    for row, col in np.argwhere(occ):
+        node = grid[row][col]
+        if node.color == (0, 0, 0) or node.color in SEARCH_COLORS:
+            node.color = (255, 255, 255)
 
-    print("No path found!")
-    return None
+
+def load_grid(path: str, width: int, height: int):
+    """Build the grid from a saved map (.gmap, or Moving AI .map); returns (grid, start, goal).
+
+    A .gmap 'terrain' layer becomes the map's cost layer, so A* plans with it.
+    """
+    if path.endswith('.map'):
+        gmap, start_pos, goal_pos = map_io.read_movingai_map(path), None, None
+    else:
+        loaded = map_io.load_map(path)
+        gmap, start_pos, goal_pos = loaded.gmap, loaded.start, loaded.goal
+        if 'terrain' in loaded.layers:
+            gmap.set_costs(loaded.layers['terrain'])
+    grid, _, _ = create_grid(gmap.rows, gmap.cols, width, height, gmap)
+    start = goal = None
+    if start_pos is not None:
+        start = grid[start_pos[0]][start_pos[1]]
+        start.make_start()
+    if goal_pos is not None:
+        goal = grid[goal_pos[0]][goal_pos[1]]
+        goal.make_goal()
+    sync_obstacles(grid, start, goal)
+    return grid, start, goal
+
+
+def save_grid(path: str, grid, start, goal):
+    """Write the grid's map (with start/goal and its cost layer for .gmap files) to path."""
+    gmap = grid[0][0].gmap
+    if path.endswith('.map'):
+        map_io.write_movingai_map(path, gmap)
+    else:
+        costs = gmap.cost_array()
+        layers = {'terrain': costs * gmap.cost_scale} if costs is not None else None
+        map_io.save_map(path, gmap, start.get_pos() if start else None, goal.get_pos() if goal else None, layers)
 
 
 def reconstruct_path(goal_node):
@@ -405,29 +604,42 @@ def main():
     parser = argparse.ArgumentParser(description='A* visualization')
     parser.add_argument('--rows', type=int, default=60, help='number of rows')
     parser.add_argument('--cols', type=int, default=70, help='number of columns')
+    parser.add_argument('--heuristic', choices=sorted(astar.HEURISTICS), default='octile', help='A* heuristic')
+    parser.add_argument('--weight', type=float, default=1.0, help='weighted A* factor (>= 1); paths cost at most weight x optimal')
+    parser.add_argument('--clearance', type=float, default=0.0,
+                        help='A* keeps this distance (cells) from obstacles, for a robot of that radius')
+    parser.add_argument('--map', help='map file to start from and to save to with S (.gmap, or Moving AI .map)')
     args = parser.parse_args()
-
-    # Allow user to optionally enter grid size interactively; press Enter to accept defaults
-    try:
-        rows_input = input(f"Enter number of rows [{args.rows}]: ").strip()
-        cols_input = input(f"Enter number of columns [{args.cols}]: ").strip()
-        ROWS = int(rows_input) if rows_input else args.rows
-        COLS = int(cols_input) if cols_input else args.cols
-    except Exception:
-        # If input isn't available or invalid, fall back to provided args
-        ROWS = args.rows
-        COLS = args.cols
+    map_path = args.map or 'map.gmap'
+
+    if args.map and os.path.exists(args.map):
+        ROWS = COLS = None  # taken from the map file
+    else:
+        # Allow user to optionally enter grid size interactively; press Enter to accept defaults
+        try:
+            rows_input = input(f"Enter number of rows [{args.rows}]: ").strip()
+            cols_input = input(f"Enter number of columns [{args.cols}]: ").strip()
+            ROWS = int(rows_input) if rows_input else args.rows
+            COLS = int(cols_input) if cols_input else args.cols
+        except Exception:
+            # If input isn't available or invalid, fall back to provided args
+            ROWS = args.rows
+            COLS = args.cols
 
     pygame.init()
     WIDTH, HEIGHT = 800, 600
     WIN = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("A* Pathfinding Visualization")
 
-    grid, _, _ = create_grid(ROWS, COLS, WIDTH, HEIGHT)
-
     # track start and goal nodes (Cell objects)
     start = None
     goal = None
+    if ROWS is None:
+        grid, start, goal = load_grid(args.map, WIDTH, HEIGHT)
+        ROWS, COLS = len(grid), len(grid[0])
+        print(f"Loaded {args.map} ({ROWS}x{COLS})")
+    else:
+        grid, _, _ = create_grid(ROWS, COLS, WIDTH, HEIGHT)
 
     # slider state: ratio 0..1 where 1.0 is fastest (0 ms delay)
     slider_ratio = 0.5
@@ -436,11 +648,42 @@ def main():
     # info mode toggle
     info_mode = False
 
+    # search mode toggle: A* (animated) or Jump Point Search
+    use_jps = False
+    # any-angle mode: Lazy Theta*, straight segments instead of 8-way steps
+    use_any_angle = False
+    # incremental mode: a D* Lite planner kept between runs and repaired after edits
+    use_incremental = False
+    planner = None
+    # hierarchical mode: an HPA* abstract graph kept between runs
+    use_hpa = False
+    hpa_graph = None
+    # A* results by (start, goal), kept across runs and repaired after edits
+    path_cache = None
+    # instrumentation of the last A* run; its trace is what gets replayed
+    probe = None
+    # replay of the last A* run: the step shown (fractional while playing), whether it plays,
+    # and whether the progress bar is being dragged
+    replay = None
+    replay_step = 0.0
+    replay_playing = False
+    scrubbing = False
+
     run = True
     clock = pygame.time.Clock()
     while run:
-        clock.tick(60)
-        draw_grid(WIN, grid, ROWS, COLS, WIDTH, HEIGHT, slider_ratio, info_mode)
+        clock.tick(FPS)
+        if replay is not None and replay_playing:
+            # slider 1.0 -> the whole run at once, 0.0 -> one expansion every 200 ms
+            delay_ms = (1.0 - slider_ratio) * 200
+            replay_step = replay.steps if delay_ms <= 0 else min(replay_step + FRAME_MS / delay_ms, replay.steps)
+            replay_playing = replay_step < replay.steps
+        if replay is not None and int(replay_step) < replay.steps:
+            draw_replay(WIN, replay, int(replay_step), ROWS, COLS, WIDTH, HEIGHT, slider_ratio, info_mode)
+        else:
+            # the cells hold the final state of the last search (with g/h/f for info mode)
+            draw_grid(WIN, grid, ROWS, COLS, WIDTH, HEIGHT, slider_ratio, info_mode,
+                      progress=(replay.steps, replay.steps) if replay is not None else None)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -470,6 +713,15 @@ def main():
                     slider_ratio = min(max(slider_ratio, 0.0), 1.0)
                     continue
 
+                if replay is not None and progress_rect(WIDTH, HEIGHT).collidepoint(pos):
+                    scrubbing = True
+                    replay_playing = False
+                    bar = progress_rect(WIDTH, HEIGHT)
+                    replay_step = round((pos[0] - bar.x) / bar.width * replay.steps)
+                    continue
+
+                # editing the grid ends the replay: it shows the map as it was searched
+                replay = None
                 row, col = get_clicked_pos(pos, ROWS, COLS, WIDTH, HEIGHT)
                 node = grid[row][col]
 
@@ -499,8 +751,9 @@ def main():
                         node.reset()
 
             if event.type == pygame.MOUSEBUTTONUP:
-                # stop adjusting slider when mouse released
+                # stop adjusting slider / scrubbing when mouse released
                 adjusting_slider = False
+                scrubbing = False
 
             if event.type == pygame.MOUSEMOTION:
                 pos = pygame.mouse.get_pos()
@@ -513,13 +766,21 @@ def main():
                     slider_ratio = min(max(slider_ratio, 0.0), 1.0)
                     continue
 
+                # dragging along the progress bar scrubs the replay
+                if scrubbing and replay is not None:
+                    bar = progress_rect(WIDTH, HEIGHT)
+                    replay_step = round(min(max((pos[0] - bar.x) / bar.width, 0.0), 1.0) * replay.steps)
+                    continue
+
                 # dragging to add/remove obstacles
                 if buttons[0]:  # left button held
+                    replay = None
                     row, col = get_clicked_pos(pos, ROWS, COLS, WIDTH, HEIGHT)
                     node = grid[row][col]
                     if node != start and node != goal:
                         node.make_clicked()
                 elif buttons[2]:  # right button held
+                    replay = None
                     row, col = get_clicked_pos(pos, ROWS, COLS, WIDTH, HEIGHT)
                     node = grid[row][col]
                     if node != start and node != goal:
@@ -527,24 +788,139 @@ def main():
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE :
-                    # compute delay_ms from slider_ratio (1.0 -> 0ms, 0.0 -> 200ms)
-                    delay_ms = int((1.0 - slider_ratio) * 200)
-                    print("Running A* algorithm... delay_ms=", delay_ms)
-                    # pass slider_ratio and info_mode so astar doesn't redraw slider at default
-                    path = astar_search(grid, start, goal, WIN, ROWS, COLS, WIDTH, HEIGHT, delay_ms=delay_ms, slider_ratio=slider_ratio, info_mode=info_mode)
-                    
+                    clear_search(grid)
+                    replay = None
+                    probe = None  # only an A* search below records a new trace for T
+                    if use_incremental:
+                        print("Running D* Lite (incremental)...")
+                        if planner is None and start is not None and goal is not None:
+                            planner = DStarLite(start.gmap, start.get_pos(), goal.get_pos())
+                        path = incremental_search(grid, planner, start, goal, info_mode=info_mode)
+                    elif use_hpa:
+                        print("Running HPA* (hierarchical)...")
+                        if hpa_graph is None:
+                            hpa_graph = HPAGraph(grid[0][0].gmap, cluster_size=10)
+                        path = hierarchical_search(grid, hpa_graph, start, goal, info_mode=info_mode)
+                    elif use_any_angle:
+                        print("Running Lazy Theta* (any-angle)...")
+                        path = any_angle_search(grid, start, goal, info_mode=info_mode)
+                    elif use_jps:
+                        print("Running Jump Point Search...")
+                        path = jump_point_search(grid, start, goal, info_mode=info_mode)
+                    else:
+                        if path_cache is None:
+                            path_cache = PathCache(grid[0][0].gmap, heuristic=args.heuristic, weight=args.weight,
+                                                   min_clearance=args.clearance)
+                        cached = MISS
+                        if start is not None and goal is not None:
+                            cached = path_cache.lookup(start.get_pos(), goal.get_pos())
+                        if cached is not MISS:
+                            # nothing was searched, so there is nothing to replay or save
+                            print("A* result from the cache (no search to replay)")
+                            if info_mode:
+                                print(f"Path cache {path_cache.stats()}")
+                            path = [grid[row][col] for row, col in cached] if cached else None
+                            if path is None:
+                                print("No path found!")
+                        else:
+                            print("Running A* algorithm...")
+                            # the search runs at full speed and records its events; the replay
+                            # below animates them at the slider speed (T saves the trace)
+                            probe = SearchProbe(TraceBuffer(TRACE_CAPACITY, ROWS, COLS))
+                            path = astar_search(grid, start, goal, info_mode=info_mode,
+                                                heuristic=args.heuristic, weight=args.weight, probe=probe,
+                                                min_clearance=args.clearance)
+                        if cached is MISS and start is not None and goal is not None:
+                            path_cache.put(start.get_pos(), goal.get_pos(),
+                                           [cell.get_pos() for cell in path] if path else None)
+                            if probe.trace.dropped:
+                                print(f"Trace full: the replay starts {probe.trace.dropped} events into the search")
+                            replay = Replay(probe.trace.events(), grid[0][0].gmap, start.get_pos(), goal.get_pos(),
+                                            [cell.get_pos() for cell in path] if path else None)
+                            replay_step = 0.0
+                            replay_playing = True
+
                     # Visualize the final path
                     if path:
                         for cell in path:
                             if cell != start and cell != goal:
                                 cell.color = (255, 0, 255)  # Magenta for path
-                        draw_grid(WIN, grid, ROWS, COLS, WIDTH, HEIGHT, slider_ratio, info_mode)
                         print(f"Path length: {len(path)} cells")
+
+                if replay is not None and event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_HOME, pygame.K_END):
+                    # scrub one expansion at a time, 5% of the run with Shift
+                    stride = max(1, replay.steps // 20) if event.mod & pygame.KMOD_SHIFT else 1
+                    moves = {pygame.K_LEFT: int(replay_step) - stride, pygame.K_RIGHT: int(replay_step) + stride,
+                             pygame.K_HOME: 0, pygame.K_END: replay.steps}
+                    replay_step = min(max(moves[event.key], 0), replay.steps)
+                    replay_playing = False
+
+                if event.key == pygame.K_p and replay is not None:
+                    # pause / resume; from the end, play again from the start
+                    if replay_step >= replay.steps:
+                        replay_step = 0.0
+                        replay_playing = True
+                    else:
+                        replay_playing = not replay_playing
                 
+                if event.key == pygame.K_j:
+                    use_jps = not use_jps
+                    print("Search mode:", "Jump Point Search" if use_jps else "A*")
+
+                if event.key == pygame.K_a:
+                    use_any_angle = not use_any_angle
+                    print("Any-angle paths (Lazy Theta*):", "on" if use_any_angle else "off")
+
+                if event.key == pygame.K_i:
+                    use_incremental = not use_incremental
+                    if not use_incremental and planner is not None:
+                        planner.detach()
+                        planner = None
+                    print("Incremental replanning (D* Lite):", "on" if use_incremental else "off")
+
+                if event.key == pygame.K_h:
+                    use_hpa = not use_hpa
+                    if not use_hpa and hpa_graph is not None:
+                        hpa_graph.detach()
+                        hpa_graph = None
+                    print("Hierarchical search (HPA*):", "on" if use_hpa else "off")
+
+                if event.key == pygame.K_b:
+                    # scatter random boxes over the map, as a loaded obstacle scene would
+                    rng = np.random.default_rng()
+                    corners = rng.uniform(0, [ROWS, COLS], size=(max(1, ROWS * COLS // 400), 2))
+                    sizes = rng.uniform(1, [max(2, ROWS // 8), max(2, COLS // 8)], size=corners.shape)
+                    added = rasterize_boxes(grid[0][0].gmap, np.stack([corners, corners + sizes], axis=1))
+                    replay = None
+                    sync_obstacles(grid, start, goal)
+                    print(f"Added {len(corners)} boxes ({added} cells)")
+
+                if event.key == pygame.K_t:
+                    if probe is None or probe.trace is None or len(probe.trace) == 0:
+                        print("No trace: run A* first")
+                    else:
+                        probe.trace.save(TRACE_PATH)
+                        print(f"Saved {len(probe.trace)} search events to {TRACE_PATH}")
+
+                if event.key == pygame.K_s:
+                    save_grid(map_path, grid, start, goal)
+                    print(f"Map saved to {map_path}")
+
                 if event.key == pygame.K_c:
                     # Clear the grid
+                    if planner is not None:
+                        planner.detach()
+                        planner = None
+                    if hpa_graph is not None:
+                        hpa_graph.detach()
+                        hpa_graph = None
+                    if path_cache is not None:
+                        path_cache.detach()
+                        path_cache = None
                     start = None
                     goal = None
+                    replay = None
+                    probe = None
                     grid, _, _ = create_grid(ROWS, COLS, WIDTH, HEIGHT)
                     print("Grid cleared!")
 
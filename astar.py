@@ -0,0 +1,261 @@
+"""Headless A* search over a GridMap.
+
+This module does not import pygame. astar_search runs a search to completion;
+astar_steps is the same search as a generator that hands back the cells it
+changed in batches, which is how the visualizer in Visual_A*.py animates it
+without slowing the search down to its frame rate.
+
+The heuristic is pluggable (see HEURISTICS) and can be inflated by a weight
+w >= 1 (weighted A*, f = g + w * h): with an admissible heuristic the path
+found then costs at most w times the optimum, usually for far fewer
+expansions.
+
+On a map with a cost layer (GridMap.set_costs) entering a cell costs the
+step cost times the cell's cost, read straight from the layer in the inner
+loop. The heuristic is then scaled by the cheapest cell cost, so it stays
+admissible (and consistent) whatever the terrain.
+"""
+import heapq
+import math
+import time
+from typing import Callable, Generator, List, Optional, Tuple
+
+from grid_map import DIAGONAL_COST, NO_PARENT, ORTHOGONAL_COST, GridMap
+
+Pos = Tuple[int, int]
+
+# kinds of cell change reported by astar_steps
+EXPANDED = 0  # popped from the open set (closed, or the goal)
+OPENED = 1    # pushed with a new best g
+# (idx, kind, g, h) with idx the flat cell index
+CellChange = Tuple[int, int, float, float]
+
+# heuristic(d_row, d_col) with both deltas >= 0
+Heuristic = Callable[[int, int], float]
+
+_DIAG_EXTRA = DIAGONAL_COST - ORTHOGONAL_COST
+
+
+def octile(dr: int, dc: int) -> float:
+    """Exact obstacle-free cost under the 8-way move model; admissible and consistent."""
+    if dr < dc:
+        return dc + _DIAG_EXTRA * dr
+    return dr + _DIAG_EXTRA * dc
+
+
+def euclidean(dr: int, dc: int) -> float:
+    """Straight-line distance, scaled so a diagonal step (1.414) is never overestimated."""
+    return math.sqrt(dr * dr + dc * dc) * (DIAGONAL_COST / math.sqrt(2))
+
+
+def chebyshev(dr: int, dc: int) -> float:
+    """Moves needed ignoring their cost difference; admissible but weaker than octile."""
+    return dr if dr > dc else dc
+
+
+def manhattan(dr: int, dc: int) -> float:
+    """The old Cell.h_cost; overestimates diagonal moves, so paths may not be optimal."""
+    return dr + dc
+
+
+HEURISTICS = {
+    'octile': octile,
+    'euclidean': euclidean,
+    'chebyshev': chebyshev,
+    'manhattan': manhattan,
+}
+# heuristics that never overestimate the remaining cost
+ADMISSIBLE = {'octile', 'euclidean', 'chebyshev'}
+
+
+def get_heuristic(heuristic) -> Heuristic:
+    """Resolve a heuristic name from HEURISTICS (or pass a callable through)."""
+    if callable(heuristic):
+        return heuristic
+    try:
+        return HEURISTICS[heuristic]
+    except KeyError:
+        raise ValueError(f"unknown heuristic {heuristic!r}, expected one of {sorted(HEURISTICS)}") from None
+
+
+def astar_search(gmap: GridMap, start: Pos, goal: Pos, heuristic='octile', weight: float = 1.0,
+                 stats: Optional[dict] = None, probe=None, min_clearance: float = 0.0,
+                 terrain: bool = True) -> Optional[List[Pos]]:
+    """Find a path from start to goal ((row, col) tuples) with 8-directional moves.
+
+    Returns the path as a list of (row, col) from start to goal, or None when
+    the goal is unreachable. heuristic is a name from HEURISTICS or a
+    callable; weight >= 1 inflates it (weighted A*). If stats is given it gets
+    'expanded', 'pushed' and 'cost' (None when unreachable). probe is an
+    instrument.SearchProbe to collect counters, timings and a trace. With
+    min_clearance > 0 the path keeps at least that distance (in cells) from
+    every obstacle and the map border, as for a round robot of that radius:
+    closer cells are never entered (see clearance.ClearanceMap). With
+    terrain=False the cost layer is ignored and the search runs on the binary
+    map. g-scores and parents are left in gmap.g / gmap.parent after the search.
+    """
+    steps = astar_steps(gmap, start, goal, batch_size=0, heuristic=heuristic, weight=weight, stats=stats,
+                        probe=probe, min_clearance=min_clearance, terrain=terrain)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+def astar_steps(gmap: GridMap, start: Pos, goal: Pos, batch_size: int = 256, heuristic='octile',
+                weight: float = 1.0, stats: Optional[dict] = None, probe=None,
+                min_clearance: float = 0.0, terrain: bool = True) -> Generator[List[CellChange], None, Optional[List[Pos]]]:
+    """A* as a generator: yields lists of CellChange, returns the path (or None).
+
+    Each yielded batch holds the changes of up to batch_size expansions, in
+    order; the last batch ends with the goal's expansion when a path exists.
+    With batch_size=0 nothing is recorded or yielded and the search just runs.
+    The reported h already includes the weight and the cost layer's scaling.
+    heuristic, weight, stats, probe, min_clearance and terrain are as for
+    astar_search; time spent suspended at a yield is not counted in the
+    probe's timings.
+
+    The open set is a binary heap ordered by (f, h) with insertion order
+    breaking ties; improved cells get a fresh entry and stale ones are skipped
+    once the cell is closed.
+    """
+    if weight < 1.0:
+        raise ValueError(f"weight must be >= 1, got {weight}")
+    traced = probe is not None
+    if traced:
+        t_phase = time.perf_counter()
+        probe.searches += 1
+    h_func = get_heuristic(heuristic)
+    masks = gmap.neighbor_masks(min_clearance)
+    move_table = gmap.move_table()
+    costs = gmap.costs if terrain else None
+    if costs is not None:
+        if gmap.cost_scale != 1.0:
+            # fold the layer's scale into the step costs once instead of per move
+            move_table = tuple(tuple((offset, step * gmap.cost_scale, dr, dc) for offset, step, dr, dc in moves)
+                               for moves in move_table)
+        # no cell is cheaper than min_cost, so h stays a lower bound on the terrain
+        weight *= gmap.cost_scale * gmap.min_cost
+    g, parent = gmap.search_arrays()
+    closed = bytearray(gmap.size)
+
+    record = batch_size > 0
+    changes: List[CellChange] = []
+    batch_expansions = 0
+    # the per-cell bookkeeping below only runs on this branch
+    slow = record or traced
+
+    goal_row, goal_col = goal
+    s = gmap.index(*start)
+    t = gmap.index(goal_row, goal_col)
+    h = weight * h_func(abs(start[0] - goal_row), abs(start[1] - goal_col))
+    g[s] = 0.0
+    open_heap = [(h, h, 0, s)]
+    count = 1
+    expanded = 0
+    if traced:
+        pushed_before = bytearray(gmap.size)  # for counting reopenings
+        pushed_before[s] = 1
+        probe.push(s, 0.0, h, False)
+        now = time.perf_counter()
+        probe.timed('setup', now - t_phase)
+        t_phase = now
+
+    while open_heap:
+        _, h, _, current = heapq.heappop(open_heap)
+        if closed[current]:
+            continue  # stale entry left behind by a better path
+        expanded += 1
+        if slow:
+            if record:
+                changes.append((current, EXPANDED, g[current], h))
+            if traced:
+                probe.expand(current, g[current], h, len(open_heap) + 1)
+        if current == t:
+            if stats is not None:
+                stats.update(expanded=expanded, pushed=count, cost=float(g[t]))
+            if traced:
+                t_phase = _end_search(probe, t_phase, count - expanded - len(open_heap))
+            if record:
+                yield changes
+                t_phase = time.perf_counter()
+            path = reconstruct_path(gmap, t)
+            if traced:
+                probe.timed('path', time.perf_counter() - t_phase)
+            return path
+        closed[current] = 1
+
+        row, col = divmod(current, gmap.cols)
+        current_g = g[current]
+        # only the passable neighbors, straight from the precomputed tables
+        for offset, step, dr, dc in move_table[masks[current]]:
+            neighbor = current + offset
+            if closed[neighbor]:
+                continue
+            tentative_g = current_g + (step if costs is None else step * costs[neighbor])
+            if tentative_g >= g[neighbor]:
+                continue  # not a better path
+            g[neighbor] = tentative_g
+            parent[neighbor] = current
+            h = weight * h_func(abs(row + dr - goal_row), abs(col + dc - goal_col))
+            heapq.heappush(open_heap, (tentative_g + h, h, count, neighbor))
+            count += 1
+            if slow:
+                if record:
+                    changes.append((neighbor, OPENED, tentative_g, h))
+                if traced:
+                    probe.push(neighbor, tentative_g, h, pushed_before[neighbor] == 1)
+                    pushed_before[neighbor] = 1
+
+        if record:
+            batch_expansions += 1
+            if batch_expansions >= batch_size:
+                if traced:
+                    probe.timed('search', time.perf_counter() - t_phase)
+                yield changes
+                if traced:
+                    t_phase = time.perf_counter()
+                changes = []
+                batch_expansions = 0
+
+    if stats is not None:
+        stats.update(expanded=expanded, pushed=count, cost=None)
+    if traced:
+        _end_search(probe, t_phase, count - expanded)
+    if changes:
+        yield changes
+    return None
+
+
+def _end_search(probe, t_phase: float, stale: int) -> float:
+    # close the search phase; stale = entries popped but skipped (pushed - expanded - still queued)
+    now = time.perf_counter()
+    probe.timed('search', now - t_phase)
+    probe.stale += stale
+    return now
+
+
+def reconstruct_path(gmap: GridMap, goal_idx: int) -> List[Pos]:
+    """Follow gmap.parent back from goal_idx; returns (row, col) from start to goal."""
+    parent = gmap.parent
+    path = []
+    current = goal_idx
+    while current != NO_PARENT:
+        path.append(gmap.pos(current))
+        current = parent[current]
+    path.reverse()
+    return path
+
+
+def path_cost(path: List[Pos], gmap: Optional[GridMap] = None) -> float:
+    """Cost of a path of adjacent (row, col) cells under the 8-way move model.
+
+    Pass the gmap to include its cost layer, if it has one.
+    """
+    costs = gmap.cost_array() if gmap is not None else None
+    cost = 0.0
+    for (r0, c0), (r1, c1) in zip(path, path[1:]):
+        step = ORTHOGONAL_COST if r0 == r1 or c0 == c1 else DIAGONAL_COST
+        cost += step if costs is None else step * gmap.cost_scale * float(costs[r1, c1])
+    return cost
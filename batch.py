@@ -0,0 +1,97 @@
+"""Answer many start/goal queries against one map with a pool of worker processes.
+
+The occupancy grid is copied once into a multiprocessing.shared_memory block;
+every worker builds its GridMap directly on that buffer (no per-worker copy,
+no pickling of the map), keeps its own search scratch arrays, and answers
+chunks of queries with astar.astar_search. A cost layer (GridMap.set_costs)
+goes into the same block, right after the occupancy.
+"""
+import os
+from multiprocessing import Pool, shared_memory
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import astar
+from grid_map import GridMap
+
+Pos = Tuple[int, int]
+Query = Tuple[Pos, Pos]
+
+# worker-process state, set up by _init_worker
+_worker_shm = None
+_worker_map = None
+_worker_costs_only = False
+
+
+def _init_worker(shm_name: str, rows: int, cols: int, costs_only: bool,
+                 cost_dtype: Optional[str] = None, cost_scale: float = 1.0):
+    global _worker_shm, _worker_map, _worker_costs_only
+    # pool workers share the parent's resource tracker, so attaching here does
+    # not take ownership: the parent still unlinks the block when done
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    occupancy = _worker_shm.buf[:rows * cols].toreadonly()
+    _worker_map = GridMap(rows, cols, occupancy=occupancy)
+    if cost_dtype is not None:
+        costs = np.frombuffer(_worker_shm.buf, dtype=cost_dtype, count=rows * cols, offset=rows * cols)
+        _worker_map.set_costs(costs.reshape(rows, cols), cost_scale)
+    _worker_costs_only = costs_only
+
+
+def _solve_one(gmap: GridMap, query: Query, costs_only: bool):
+    start, goal = query
+    path = astar.astar_search(gmap, start, goal)
+    if not costs_only or path is None:
+        return path
+    return float(gmap.g[gmap.index(*goal)])
+
+
+def _solve_task(task: Tuple[int, Query]):
+    i, query = task
+    return i, _solve_one(_worker_map, query, _worker_costs_only)
+
+
+def iter_solve_many(gmap: GridMap, queries: Sequence[Query], workers: Optional[int] = None,
+                    costs_only: bool = False, chunksize: Optional[int] = None) -> Iterator[Tuple[int, object]]:
+    """Yield (query index, result) pairs as the workers finish them (any order).
+
+    A result is the path (list of (row, col)), or its cost when costs_only is
+    set, or None when the goal is unreachable. workers defaults to the number
+    of CPUs; workers=1 answers the queries in this process.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(queries) <= 1:
+        for i, query in enumerate(queries):
+            yield i, _solve_one(gmap, query, costs_only)
+        return
+
+    if chunksize is None:
+        # a few chunks per worker keeps them busy without much IPC overhead
+        chunksize = max(1, len(queries) // (workers * 8))
+
+    costs = gmap.cost_array()
+    layer = costs.tobytes() if costs is not None else b''
+    shm = shared_memory.SharedMemory(create=True, size=gmap.size + len(layer))
+    try:
+        shm.buf[:gmap.size] = gmap.occupancy
+        shm.buf[gmap.size:gmap.size + len(layer)] = layer
+        cost_dtype = costs.dtype.str if costs is not None else None
+        with Pool(workers, initializer=_init_worker,
+                  initargs=(shm.name, gmap.rows, gmap.cols, costs_only, cost_dtype, gmap.cost_scale)) as pool:
+            yield from pool.imap_unordered(_solve_task, enumerate(queries), chunksize)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def solve_many(gmap: GridMap, queries: Sequence[Query], workers: Optional[int] = None,
+               costs_only: bool = False, chunksize: Optional[int] = None) -> List[object]:
+    """Answer every (start, goal) query; results are returned in input order.
+
+    See iter_solve_many for the result format and the meaning of workers.
+    """
+    results: List[object] = [None] * len(queries)
+    for i, result in iter_solve_many(gmap, queries, workers, costs_only, chunksize):
+        results[i] = result
+    return results
@@ -0,0 +1,262 @@
+"""Headless, reproducible benchmark of the planners.
+
+Run from the repository root:
+    python bench.py run --maps random maze rooms --sizes 128 256 512 --output before.json
+    python bench.py run --scen den312d.map.scen --algorithms astar jps --output scen.json
+    python bench.py compare before.json after.json
+
+run searches the same seeded queries with every selected algorithm on
+generated maps (random obstacles at --density, perfect mazes, rooms joined by
+doors) and/or on Moving AI scenario files, and reports per map and algorithm:
+mean expansions, wall time per query (best of --repeat passes), throughput,
+the tracemalloc peak of a search on a fresh copy of the map (masks and search
+scratch included), and one-off setup time (JPS jump table, HPA* graph).
+Results go to a table on stdout and, with --output, to a JSON file; compare
+lines up two such files and flags time and expansion changes beyond
+--threshold.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import astar
+import jps
+import map_gen
+import map_io
+from bidirectional import bidirectional_search
+from grid_map import GridMap
+from hpa import HPAGraph
+
+Pos = Tuple[int, int]
+Query = Tuple[Pos, Pos]
+# solve(start, goal, stats) -> path or None
+Solver = Callable[[Pos, Pos, dict], Optional[List[Pos]]]
+
+RESULTS_VERSION = 1
+
+
+def _astar(gmap: GridMap) -> Solver:
+    return lambda s, t, stats: astar.astar_search(gmap, s, t, stats=stats)
+
+
+def _jps(gmap: GridMap) -> Solver:
+    table = jps.JumpTable(gmap)
+    return lambda s, t, stats: jps.jps_search(gmap, s, t, stats=stats, table=table)
+
+
+def _bidirectional(gmap: GridMap) -> Solver:
+    return lambda s, t, stats: bidirectional_search(gmap, s, t, stats=stats)
+
+
+def _hpa(gmap: GridMap) -> Solver:
+    graph = HPAGraph(gmap)
+    return lambda s, t, stats: graph.search(s, t, stats=stats)
+
+
+# name -> setup(gmap) returning the solver; setup time is reported separately
+ALGORITHMS: Dict[str, Callable[[GridMap], Solver]] = {
+    'astar': _astar,
+    'jps': _jps,
+    'bidirectional': _bidirectional,
+    'hpa': _hpa,
+}
+
+
+def generated_maps(kinds: List[str], sizes: List[int], density: float, seed: int):
+    """(name, gmap, queries=None) for every kind and size; queries are drawn later."""
+    makers = {
+        'random': lambda size: map_gen.random_map(size, size, density, seed),
+        'maze': lambda size: map_gen.maze_map(size + 1, size + 1, seed),
+        'rooms': lambda size: map_gen.rooms_map(size, size, seed=seed),
+    }
+    for kind in kinds:
+        for size in sizes:
+            yield f"{kind}-{size}", makers[kind](size), None
+
+
+def scenario_maps(paths: List[str], limit: int):
+    """(name, gmap, queries) for every .scen file, with up to limit scenarios spread over its buckets."""
+    for path in paths:
+        scenarios = map_io.read_scen(path)
+        if not scenarios:
+            raise ValueError(f"{path}: no scenarios")
+        map_path = os.path.join(os.path.dirname(path), scenarios[0].map_name)
+        if not os.path.exists(map_path):
+            map_path = os.path.join(os.path.dirname(path), os.path.basename(scenarios[0].map_name))
+        gmap = map_io.read_movingai_map(map_path)
+        picked = scenarios[::max(1, len(scenarios) // limit)][:limit]
+        yield os.path.basename(path), gmap, [(s.start, s.goal) for s in picked]
+
+
+def _copy(gmap: GridMap) -> GridMap:
+    return GridMap(gmap.rows, gmap.cols, bytearray(gmap.occupancy))
+
+
+def measure(gmap: GridMap, queries: List[Query], algorithm: str, repeat: int = 3, memory_queries: int = 3) -> dict:
+    """Run the queries with algorithm and return the result record (without the map fields).
+
+    The timed pass over all queries is repeated and the fastest one kept,
+    which filters out most scheduling noise.
+    """
+    setup = ALGORITHMS[algorithm]
+    t0 = time.perf_counter()
+    solve = setup(gmap)
+    t_setup = time.perf_counter() - t0
+
+    expanded = solved = 0
+    total_cost = 0.0
+    for start, goal in queries:
+        stats = {}
+        path = solve(start, goal, stats)
+        expanded += stats.get('expanded', 0)
+        if path is not None:
+            solved += 1
+            total_cost += astar.path_cost(path)
+    elapsed = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for start, goal in queries:
+            solve(start, goal, {})
+        elapsed = min(elapsed, time.perf_counter() - t0)
+
+    # memory on a fresh copy, so first-use allocations (masks, scratch) count too
+    fresh = _copy(gmap)
+    tracemalloc.start()
+    solve = setup(fresh)
+    for start, goal in queries[:memory_queries]:
+        solve(start, goal, {})
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'algorithm': algorithm,
+        'queries': len(queries),
+        'solved': solved,
+        'expanded_mean': expanded / len(queries),
+        'cost_total': round(total_cost, 3),
+        'time_per_query_ms': elapsed / len(queries) * 1000,
+        'queries_per_s': len(queries) / elapsed if elapsed > 0 else float('inf'),
+        'setup_s': t_setup,
+        'peak_bytes': peak,
+    }
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {'commit': commit or None, 'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'system': platform.system()}
+
+
+def run(args) -> dict:
+    # one map in memory at a time
+    maps = itertools.chain(generated_maps(args.maps, args.sizes, args.density, args.seed),
+                           scenario_maps(args.scen, args.queries))
+    results = []
+    print(f"{'map':>16} {'algorithm':>13} {'solved':>7} {'expanded':>10} {'ms/query':>9} {'queries/s':>9} "
+          f"{'peak MB':>8} {'setup (s)':>9}")
+    for name, gmap, queries in maps:
+        if queries is None:
+            queries = map_gen.random_queries(gmap, args.queries, args.seed)
+        if not queries:
+            print(f"{name:>16}  skipped: no queries")
+            continue
+        for algorithm in args.algorithms:
+            record = {'map': name, 'rows': gmap.rows, 'cols': gmap.cols}
+            record.update(measure(gmap, queries, algorithm, args.repeat, args.memory_queries))
+            results.append(record)
+            print(f"{name:>16} {algorithm:>13} {record['solved']:>3}/{record['queries']:<3} "
+                  f"{record['expanded_mean']:>10.0f} {record['time_per_query_ms']:>9.2f} "
+                  f"{record['queries_per_s']:>9.1f} {record['peak_bytes'] / 2 ** 20:>8.1f} {record['setup_s']:>9.3f}")
+    report = {
+        'version': RESULTS_VERSION,
+        'environment': _environment(),
+        'settings': {'seed': args.seed, 'queries': args.queries, 'density': args.density,
+                     'repeat': args.repeat, 'memory_queries': args.memory_queries},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def compare(args) -> int:
+    """Print new/old ratios per (map, algorithm); returns 1 if --fail and something regressed."""
+    reports = []
+    for path in (args.old, args.new):
+        with open(path) as f:
+            report = json.load(f)
+        if report.get('version') != RESULTS_VERSION:
+            raise ValueError(f"{path}: unsupported results version {report.get('version')!r}")
+        reports.append({(r['map'], r['algorithm']): r for r in report['results']})
+    old, new = reports
+    regressed = False
+    print(f"{'map':>16} {'algorithm':>13} {'time':>7} {'expanded':>9} {'peak':>7} {'cost':>7}  note")
+    for key in sorted(old.keys() & new.keys()):
+        a, b = old[key], new[key]
+        ratios = [b[field] / a[field] if a[field] else float('nan')
+                  for field in ('time_per_query_ms', 'expanded_mean', 'peak_bytes', 'cost_total')]
+        notes = []
+        if ratios[0] > 1 + args.threshold:
+            notes.append('slower')
+        elif ratios[0] < 1 - args.threshold:
+            notes.append('faster')
+        if ratios[1] > 1 + args.threshold:
+            notes.append('more expansions')
+        if a['solved'] != b['solved'] or abs(ratios[3] - 1) > 1e-6:
+            notes.append('different results')
+        regressed |= any(note in ('slower', 'more expansions', 'different results') for note in notes)
+        print(f"{key[0]:>16} {key[1]:>13} {ratios[0]:>7.3f} {ratios[1]:>9.3f} {ratios[2]:>7.3f} {ratios[3]:>7.3f}  "
+              f"{', '.join(notes)}")
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f"{key[0]:>16} {key[1]:>13}  only in {args.old if key in old else args.new}")
+    return 1 if args.fail and regressed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='planner benchmark suite')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmark')
+    run_parser.add_argument('--maps', nargs='*', default=['random', 'maze', 'rooms'],
+                            choices=['random', 'maze', 'rooms'], help='generated map kinds (none with --maps alone)')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[128, 256])
+    run_parser.add_argument('--density', type=float, default=0.25, help='obstacle density of random maps')
+    run_parser.add_argument('--scen', nargs='+', default=[], help='Moving AI .scen files (maps are looked up next to them)')
+    run_parser.add_argument('--algorithms', nargs='+', default=['astar', 'jps'], choices=sorted(ALGORITHMS))
+    run_parser.add_argument('--queries', type=int, default=50, help='queries per map')
+    run_parser.add_argument('--repeat', type=int, default=3, help='timed passes over the queries; the fastest counts')
+    run_parser.add_argument('--memory-queries', type=int, default=3, help='queries run under tracemalloc')
+    run_parser.add_argument('--seed', type=int, default=1)
+    run_parser.add_argument('--output', help='write the results as JSON to this file')
+
+    compare_parser = commands.add_parser('compare', help='compare two JSON result files')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='relative change worth flagging')
+    compare_parser.add_argument('--fail', action='store_true', help='exit with status 1 on a regression')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        if args.queries < 1:
+            run_parser.error(f"--queries must be at least 1, got {args.queries}")
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
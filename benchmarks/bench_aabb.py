@@ -0,0 +1,75 @@
+"""Compare the NumPy AABB with the previous per-point Python loops.
+
+Run from the repository root:
+    python benchmarks/bench_aabb.py --points 1000000 5000000
+
+For each cloud size reports the time to build a box with AABB.from_points and
+with the old loop (min/max lists rebuilt for every point), and the time to test
+every point against a box with one points_inside call and with one
+point_inside call per point. The old loops are timed on at most --loop-limit
+points and scaled up, since they take minutes on the full clouds.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ABBB_Class import AABB  # noqa: E402
+
+
+def loop_from_points(points):
+    """The previous AABB.from_points."""
+    min_p = [float('inf'), float('inf'), float('inf')]
+    max_p = [float('-inf'), float('-inf'), float('-inf')]
+    for p in points:
+        min_p = [min(min_p[i], p[i]) for i in range(3)]
+        max_p = [max(max_p[i], p[i]) for i in range(3)]
+    return min_p, max_p
+
+
+def loop_points_inside(box_min, box_max, points):
+    """The previous point_inside, called once per point."""
+    return [all(box_min[i] <= p[i] <= box_max[i] for i in range(3)) for p in points]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AABB benchmark')
+    parser.add_argument('--points', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument('--loop-limit', type=int, default=200_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'points':>9} {'build (s)':>9} {'loop build (s)':>14} {'inside (s)':>10} {'loop inside (s)':>15}")
+    for n in args.points:
+        cloud = rng.normal(scale=10.0, size=(n, 3)).astype(np.float32)
+        query = AABB([-5, -5, -5], [5, 5, 5])
+
+        t0 = time.perf_counter()
+        box = AABB.from_points(cloud)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        mask = query.points_inside(cloud)
+        t_inside = time.perf_counter() - t0
+
+        sample = cloud[:min(n, args.loop_limit)].tolist()
+        scale = n / len(sample)
+        t0 = time.perf_counter()
+        loop_min, loop_max = loop_from_points(sample)
+        t_loop_build = (time.perf_counter() - t0) * scale
+        t0 = time.perf_counter()
+        loop_mask = loop_points_inside(query.min, query.max, sample)
+        t_loop_inside = (time.perf_counter() - t0) * scale
+
+        if n <= args.loop_limit:
+            assert np.allclose(box.min, loop_min) and np.allclose(box.max, loop_max)
+        assert list(mask[:len(sample)]) == loop_mask
+        print(f"{n:>9} {t_build:>9.3f} {t_loop_build:>14.2f} {t_inside:>10.3f} {t_loop_inside:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Throughput of batch.solve_many for a growing number of worker processes.
+
+Run from the repository root:
+    python benchmarks/bench_batch.py --size 512 --queries 400 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch  # noqa: E402
+import map_gen  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='solve_many scaling benchmark')
+    parser.add_argument('--size', type=int, default=512)
+    parser.add_argument('--density', type=float, default=0.25)
+    parser.add_argument('--queries', type=int, default=400)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    gmap = map_gen.random_map(args.size, args.size, args.density, args.seed)
+    queries = map_gen.random_queries(gmap, args.queries, args.seed)
+    print(f"{os.cpu_count()} CPUs, {args.size}x{args.size} map, {args.queries} queries")
+    print(f"{'workers':>7} {'time (s)':>9} {'queries/s':>10} {'speedup':>8}")
+    baseline = None
+    reference = None
+    for workers in args.workers:
+        t0 = time.perf_counter()
+        costs = batch.solve_many(gmap, queries, workers=workers, costs_only=True)
+        elapsed = time.perf_counter() - t0
+        if reference is None:
+            reference = costs
+            baseline = elapsed
+        assert costs == reference, "results differ between worker counts"
+        print(f"{workers:>7} {elapsed:>9.3f} {args.queries / elapsed:>10.1f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare bidirectional A* with unidirectional A* on long cross-map queries.
+
+Run from the repository root:
+    python benchmarks/bench_bidirectional.py --sizes 256 512 --queries 10
+
+Queries go from near one corner to near the opposite one. Reports, per map
+kind and size, the total expansions of A* and of each direction of the
+bidirectional search, the wall times, and the summed path costs (both
+searches are optimal, so these must match).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astar  # noqa: E402
+import map_gen  # noqa: E402
+from bidirectional import bidirectional_search  # noqa: E402
+
+
+def corner_queries(gmap, count, seed):
+    """(start, goal) pairs between free cells in opposite corner regions."""
+    rng = random.Random(seed)
+    span_r = max(1, gmap.rows // 8)
+    span_c = max(1, gmap.cols // 8)
+
+    def free_near(row0, col0):
+        while True:
+            row = row0 + rng.randrange(span_r)
+            col = col0 + rng.randrange(span_c)
+            if not gmap.is_obstacle(row, col):
+                return row, col
+
+    queries = []
+    for i in range(count):
+        a = free_near(0, 0)
+        b = free_near(gmap.rows - span_r, gmap.cols - span_c)
+        if i % 2:
+            # anti-diagonal corners too
+            a = free_near(0, gmap.cols - span_c)
+            b = free_near(gmap.rows - span_r, 0)
+        queries.append((a, b))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bidirectional vs unidirectional A* benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512])
+    parser.add_argument('--queries', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    kinds = {
+        'open': lambda size: map_gen.random_map(size, size, 0.05, args.seed),
+        'dense': lambda size: map_gen.random_map(size, size, 0.3, args.seed),
+        'maze': lambda size: map_gen.maze_map(size + 1, size + 1, args.seed),
+    }
+    print(f"{'map':>5} {'size':>5} {'A* exp':>9} {'fwd exp':>9} {'bwd exp':>9} {'A* (s)':>8} {'bi (s)':>8} {'speedup':>8} {'A* cost':>10} {'bi cost':>10}")
+    for kind, make in kinds.items():
+        for size in args.sizes:
+            gmap = make(size)
+            queries = corner_queries(gmap, args.queries, args.seed)
+
+            a_exp = 0
+            a_cost = 0.0
+            t0 = time.perf_counter()
+            for s, t in queries:
+                stats = {}
+                astar.astar_search(gmap, s, t, stats=stats)
+                a_exp += stats['expanded']
+                a_cost += stats['cost'] or 0.0
+            t_astar = time.perf_counter() - t0
+
+            f_exp = b_exp = 0
+            b_cost = 0.0
+            t0 = time.perf_counter()
+            for s, t in queries:
+                stats = {}
+                bidirectional_search(gmap, s, t, stats=stats)
+                f_exp += stats['expanded_forward']
+                b_exp += stats['expanded_backward']
+                b_cost += stats['cost'] or 0.0
+            t_bi = time.perf_counter() - t0
+
+            print(f"{kind:>5} {size:>5} {a_exp:>9} {f_exp:>9} {b_exp:>9} {t_astar:>8.3f} {t_bi:>8.3f} "
+                  f"{t_astar / t_bi:>7.2f}x {a_cost:>10.1f} {b_cost:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare BVH queries with brute-force box tests.
+
+Run from the repository root:
+    python benchmarks/bench_bvh.py --boxes 10000 100000 1000000 --queries 200
+
+Boxes are scattered over a square world whose area grows with their number
+(constant obstacle density, like a bigger map). For each box count reports the
+BVH build and refit times, and the mean time of a point, box (robot footprint)
+and ray query through the BVH, against one vectorized boxes_intersect_many
+call over all boxes and a Python loop of pairwise boxes_intersect calls. The
+loop is timed on at most --loop-limit boxes and scaled up. Every BVH answer is
+checked against the vectorized brute force.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ABBB_Class import AABB  # noqa: E402
+from bvh import BVH  # noqa: E402
+
+
+def brute_ray(mins, maxs, origin, direction, t_max):
+    """Slab test against every box; returns the sorted indices of the boxes hit."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = (mins - origin) / direction
+        t2 = (maxs - origin) / direction
+    t_enter = np.maximum(np.minimum(t1, t2).max(axis=1), 0.0)
+    t_exit = np.minimum(np.maximum(t1, t2).min(axis=1), t_max)
+    return np.flatnonzero(t_enter <= t_exit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BVH benchmark')
+    parser.add_argument('--boxes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--leaf-size', type=int, default=8)
+    parser.add_argument('--loop-limit', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'boxes':>8} {'build (s)':>9} {'refit (s)':>9} {'point (ms)':>10} {'box (ms)':>8} {'ray (ms)':>8} "
+          f"{'brute (ms)':>10} {'ray brute (ms)':>14} {'loop (ms)':>9}")
+    for n in args.boxes:
+        side = np.sqrt(n) * 10.0
+        lo = rng.uniform(0, side, (n, 2))
+        bounds = np.stack([lo, lo + rng.uniform(0.5, 5.0, (n, 2))], axis=1)
+        mins, maxs = bounds[:, 0], bounds[:, 1]
+
+        t0 = time.perf_counter()
+        tree = BVH(bounds, args.leaf_size)
+        t_build = time.perf_counter() - t0
+        moved = bounds + rng.normal(0, 0.5, (n, 1, 2))
+        t0 = time.perf_counter()
+        tree.refit(moved)
+        t_refit = time.perf_counter() - t0
+        tree.refit(bounds)
+
+        points = rng.uniform(0, side, (args.queries, 2))
+        footprints = [AABB(p, p + 3.0) for p in points]
+        angles = rng.uniform(0, 2 * np.pi, args.queries)
+        directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        ray_length = 50.0
+
+        t0 = time.perf_counter()
+        for p in points:
+            tree.query_point(p)
+        t_point = (time.perf_counter() - t0) / args.queries
+        t0 = time.perf_counter()
+        hits = [tree.query_box(box) for box in footprints]
+        t_box = (time.perf_counter() - t0) / args.queries
+        t0 = time.perf_counter()
+        rays = [tree.query_ray(p, d, ray_length) for p, d in zip(points, directions)]
+        t_ray = (time.perf_counter() - t0) / args.queries
+
+        t0 = time.perf_counter()
+        brute = [np.flatnonzero(box.boxes_intersect_many(bounds)) for box in footprints]
+        t_brute = (time.perf_counter() - t0) / args.queries
+        t0 = time.perf_counter()
+        brute_rays = [brute_ray(mins, maxs, p, d, ray_length) for p, d in zip(points, directions)]
+        t_brute_ray = (time.perf_counter() - t0) / args.queries
+
+        sample = [AABB(b[0], b[1]) for b in bounds[:min(n, args.loop_limit)]]
+        loop_queries = footprints[:10]
+        t0 = time.perf_counter()
+        for box in loop_queries:
+            [i for i, other in enumerate(sample) if box.boxes_intersect(other)]
+        t_loop = (time.perf_counter() - t0) / len(loop_queries) * n / len(sample)
+
+        for got, want in zip(hits, brute):
+            assert np.array_equal(got, want)
+        for got, want in zip(rays, brute_rays):
+            assert np.array_equal(np.sort(got), want)
+        print(f"{n:>8} {t_build:>9.3f} {t_refit:>9.3f} {t_point * 1000:>10.3f} {t_box * 1000:>8.3f} "
+              f"{t_ray * 1000:>8.3f} {t_brute * 1000:>10.2f} {t_brute_ray * 1000:>14.2f} {t_loop * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
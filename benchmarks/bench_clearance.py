@@ -0,0 +1,127 @@
+"""Measure clearance-aware A* against checking the robot footprint at every neighbor.
+
+Run from the repository root:
+    python benchmarks/bench_clearance.py --sizes 256 512 1024 --radius 2.5
+
+For each size x size random map (1% obstacles) reports the time of a full
+distance transform (ClearanceMap build), the mean time to absorb one painted
+or erased cell, and the A* time per expansion for a point robot, for a robot
+of --radius with ClearanceMap masks (min_clearance), and for the same robot
+with the footprint (every cell closer than the radius) checked at each
+neighbor, which is what get_neighbors would have to do. Queries join cells
+that have the clearance; the last column checks both robot searches agree on
+the costs.
+"""
+import argparse
+import heapq
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astar  # noqa: E402
+import map_gen  # noqa: E402
+
+
+def footprint_astar(gmap, start, goal, radius):
+    """A* that checks the disc of cells closer than radius around every neighbor it looks at."""
+    reach = int(math.ceil(radius))
+    disc = [(dr, dc) for dr in range(-reach, reach + 1) for dc in range(-reach, reach + 1)
+            if dr * dr + dc * dc < radius * radius]
+    occ = gmap.occupancy
+    rows, cols = gmap.rows, gmap.cols
+
+    def fits(row, col):
+        for dr, dc in disc:
+            r, c = row + dr, col + dc
+            if not (0 <= r < rows and 0 <= c < cols) or occ[r * cols + c]:
+                return False
+        return True
+
+    masks = gmap.neighbor_masks()
+    move_table = gmap.move_table()
+    g = {start: 0.0}
+    closed = set()
+    heap = [(astar.octile(abs(start[0] - goal[0]), abs(start[1] - goal[1])), 0, start)]
+    count = 1
+    while heap:
+        _, _, current = heapq.heappop(heap)
+        if current in closed:
+            continue
+        if current == goal:
+            return g[current], len(closed) + 1
+        closed.add(current)
+        row, col = current
+        for _, step, dr, dc in move_table[masks[row * cols + col]]:
+            neighbor = (row + dr, col + dc)
+            if neighbor in closed or not fits(*neighbor):
+                continue
+            tentative = g[current] + step
+            if tentative < g.get(neighbor, float('inf')):
+                g[neighbor] = tentative
+                h = astar.octile(abs(neighbor[0] - goal[0]), abs(neighbor[1] - goal[1]))
+                heapq.heappush(heap, (tentative + h, count, neighbor))
+                count += 1
+    return None, len(closed)
+
+
+def per_query(fn, queries):
+    t0 = time.perf_counter()
+    results = [fn(start, goal) for start, goal in queries]
+    return time.perf_counter() - t0, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='clearance benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512, 1024])
+    parser.add_argument('--radius', type=float, default=2.5)
+    parser.add_argument('--queries', type=int, default=10)
+    parser.add_argument('--edits', type=int, default=100, help='cells painted/erased for the update timing')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'build (s)':>9} {'edit (ms)':>9} {'point (us)':>10} {'clearance (us)':>14} "
+          f"{'footprint (us)':>14} {'speedup':>8}  same cost")
+    for size in args.sizes:
+        gmap = map_gen.random_map(size, size, 0.01, args.seed)
+        t0 = time.perf_counter()
+        cmap = gmap.clearance_map()  # the one min_clearance searches use
+        t_build = time.perf_counter() - t0
+
+        rng = random.Random(args.seed)
+        t0 = time.perf_counter()
+        for _ in range(args.edits):
+            row, col = rng.randrange(size), rng.randrange(size)
+            gmap.set_obstacle(row, col, not gmap.is_obstacle(row, col))
+        t_edit = (time.perf_counter() - t0) / args.edits
+
+        roomy = np.argwhere(cmap.distance >= args.radius)
+        picks = roomy[np.random.default_rng(args.seed).integers(len(roomy), size=(args.queries, 2))]
+        queries = [(tuple(map(int, s)), tuple(map(int, t))) for s, t in picks]
+
+        cmap.masks(args.radius)  # built once per radius, like a map's neighbor masks
+        def search(min_clearance):
+            def solve(s, t):
+                stats = {}
+                astar.astar_search(gmap, s, t, min_clearance=min_clearance, stats=stats)
+                return stats['cost'], stats['expanded']
+            return solve
+        t_point, point = per_query(search(0.0), queries)
+        t_clear, clear = per_query(search(args.radius), queries)
+        t_foot, foot = per_query(lambda s, t: footprint_astar(gmap, s, t, args.radius), queries)
+        same = all((a is None) == (b is None) and (a is None or abs(a - b) <= 1e-5 * b + 1e-3)
+                   for (a, _), (b, _) in zip(clear, foot))
+        # microseconds per expansion
+        us_point, us_clear, us_foot = (t / sum(n for _, n in results) * 1e6
+                                       for t, results in ((t_point, point), (t_clear, clear), (t_foot, foot)))
+        print(f"{size:>5} {t_build:>9.3f} {t_edit * 1000:>9.2f} {us_point:>10.2f} {us_clear:>14.2f} "
+              f"{us_foot:>14.2f} {us_foot / us_clear:>7.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
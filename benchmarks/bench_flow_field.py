@@ -0,0 +1,77 @@
+"""Measure one flow field per goal against one A* search per agent.
+
+Run from the repository root:
+    python benchmarks/bench_flow_field.py --sizes 256 512 --agents 100 500
+
+For every size x size map (random 20% obstacles, rooms, maze) --agents agents
+at seeded free cells head to one goal. Reported: the time of one A* search
+per agent, the time to build the goal's FlowField, the time to walk the whole
+fleet to the goal with next_steps() (one gather per step for all agents), and
+whether the first --check agents' field costs match their A* costs.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astar  # noqa: E402
+import map_gen  # noqa: E402
+from flow_field import FlowField  # noqa: E402
+
+
+def maps(size: int, seed: int):
+    yield 'random', map_gen.random_map(size, size, 0.2, seed)
+    yield 'rooms', map_gen.rooms_map(size, size, seed=seed)
+    yield 'maze', map_gen.maze_map(size | 1, size | 1, seed)  # mazes need odd sides
+
+
+def main():
+    parser = argparse.ArgumentParser(description='flow field benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512])
+    parser.add_argument('--agents', type=int, nargs='+', default=[100, 500])
+    parser.add_argument('--check', type=int, default=20, help='agents whose field cost is checked against A*')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'map':>7} {'agents':>6} {'A* (s)':>8} {'field (s)':>9} {'walk (s)':>8} {'speedup':>8}  same cost")
+    for size in args.sizes:
+        for name, gmap in maps(size, args.seed):
+            rng = random.Random(args.seed)
+            goal = map_gen.random_free_cell(gmap, rng)
+            for count in args.agents:
+                starts = [map_gen.random_free_cell(gmap, rng) for _ in range(count)]
+
+                t0 = time.perf_counter()
+                costs = []
+                for start in starts:
+                    stats = {}
+                    astar.astar_search(gmap, start, goal, stats=stats)
+                    costs.append(stats['cost'])
+                t_astar = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                field = FlowField(gmap, goal)
+                t_field = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                fleet = np.array(starts, dtype=np.int32)
+                while True:
+                    moved = field.next_steps(fleet)
+                    if np.array_equal(moved, fleet):
+                        break
+                    fleet = moved
+                t_walk = time.perf_counter() - t0
+
+                same = all((c is None) == np.isinf(field.cost(*s)) and (c is None or abs(field.cost(*s) - c) <= 1e-3 * c + 1e-3)
+                           for s, c in zip(starts[:args.check], costs))
+                print(f"{size:>5} {name:>7} {count:>6} {t_astar:>8.2f} {t_field:>9.3f} {t_walk:>8.3f} "
+                      f"{t_astar / (t_field + t_walk):>7.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Expansions, wall time and path quality for each heuristic and A* weight.
+
+Run from the repository root:
+    python benchmarks/bench_heuristics.py --size 256 --queries 20 --weights 1 1.2 1.5 2 3
+
+Path costs are reported relative to the optimum (octile, weight 1). For the
+admissible heuristics weighted A* guarantees cost <= weight x optimal; the
+'bound' column checks that on every query.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astar  # noqa: E402
+import map_gen  # noqa: E402
+
+
+def run(gmap, queries, heuristic, weight):
+    expanded = 0
+    costs = []
+    t0 = time.perf_counter()
+    for start, goal in queries:
+        stats = {}
+        astar.astar_search(gmap, start, goal, heuristic=heuristic, weight=weight, stats=stats)
+        expanded += stats['expanded']
+        costs.append(stats['cost'])
+    return expanded, time.perf_counter() - t0, costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='heuristic / weighted A* benchmark')
+    parser.add_argument('--size', type=int, default=256)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--weights', type=float, nargs='+', default=[1.0, 1.2, 1.5, 2.0, 3.0])
+    parser.add_argument('--heuristics', nargs='+', default=sorted(astar.HEURISTICS), choices=sorted(astar.HEURISTICS))
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    maps = {
+        'random': map_gen.random_map(args.size, args.size, 0.25, args.seed),
+        'maze': map_gen.maze_map(args.size + 1, args.size + 1, args.seed),
+    }
+    print(f"{'map':>6} {'heuristic':>10} {'w':>4} {'expanded':>9} {'time (s)':>9} {'cost/opt':>9} {'worst':>6} {'bound':>6}")
+    for name, gmap in maps.items():
+        queries = map_gen.random_queries(gmap, args.queries, args.seed)
+        _, _, optimal = run(gmap, queries, 'octile', 1.0)
+        for heuristic in args.heuristics:
+            for weight in args.weights:
+                expanded, elapsed, costs = run(gmap, queries, heuristic, weight)
+                pairs = [(c, o) for c, o in zip(costs, optimal) if o]
+                ratio = sum(c for c, _ in pairs) / sum(o for _, o in pairs)
+                worst = max(c / o for c, o in pairs)
+                if heuristic in astar.ADMISSIBLE:
+                    bound = 'ok' if worst <= weight + 1e-4 else 'FAIL'
+                else:
+                    bound = '-'
+                print(f"{name:>6} {heuristic:>10} {weight:>4.1f} {expanded:>9} {elapsed:>9.3f} {ratio:>9.4f} {worst:>6.3f} {bound:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Measure HPA* build, persistence, update and query costs against flat A*.
+
+Run from the repository root:
+    python benchmarks/bench_hpa.py --sizes 256 512 --cluster-size 32 --queries 20
+
+Per map kind and size reports the one-off build time and abstract graph size,
+save/load times and file size, the time to absorb a single obstacle edit, the
+mean time per query with refine=False (abstract waypoints only) and with
+refine=True (full cell path), the mean time of a flat astar_search on the same
+queries, and the mean and worst path cost relative to the optimum.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astar  # noqa: E402
+import map_gen  # noqa: E402
+from hpa import HPAGraph  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HPA* benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512])
+    parser.add_argument('--cluster-size', type=int, default=32)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    kinds = {
+        'open': lambda size: map_gen.random_map(size, size, 0.05, args.seed),
+        'dense': lambda size: map_gen.random_map(size, size, 0.3, args.seed),
+        'maze': lambda size: map_gen.maze_map(size + 1, size + 1, args.seed),
+    }
+    print(f"{'map':>5} {'size':>5} {'build (s)':>9} {'nodes':>7} {'save (s)':>8} {'load (s)':>8} {'KB':>7} "
+          f"{'edit (ms)':>9} {'abs (ms)':>8} {'path (ms)':>9} {'A* (ms)':>8} {'cost':>6} {'worst':>6}")
+    for kind, make in kinds.items():
+        for size in args.sizes:
+            gmap = make(size)
+            queries = map_gen.random_queries(gmap, args.queries, args.seed)
+
+            t0 = time.perf_counter()
+            graph = HPAGraph(gmap, args.cluster_size)
+            t_build = time.perf_counter() - t0
+
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'graph.hpa')
+                t0 = time.perf_counter()
+                graph.save(path)
+                t_save = time.perf_counter() - t0
+                size_kb = os.path.getsize(path) // 1024
+                graph.detach()
+                t0 = time.perf_counter()
+                graph = HPAGraph.load(path, gmap)
+                t_load = time.perf_counter() - t0
+
+            row, col = size // 2, size // 2
+            gmap.set_obstacle(row, col, not gmap.is_obstacle(row, col))
+            t0 = time.perf_counter()
+            graph.update()
+            t_edit = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            for s, t in queries:
+                graph.search(s, t, refine=False)
+            t_abstract = (time.perf_counter() - t0) / len(queries)
+
+            t0 = time.perf_counter()
+            paths = [graph.search(s, t) for s, t in queries]
+            t_refined = (time.perf_counter() - t0) / len(queries)
+
+            t0 = time.perf_counter()
+            optimal = [astar.astar_search(gmap, s, t) for s, t in queries]
+            t_astar = (time.perf_counter() - t0) / len(queries)
+
+            ratios = [astar.path_cost(p) / astar.path_cost(o) for p, o in zip(paths, optimal)
+                      if o is not None and len(o) > 1]
+            graph.detach()
+            print(f"{kind:>5} {size:>5} {t_build:>9.2f} {graph.num_nodes():>7} {t_save:>8.3f} {t_load:>8.3f} {size_kb:>7} "
+                  f"{t_edit * 1000:>9.1f} {t_abstract * 1000:>8.1f} {t_refined * 1000:>9.1f} {t_astar * 1000:>8.1f} "
+                  f"{sum(ratios) / len(ratios):>6.3f} {max(ratios):>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
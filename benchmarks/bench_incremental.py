@@ -0,0 +1,79 @@
+"""Compare incremental replanning (D* Lite) with searching from scratch (A*).
+
+Run from the repository root:
+    python benchmarks/bench_incremental.py --sizes 128 256 --steps 30
+
+Simulates a robot driving from one corner of a random map to the other: at
+every step it advances a few cells along its current path, then a few
+obstacles are painted on the path ahead (cells it has not reached yet), and a
+new path is planned. Reports the expansions and wall time of the first plan
+and of all the replans for both planners, and the summed replanned costs
+(both are optimal, so these must match up to float32 rounding in A*).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astar  # noqa: E402
+import map_gen  # noqa: E402
+from dstar_lite import DStarLite  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='D* Lite vs A* replanning benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[128, 256])
+    parser.add_argument('--density', type=float, default=0.2)
+    parser.add_argument('--steps', type=int, default=30, help='replans per run')
+    parser.add_argument('--advance', type=int, default=3, help='cells the robot moves per step')
+    parser.add_argument('--edits', type=int, default=3, help='obstacles painted per step')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'first exp':>9} {'D* exp':>8} {'A* exp':>9} {'D* (s)':>8} {'A* (s)':>8} {'speedup':>8} {'D* cost':>9} {'A* cost':>9}")
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        gmap = map_gen.random_map(size, size, args.density, args.seed)
+        start, goal = (0, 0), (size - 1, size - 1)
+        gmap.set_obstacle(*start, blocked=False)
+        gmap.set_obstacle(*goal, blocked=False)
+
+        planner = DStarLite(gmap, start, goal)
+        path = planner.plan()
+        first = planner.expanded
+        d_exp = a_exp = 0
+        d_time = a_time = 0.0
+        d_cost = a_cost = 0.0
+        for _ in range(args.steps):
+            if path is None or len(path) <= args.advance + 1:
+                break
+            start = path[args.advance]
+            ahead = path[args.advance + 1:-1]
+            for cell in rng.sample(ahead, min(args.edits, len(ahead))):
+                gmap.set_obstacle(*cell)
+
+            t0 = time.perf_counter()
+            planner.move_start(start)
+            path = planner.plan()
+            d_time += time.perf_counter() - t0
+            d_exp += planner.expanded
+
+            stats = {}
+            t0 = time.perf_counter()
+            astar.astar_search(gmap, start, goal, stats=stats)
+            a_time += time.perf_counter() - t0
+            a_exp += stats['expanded']
+
+            if path is not None:
+                d_cost += planner.cost()
+                a_cost += stats['cost']
+        planner.detach()
+        print(f"{size:>5} {first:>9} {d_exp:>8} {a_exp:>9} {d_time:>8.3f} {a_time:>8.3f} "
+              f"{a_time / d_time:>7.1f}x {d_cost:>9.1f} {a_cost:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
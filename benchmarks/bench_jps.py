@@ -0,0 +1,67 @@
+"""Compare Jump Point Search with A* on open and maze-like maps.
+
+Run from the repository root:
+    python benchmarks/bench_jps.py --sizes 128 256 512 --queries 20
+
+Reports, per map kind and size, the total expansions and wall time of each
+search over the same random queries, the one-off JumpTable build time, and
+the summed path costs (both searches are optimal, so these must match).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astar  # noqa: E402
+import jps  # noqa: E402
+import map_gen  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JPS vs A* benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[128, 256, 512])
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    kinds = {
+        'open': lambda size: map_gen.random_map(size, size, 0.05, args.seed),
+        'maze': lambda size: map_gen.maze_map(size + 1, size + 1, args.seed),
+    }
+    print(f"{'map':>5} {'size':>5} {'A* exp':>9} {'JPS exp':>8} {'A* (s)':>8} {'JPS (s)':>8} {'speedup':>8} {'table (s)':>9} {'A* cost':>9} {'JPS cost':>9}")
+    for kind, make in kinds.items():
+        for size in args.sizes:
+            gmap = make(size)
+            queries = map_gen.random_queries(gmap, args.queries, args.seed)
+
+            a_exp = 0
+            t0 = time.perf_counter()
+            a_paths = []
+            for s, t in queries:
+                stats = {}
+                a_paths.append(astar.astar_search(gmap, s, t, stats=stats))
+                a_exp += stats['expanded']
+            t_astar = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            table = jps.JumpTable(gmap)
+            t_table = time.perf_counter() - t0
+            j_exp = 0
+            t0 = time.perf_counter()
+            j_paths = []
+            for s, t in queries:
+                stats = {}
+                j_paths.append(jps.jps_search(gmap, s, t, stats, table))
+                j_exp += stats['expanded']
+            t_jps = time.perf_counter() - t0
+
+            a_cost = sum(astar.path_cost(p) for p in a_paths if p)
+            j_cost = sum(astar.path_cost(p) for p in j_paths if p)
+            print(f"{kind:>5} {size:>5} {a_exp:>9} {j_exp:>8} {t_astar:>8.3f} {t_jps:>8.3f} "
+                  f"{t_astar / t_jps:>7.1f}x {t_table:>9.3f} {a_cost:>9.1f} {j_cost:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
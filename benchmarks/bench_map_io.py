@@ -0,0 +1,76 @@
+"""Measure map file sizes and save/load times.
+
+Run from the repository root:
+    python benchmarks/bench_map_io.py --sizes 1024 4096 16384
+
+For each random size x size map (20% obstacles, plus one float32 cost layer)
+reports file size and save/load times for the bit-packed .gmap format and the
+one-byte-per-cell (memory-mapped) variant, the time to read 1000 random cells
+right after opening the mapped file, and save/load times of the Moving AI text
+format. Files go to a temporary directory.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import map_gen  # noqa: E402
+import map_io  # noqa: E402
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='map file benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1024, 4096, 16384])
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'packed MB':>9} {'save (s)':>8} {'load (s)':>8} {'raw MB':>7} {'save (s)':>8} "
+          f"{'load (ms)':>9} {'1k reads (ms)':>13} {'.map save (s)':>13} {'.map load (s)':>13}")
+    for size in args.sizes:
+        gmap = map_gen.random_map(size, size, 0.2, args.seed)
+        layers = {'terrain': np.ones((size, size), dtype=np.float32)}
+        rng = random.Random(args.seed)
+        cells = [(rng.randrange(size), rng.randrange(size)) for _ in range(1000)]
+        with tempfile.TemporaryDirectory() as tmp:
+            packed_path = os.path.join(tmp, 'packed.gmap')
+            raw_path = os.path.join(tmp, 'raw.gmap')
+            text_path = os.path.join(tmp, 'map.map')
+
+            _, t_save_packed = timed(map_io.save_map, packed_path, gmap, layers=layers)
+            loaded, t_load_packed = timed(map_io.load_map, packed_path)
+            assert loaded.gmap.occupancy == gmap.occupancy
+            del loaded
+
+            _, t_save_raw = timed(map_io.save_map, raw_path, gmap, layers=layers, packed=False)
+            loaded, t_load_raw = timed(map_io.load_map, raw_path)
+            _, t_reads = timed(lambda: [loaded.gmap.is_obstacle(r, c) for r, c in cells])
+            assert [loaded.gmap.is_obstacle(r, c) for r, c in cells] == [gmap.is_obstacle(r, c) for r, c in cells]
+            del loaded
+
+            _, t_save_text = timed(map_io.write_movingai_map, text_path, gmap)
+            text_map, t_load_text = timed(map_io.read_movingai_map, text_path)
+            assert text_map.occupancy == gmap.occupancy
+
+            # the cost layer takes 4 bytes per cell in both files; report the occupancy part
+            layer_mb = size * size * 4 / 2 ** 20
+            packed_mb = os.path.getsize(packed_path) / 2 ** 20 - layer_mb
+            raw_mb = os.path.getsize(raw_path) / 2 ** 20 - layer_mb
+        print(f"{size:>6} {packed_mb:>9.1f} {t_save_packed:>8.3f} {t_load_packed:>8.3f} {raw_mb:>7.1f} "
+              f"{t_save_raw:>8.3f} {t_load_raw * 1000:>9.2f} {t_reads * 1000:>13.2f} "
+              f"{t_save_text:>13.3f} {t_load_text:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark the heap-based open set of astar_search against the old set scan.
+
+Run from the repository root:
+    python benchmarks/bench_open_set.py --sizes 100 200 300 --density 0.1
+
+Both searches run headless (win=None) on the same random Cell grids. The
+set-scan reference below is the previous astar_search loop with its
+`min(open_set, key=...)` selection; it breaks (f, h) ties by insertion order
+just like the heap does. The heap search keeps float32 g-scores, so where
+several paths have the same cost it may settle on a different one; the path
+costs must match.
+"""
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+
+def load_visual():
+    # Visual_A*.py is not a valid module name, so load it by path
+    spec = importlib.util.spec_from_file_location("visual_astar", os.path.join(ROOT, "Visual_A*.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_grid(visual, size, density, seed):
+    rng = random.Random(seed)
+    grid, _, _ = visual.create_grid(size, size, size, size)
+    for row in grid:
+        for cell in row:
+            if rng.random() < density:
+                cell.make_clicked()
+    # a wall down the middle with a gap in the top row makes the search flood
+    # most of the left half instead of running straight at the goal
+    for r in range(1, size):
+        grid[r][size // 2].make_clicked()
+    grid[0][size // 2].reset()
+    start = grid[size // 2][0]
+    goal = grid[size // 2][size - 1]
+    start.reset()
+    goal.reset()
+    return grid, start, goal
+
+
+def set_scan_astar(visual, grid, start, goal):
+    """The pre-heap astar_search loop, without drawing or printing."""
+    seq = 0
+    start.g = 0
+    start.h = start.h_cost(goal)
+    start.f = start.g + start.h
+    start.seq = seq
+    open_set = {start}
+    closed_set = set()
+    while open_set:
+        current = min(open_set, key=lambda n: (n.f, n.h, n.seq))
+        if current == goal:
+            return visual.reconstruct_path(current)
+        open_set.remove(current)
+        closed_set.add(current)
+        for neighbor in visual.get_neighbors(grid, current):
+            if neighbor in closed_set:
+                continue
+            tentative_g = current.g + current.g_cost(neighbor)
+            if neighbor not in open_set:
+                open_set.add(neighbor)
+                neighbor.h = neighbor.h_cost(goal)
+            elif tentative_g >= neighbor.g:
+                continue
+            neighbor.parent = current
+            neighbor.g = tentative_g
+            neighbor.f = neighbor.g + neighbor.h
+            seq += 1
+            neighbor.seq = seq
+    return None
+
+
+def path_cost(path):
+    if not path:
+        return None
+    return round(sum(a.g_cost(b) for a, b in zip(path, path[1:])), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='open set benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 200, 300])
+    parser.add_argument('--density', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    visual = load_visual()
+    print(f"{'size':>6} {'set scan (s)':>13} {'heap (s)':>10} {'speedup':>8}  same cost")
+    for size in args.sizes:
+        grid, start, goal = make_grid(visual, size, args.density, args.seed)
+        t0 = time.perf_counter()
+        ref = set_scan_astar(visual, grid, start, goal)
+        t_scan = time.perf_counter() - t0
+
+        grid, start, goal = make_grid(visual, size, args.density, args.seed)
+        t0 = time.perf_counter()
+        path = visual.astar_search(grid, start, goal)
+        t_heap = time.perf_counter() - t0
+
+        same = path_cost(ref) == path_cost(path)
+        print(f"{size:>6} {t_scan:>13.3f} {t_heap:>10.3f} {t_scan / t_heap:>7.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
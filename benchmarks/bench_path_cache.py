@@ -0,0 +1,98 @@
+"""Measure PathCache on a repeated, overlapping query stream with occasional edits.
+
+Run from the repository root:
+    python benchmarks/bench_path_cache.py --sizes 256 512 --queries 2000 --capacity 256
+
+On each size x size random map (20% obstacles) a stream of --queries queries
+mixes trips between --hubs fixed locations (hub pairs drawn with a Zipf-like
+skew) with agents replanning from the middle of a route they were given
+earlier to its goal. Every --edit-every queries one random cell is painted or
+erased. The stream is answered by astar_search alone and by a PathCache;
+reported are both total times, the speedup, the cache counters (exact and
+subpath hits, misses, evictions, entries invalidated by edits), and whether
+every cached answer cost the same as the fresh search.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astar  # noqa: E402
+import map_gen  # noqa: E402
+from path_cache import PathCache  # noqa: E402
+
+
+def workload(gmap, count: int, hubs: int, edit_every: int, seed: int):
+    """[(start, goal, cell to toggle or None)]; replans start somewhere on a route answered earlier."""
+    rng = random.Random(seed)
+    places = [map_gen.random_free_cell(gmap, rng) for _ in range(hubs)]
+    weights = [1.0 / (i + 1) for i in range(hubs)]
+    routes = {}
+    stream = []
+    for i in range(count):
+        edit = None
+        if edit_every and i % edit_every == edit_every - 1:
+            edit = (rng.randrange(gmap.rows), rng.randrange(gmap.cols))
+        if routes and rng.random() < 0.4:
+            (start, goal), path = rng.choice(list(routes.items()))
+            stream.append((path[rng.randrange(len(path))], goal, edit))
+        else:
+            start, goal = rng.choices(places, weights, k=2)
+            stream.append((start, goal, edit))
+            if (start, goal) not in routes and len(routes) < 4 * hubs:
+                path = astar.astar_search(gmap, start, goal)
+                if path:
+                    routes[(start, goal)] = path
+    return stream
+
+
+def replay(gmap, stream, solve):
+    edited = []
+    results = []
+    t0 = time.perf_counter()
+    for start, goal, edit in stream:
+        if edit is not None and edit not in (start, goal):
+            gmap.set_obstacle(*edit, not gmap.is_obstacle(*edit))
+            edited.append(edit)
+        results.append(solve(start, goal))
+    elapsed = time.perf_counter() - t0
+    for row, col in reversed(edited):  # put the map back for the next pass
+        gmap.set_obstacle(row, col, not gmap.is_obstacle(row, col))
+    return elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='path cache benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--hubs', type=int, default=40)
+    parser.add_argument('--capacity', type=int, default=256)
+    parser.add_argument('--edit-every', type=int, default=20, help='queries between obstacle edits (0: none)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'A* (s)':>8} {'cached (s)':>10} {'speedup':>8} {'hits':>6} {'subpath':>7} {'misses':>6} "
+          f"{'evicted':>7} {'invalid':>7}  same cost")
+    for size in args.sizes:
+        gmap = map_gen.random_map(size, size, 0.2, args.seed)
+        stream = workload(gmap, args.queries, args.hubs, args.edit_every, args.seed)
+
+        t_astar, fresh = replay(gmap, stream, lambda s, t: astar.astar_search(gmap, s, t))
+        cache = PathCache(gmap, capacity=args.capacity)
+        t_cache, cached = replay(gmap, stream, cache.path)
+        cache.detach()
+
+        same = True
+        for a, b in zip(fresh, cached):
+            if (a is None) != (b is None) or (a is not None and abs(astar.path_cost(a) - astar.path_cost(b)) > 1e-6):
+                same = False
+        stats = cache.stats()
+        print(f"{size:>5} {t_astar:>8.2f} {t_cache:>10.2f} {t_astar / t_cache:>7.1f}x {stats['hits']:>6} "
+              f"{stats['subpath_hits']:>7} {stats['misses']:>6} {stats['evictions']:>7} {stats['invalidations']:>7}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Time bulk obstacle rasterization against per-cell set_obstacle calls.
+
+Run from the repository root:
+    python benchmarks/bench_rasterize.py --size 2048 --boxes 10000 100000
+
+Boxes (1-8 cells a side) and point clouds are scattered over a size x size
+map. Per count reports the time of rasterize_boxes given an (M, 2, 2) array
+and given a list of AABBs, with --inflate, and of rasterize_points, against a
+loop calling set_obstacle once per covered cell (the way mouse painting writes
+the map). The loop is timed on at most --loop-limit boxes and scaled up; its
+result is checked against the vectorized one.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ABBB_Class import AABB  # noqa: E402
+from grid_map import GridMap  # noqa: E402
+from rasterize import rasterize_boxes, rasterize_points  # noqa: E402
+
+
+def loop_boxes(gmap, bounds):
+    """One set_obstacle call per cell of every box."""
+    for lo, hi in bounds:
+        r0, c0 = max(int(np.floor(lo[0])), 0), max(int(np.floor(lo[1])), 0)
+        r1, c1 = min(int(np.ceil(hi[0])), gmap.rows), min(int(np.ceil(hi[1])), gmap.cols)
+        for r in range(r0, r1):
+            for c in range(c0, c1):
+                gmap.set_obstacle(r, c)
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='rasterization benchmark')
+    parser.add_argument('--size', type=int, default=2048)
+    parser.add_argument('--boxes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--inflate', type=float, default=3.0)
+    parser.add_argument('--loop-limit', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    size = args.size
+    print(f"{'boxes':>7} {'array (s)':>9} {'AABBs (s)':>9} {'inflated (s)':>12} {'points (s)':>10} "
+          f"{'loop (s)':>8} {'blocked %':>9}")
+    for n in args.boxes:
+        corners = rng.uniform(0, size, (n, 2))
+        bounds = np.stack([corners, corners + rng.uniform(1, 8, (n, 2))], axis=1)
+        boxes = [AABB(lo, hi) for lo, hi in bounds]
+        cloud = rng.uniform(0, size, (n * 10, 3)).astype(np.float32)
+
+        gmap = GridMap(size, size)
+        gmap.neighbor_masks()
+        t_array = timed(rasterize_boxes, gmap, bounds)
+        blocked = gmap.occupancy_array().mean() * 100
+        t_aabbs = timed(rasterize_boxes, GridMap(size, size), boxes)
+        t_inflated = timed(rasterize_boxes, GridMap(size, size), bounds, inflate=args.inflate)
+        t_points = timed(rasterize_points, GridMap(size, size), cloud)
+
+        sample = bounds[:min(n, args.loop_limit)]
+        looped = GridMap(size, size)
+        looped.neighbor_masks()  # set_obstacle keeps masks up to date, as in the visualizer
+        t_loop = timed(loop_boxes, looped, sample) * n / len(sample)
+        reference = GridMap(size, size)
+        rasterize_boxes(reference, sample)
+        assert looped.occupancy == reference.occupancy
+
+        print(f"{n:>7} {t_array:>9.3f} {t_aabbs:>9.3f} {t_inflated:>12.3f} {t_points:>10.3f} "
+              f"{t_loop:>8.2f} {blocked:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compare drawing a replay frame as one scaled image with one rectangle per Cell.
+
+Run from the repository root:
+    python benchmarks/bench_replay.py --sizes 70 200 400
+
+For each size x size random map (20% obstacles) an A* search from the top-left
+to the bottom-right corner runs with a trace attached; the table shows the
+search time with and without the trace, the trace size, and the time to draw
+a replay frame onto an 800x600 surface: with Replay.render (surfarray + one
+scaled blit) and with Cell.draw for every cell, as draw_grid does. Frames are
+taken at evenly spaced steps of the replay. Runs headless (SDL dummy driver).
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import pygame  # noqa: E402
+
+import astar  # noqa: E402
+import map_gen  # noqa: E402
+from instrument import SearchProbe, TraceBuffer  # noqa: E402
+from replay import PALETTE, Replay  # noqa: E402
+
+WIDTH, HEIGHT = 800, 600
+
+
+def load_visual():
+    # Visual_A*.py is not a valid module name, so load it by path
+    spec = importlib.util.spec_from_file_location("visual_astar", os.path.join(ROOT, "Visual_A*.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description='replay rendering benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[70, 200, 400])
+    parser.add_argument('--frames', type=int, default=20, help='frames drawn per method')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    visual = load_visual()
+    pygame.init()
+    win = pygame.Surface((WIDTH, HEIGHT))
+    print(f"{'size':>5} {'expanded':>8} {'search (ms)':>11} {'traced (ms)':>11} {'trace KB':>8} "
+          f"{'rects (ms)':>10} {'blit (ms)':>9} {'speedup':>8}")
+    for size in args.sizes:
+        gmap = map_gen.random_map(size, size, 0.2, args.seed)
+        start, goal = (0, 0), (size - 1, size - 1)
+        gmap.set_obstacle(*start, False)
+        gmap.set_obstacle(*goal, False)
+
+        t0 = time.perf_counter()
+        astar.astar_search(gmap, start, goal)
+        t_search = time.perf_counter() - t0
+        probe = SearchProbe(TraceBuffer(9 * size * size + 1, size, size))
+        t0 = time.perf_counter()
+        path = astar.astar_search(gmap, start, goal, probe=probe)
+        t_traced = time.perf_counter() - t0
+        events = probe.trace.events()
+        replay = Replay(events, gmap, start, goal, path)
+        steps = np.linspace(0, replay.steps, args.frames).astype(int)
+
+        rect = pygame.Rect(0, 0, size * (WIDTH // size), size * (HEIGHT // size))
+        t0 = time.perf_counter()
+        for step in steps:
+            replay.render(win, step, rect)
+        t_blit = (time.perf_counter() - t0) / len(steps)
+
+        grid, _, _ = visual.create_grid(size, size, WIDTH, HEIGHT, gmap)
+        cells = [node for row in grid for node in row]
+        t_rects = 0.0
+        for step in steps:
+            colors = [tuple(color) for color in PALETTE[replay.frame(step)].reshape(-1, 3).tolist()]
+            for node, color in zip(cells, colors):
+                node.color = color
+            t0 = time.perf_counter()
+            for node in cells:
+                node.draw(win)
+            t_rects += time.perf_counter() - t0
+        t_rects /= len(steps)
+
+        print(f"{size:>5} {probe.expanded:>8} {t_search * 1000:>11.1f} {t_traced * 1000:>11.1f} "
+              f"{events.nbytes / 1024:>8.1f} {t_rects * 1000:>10.2f} {t_blit * 1000:>9.2f} {t_rects / t_blit:>7.1f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Measure A* on maps with a terrain cost layer against the binary map.
+
+Run from the repository root:
+    python benchmarks/bench_terrain.py --sizes 256 512 --queries 30
+
+Every size x size random map (20% obstacles) is searched with the same seeded
+queries, first without a cost layer and then with:
+  uniform   a float32 layer of 1.0 everywhere (the price of reading the layer)
+  float32   patches of cost 1-5 (16x16 cells each) with +-10% noise
+  uint8     the same terrain in one byte per cell, scale 0.1
+Reported per case: mean expansions, wall time per query (best of --repeat
+passes) relative to the binary map, mean path cost, layer size, and whether
+the first --check queries cost the same as a search without heuristic
+(Dijkstra), i.e. the scaled heuristic kept A* optimal.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astar  # noqa: E402
+import map_gen  # noqa: E402
+
+
+def terrain(size: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    patches = rng.uniform(1.0, 5.0, size=(size // 16 + 1, size // 16 + 1))
+    layer = np.kron(patches, np.ones((16, 16)))[:size, :size]
+    return (layer * rng.uniform(0.9, 1.1, size=(size, size))).astype(np.float32)
+
+
+def run(gmap, queries, repeat: int, check: int):
+    expanded = 0
+    costs = []
+    for start, goal in queries:
+        stats = {}
+        astar.astar_search(gmap, start, goal, stats=stats)
+        expanded += stats['expanded']
+        if stats['cost'] is not None:
+            costs.append(stats['cost'])
+    elapsed = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for start, goal in queries:
+            astar.astar_search(gmap, start, goal)
+        elapsed = min(elapsed, time.perf_counter() - t0)
+    optimal = True
+    for start, goal in queries[:check]:
+        a, d = {}, {}
+        astar.astar_search(gmap, start, goal, stats=a)
+        astar.astar_search(gmap, start, goal, heuristic=lambda dr, dc: 0.0, stats=d)
+        if (a['cost'] is None) != (d['cost'] is None) or (a['cost'] is not None and abs(a['cost'] - d['cost']) > 1e-4 * d['cost']):
+            optimal = False
+    return expanded / len(queries), elapsed / len(queries), float(np.mean(costs)) if costs else float('nan'), optimal
+
+
+def main():
+    parser = argparse.ArgumentParser(description='terrain cost layer benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512])
+    parser.add_argument('--queries', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=3, help='timed passes over the queries; the fastest counts')
+    parser.add_argument('--check', type=int, default=3, help='queries checked against Dijkstra')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'layer':>8} {'expanded':>9} {'ms/query':>9} {'vs binary':>9} {'mean cost':>9} "
+          f"{'layer MB':>8}  optimal")
+    for size in args.sizes:
+        gmap = map_gen.random_map(size, size, 0.2, args.seed)
+        queries = map_gen.random_queries(gmap, args.queries, args.seed)
+        layer = terrain(size, args.seed)
+        cases = [
+            ('binary', None, 1.0),
+            ('uniform', np.ones((size, size), dtype=np.float32), 1.0),
+            ('float32', layer, 1.0),
+            ('uint8', np.round(layer * 10).astype(np.uint8), 0.1),
+        ]
+        baseline = None
+        for name, costs, scale in cases:
+            gmap.set_costs(costs, scale)
+            expanded, per_query, cost, optimal = run(gmap, queries, args.repeat, args.check)
+            baseline = baseline or per_query
+            layer_mb = costs.nbytes / 2 ** 20 if costs is not None else 0.0
+            print(f"{size:>5} {name:>8} {expanded:>9.0f} {per_query * 1000:>9.2f} {per_query / baseline:>8.2f}x "
+                  f"{cost:>9.1f} {layer_mb:>8.2f}  {optimal}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compare A*, A* + string pulling, Theta* and Lazy Theta* paths.
+
+Run from the repository root:
+    python benchmarks/bench_theta.py --sizes 256 512 --queries 30
+
+On each size x size random map (--density obstacles) the same seeded queries
+are answered by every method. Reported per method: time per query, mean
+expansions, line-of-sight checks per query, mean number of waypoints handed
+to a controller (every cell for plain A*), and the mean Euclidean path length
+relative to plain A*.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import astar  # noqa: E402
+import map_gen  # noqa: E402
+import theta_star  # noqa: E402
+
+
+def _astar(gmap, start, goal, stats):
+    path = astar.astar_search(gmap, start, goal, stats=stats)
+    return None if path is None else np.array(path, dtype=np.int32)
+
+
+def _smoothed(gmap, start, goal, stats):
+    path = astar.astar_search(gmap, start, goal, stats=stats)
+    if path is None:
+        return None
+    stats['los_checks'] = max(len(path) - 2, 0)  # one per cell after the first two
+    return theta_star.smooth_path(gmap, path)
+
+
+METHODS = {
+    'astar': _astar,
+    'astar+smooth': _smoothed,
+    'theta': lambda gmap, s, t, stats: theta_star.theta_star_search(gmap, s, t, lazy=False, stats=stats),
+    'lazy theta': lambda gmap, s, t, stats: theta_star.theta_star_search(gmap, s, t, lazy=True, stats=stats),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='any-angle path benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512])
+    parser.add_argument('--density', type=float, default=0.2)
+    parser.add_argument('--queries', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'method':>13} {'ms/query':>9} {'expanded':>9} {'LOS checks':>10} {'waypoints':>9} "
+          f"{'length':>8}")
+    for size in args.sizes:
+        gmap = map_gen.random_map(size, size, args.density, args.seed)
+        queries = map_gen.random_queries(gmap, args.queries, args.seed)
+        baseline = None
+        for name, method in METHODS.items():
+            expanded = checks = points = 0
+            lengths = []
+            t0 = time.perf_counter()
+            for start, goal in queries:
+                stats = {}
+                path = method(gmap, start, goal, stats)
+                expanded += stats['expanded']
+                checks += stats.get('los_checks', 0)
+                if path is not None:
+                    points += len(path)
+                    lengths.append(theta_star.waypoint_cost(path))
+            per_query = (time.perf_counter() - t0) / len(queries)
+            length = float(np.mean(lengths)) if lengths else float('nan')
+            baseline = baseline or length
+            print(f"{size:>5} {name:>13} {per_query * 1000:>9.2f} {expanded / len(queries):>9.0f} "
+                  f"{checks / len(queries):>10.0f} {points / max(len(lengths), 1):>9.1f} {length / baseline:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Measure sparse voxel maps and 26-connected A* on city-like point clouds.
+
+Run from the repository root:
+    python benchmarks/bench_voxel.py --sizes 256 512 --buildings 60 --queries 10
+
+Each scene is a size^3 volume (1 unit voxels) holding a LiDAR-like cloud: the
+ground plane and the walls and roofs of --buildings random box buildings,
+about two points per voxel of surface. Reported per scene: points, occupied
+voxels, VoxelMap.from_points time, the memory of the brick hash against a
+dense byte grid of the volume, and for --queries random queries between free
+voxels above the ground the mean time, expansions, visited voxels (the size
+of the search's dicts) and how many found a path within --max-expansions.
+--inflate repeats the scene with obstacles grown by that radius.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ABBB_Class import AABB  # noqa: E402
+from voxel import VoxelMap, voxel_astar  # noqa: E402
+
+
+def city_cloud(size: int, buildings: int, seed: int) -> np.ndarray:
+    """(N, 3) float32 points on the ground and on the surfaces of random buildings."""
+    rng = np.random.default_rng(seed)
+    parts = [np.column_stack([rng.uniform(0, size, (2 * size * size, 2)), rng.uniform(0, 0.5, 2 * size * size)])]
+    for _ in range(buildings):
+        w, d = rng.uniform(size / 40, size / 10, 2)
+        h = rng.uniform(size / 10, size * 0.6)
+        x0, y0 = rng.uniform(0, size - w), rng.uniform(0, size - d)
+        # four walls and the roof, each sampled in proportion to its area
+        faces = [((x0, y0, 0), (w, 0, h)), ((x0, y0 + d, 0), (w, 0, h)),
+                 ((x0, y0, 0), (0, d, h)), ((x0 + w, y0, 0), (0, d, h)), ((x0, y0, h), (w, d, 0))]
+        for corner, extent in faces:
+            extent = np.array(extent)
+            area = np.prod(extent[extent > 0])
+            n = int(2 * area)
+            parts.append(np.asarray(corner) + rng.uniform(0, 1, (n, 3)) * extent)
+    return np.concatenate(parts).astype(np.float32)
+
+
+def free_voxel(vmap: VoxelMap, rng: random.Random):
+    nx, ny, nz = vmap.shape
+    while True:
+        voxel = (rng.randrange(nx), rng.randrange(ny), rng.randrange(2, nz))
+        if not vmap.is_occupied(voxel):
+            return voxel
+
+
+def main():
+    parser = argparse.ArgumentParser(description='sparse voxel map benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512])
+    parser.add_argument('--buildings', type=int, default=60)
+    parser.add_argument('--queries', type=int, default=10)
+    parser.add_argument('--max-expansions', type=int, default=1_000_000)
+    parser.add_argument('--inflate', type=float, default=2.0, help='drone radius for the inflated scene (0 to skip)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'inflate':>7} {'points':>9} {'voxels':>9} {'build (s)':>9} {'sparse MB':>9} {'dense MB':>9} "
+          f"{'ms/query':>9} {'expanded':>9} {'visited':>9}  found")
+    for size in args.sizes:
+        cloud = city_cloud(size, args.buildings, args.seed)
+        for inflate in sorted({0.0, args.inflate}):
+            t0 = time.perf_counter()
+            vmap = VoxelMap.from_points(cloud, 1.0, bounds=AABB([0, 0, 0], [size] * 3), inflate=inflate)
+            t_build = time.perf_counter() - t0
+
+            rng = random.Random(args.seed)
+            queries = [(free_voxel(vmap, rng), free_voxel(vmap, rng)) for _ in range(args.queries)]
+            expanded = visited = found = 0
+            t0 = time.perf_counter()
+            for start, goal in queries:
+                stats = {}
+                path = voxel_astar(vmap, start, goal, stats=stats, max_expansions=args.max_expansions)
+                expanded += stats['expanded']
+                visited += stats['visited']
+                found += path is not None
+            per_query = (time.perf_counter() - t0) / len(queries)
+            print(f"{size:>5} {inflate:>7.1f} {len(cloud):>9} {len(vmap):>9} {t_build:>9.2f} "
+                  f"{vmap.nbytes() / 2 ** 20:>9.1f} {vmap.dense_nbytes() / 2 ** 20:>9.1f} {per_query * 1000:>9.1f} "
+                  f"{expanded / len(queries):>9.0f} {visited / len(queries):>9.0f}  {found}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
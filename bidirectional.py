@@ -0,0 +1,147 @@
+"""Bidirectional A* over a GridMap.
+
+Runs one A* forward from the start and one backward from the goal (over the
+reversed moves: the goal side steps from a cell to the neighbors that could
+have moved into it) and stops as soon as the meeting point found so far is
+provably optimal. Same movement model and costs as astar.astar_search.
+
+mu is the cost of the best start-goal path seen so far: every time either side
+reaches a cell the other side has already reached, g_forward + g_backward of
+that cell is a candidate. Both open sets are ordered by the MM priority
+max(f, 2g) (Holte et al., "Bidirectional search that is guaranteed to meet
+in the middle"), so neither side expands cells farther than half the optimal
+cost from its own end, and the side with the smaller top priority goes next.
+With a consistent heuristic that smallest priority is a lower bound on any
+path not seen yet, so the search stops once it reaches mu (up to float32
+rounding, see MU_TOLERANCE). Cells with g + h >= mu are never queued.
+
+The octile heuristic is already very informed on grids, so on most maps this
+expands about as many cells as astar_search and is slower per expansion; see
+benchmarks/bench_bidirectional.py.
+"""
+import heapq
+from typing import List, Optional, Tuple
+
+from astar import get_heuristic
+from grid_map import NO_PARENT, GridMap
+
+Pos = Tuple[int, int]
+
+INF = float('inf')
+# g is stored as float32, so mu can sit a few ulps above the priority of cells
+# whose path costs exactly the same; without this slack the search would go on
+# to expand the whole plateau of equally short paths
+MU_TOLERANCE = 1e-5
+
+
+def bidirectional_search(gmap: GridMap, start: Pos, goal: Pos, heuristic='octile',
+                         stats: Optional[dict] = None) -> Optional[List[Pos]]:
+    """Find an optimal path from start to goal ((row, col) tuples) with bidirectional A*.
+
+    Returns the path as a list of (row, col) from start to goal, or None when
+    the goal is unreachable. heuristic must be consistent (octile, euclidean
+    and chebyshev are). If stats is given it gets 'expanded_forward',
+    'expanded_backward', 'expanded' (their sum) and 'cost'.
+    """
+    h_func = get_heuristic(heuristic)
+    masks = gmap.neighbor_masks()
+    move_table = gmap.move_table()
+    occupancy = gmap.occupancy
+    cols = gmap.cols
+    g_f, parent_f = gmap.search_arrays()
+    g_b, parent_b = gmap.search_arrays(backward=True)
+    closed_f = bytearray(gmap.size)
+    closed_b = bytearray(gmap.size)
+
+    s = gmap.index(*start)
+    t = gmap.index(*goal)
+    start_row, start_col = start
+    goal_row, goal_col = goal
+    g_f[s] = 0.0
+    g_b[t] = 0.0
+    h = h_func(abs(start_row - goal_row), abs(start_col - goal_col))
+    # (priority, -g, count, idx): ties go to the deeper cell
+    open_f = [(h, 0.0, 0, s)]
+    open_b = [(h, 0.0, 0, t)]
+    count = 1
+    expanded_f = expanded_b = 0
+    mu = 0.0 if s == t else INF
+    meet = s if s == t else NO_PARENT
+
+    while open_f and open_b:
+        # drop stale entries so the tops are the real lower bounds
+        while open_f and closed_f[open_f[0][3]]:
+            heapq.heappop(open_f)
+        while open_b and closed_b[open_b[0][3]]:
+            heapq.heappop(open_b)
+        if not open_f or not open_b:
+            break
+        if min(open_f[0][0], open_b[0][0]) >= mu - MU_TOLERANCE * mu:
+            break
+
+        if open_f[0][0] <= open_b[0][0]:
+            # forward: current -> free neighbor
+            _, _, _, current = heapq.heappop(open_f)
+            closed_f[current] = 1
+            expanded_f += 1
+            row, col = divmod(current, cols)
+            current_g = g_f[current]
+            for offset, step, dr, dc in move_table[masks[current]]:
+                neighbor = current + offset
+                tentative_g = current_g + step
+                if closed_f[neighbor] or tentative_g >= g_f[neighbor]:
+                    continue
+                g_f[neighbor] = tentative_g
+                parent_f[neighbor] = current
+                if tentative_g + g_b[neighbor] < mu:
+                    mu = tentative_g + g_b[neighbor]
+                    meet = neighbor
+                h = h_func(abs(row + dr - goal_row), abs(col + dc - goal_col))
+                f = tentative_g + h
+                if f >= mu:
+                    continue  # cannot lead to a better path
+                heapq.heappush(open_f, (max(f, 2 * tentative_g), -tentative_g, count, neighbor))
+                count += 1
+        else:
+            # backward: current <- free neighbor (nothing can move into an obstacle)
+            _, _, _, current = heapq.heappop(open_b)
+            closed_b[current] = 1
+            expanded_b += 1
+            if occupancy[current]:
+                continue
+            row, col = divmod(current, cols)
+            current_g = g_b[current]
+            for offset, step, dr, dc in move_table[masks[current]]:
+                neighbor = current + offset
+                tentative_g = current_g + step
+                if closed_b[neighbor] or tentative_g >= g_b[neighbor]:
+                    continue
+                g_b[neighbor] = tentative_g
+                parent_b[neighbor] = current
+                if tentative_g + g_f[neighbor] < mu:
+                    mu = tentative_g + g_f[neighbor]
+                    meet = neighbor
+                h = h_func(abs(row + dr - start_row), abs(col + dc - start_col))
+                f = tentative_g + h
+                if f >= mu:
+                    continue  # cannot lead to a better path
+                heapq.heappush(open_b, (max(f, 2 * tentative_g), -tentative_g, count, neighbor))
+                count += 1
+
+    if stats is not None:
+        stats.update(expanded_forward=expanded_f, expanded_backward=expanded_b,
+                     expanded=expanded_f + expanded_b, cost=None if mu == INF else float(mu))
+    if mu == INF:
+        return None
+
+    path = []
+    current = meet
+    while current != NO_PARENT:
+        path.append(gmap.pos(current))
+        current = parent_f[current]
+    path.reverse()
+    current = parent_b[meet]
+    while current != NO_PARENT:
+        path.append(gmap.pos(current))
+        current = parent_b[current]
+    return path
@@ -0,0 +1,165 @@
+"""Bounding volume hierarchy over many AABBs, for broad-phase collision queries.
+
+The tree is a linear BVH built entirely with NumPy: boxes are sorted by the
+Morton code of their centers (so boxes close in space end up close in the
+order), cut into leaves of leaf_size consecutive boxes, and an implicit
+complete binary tree is laid over the leaves (node i has children 2i and
+2i + 1, the root is node 1, leaves are nodes P..2P-1 for P a power of two).
+Node bounds are computed one tree level at a time, which is also all refit()
+has to redo when boxes move.
+
+Queries walk the tree breadth-first: every level, all surviving nodes of the
+frontier are tested against the query with one vectorized comparison, so a
+query costs a few NumPy calls per tree level plus an exact test of the boxes
+in the leaves that were reached.
+"""
+from typing import Sequence, Union
+
+import numpy as np
+
+from ABBB_Class import AABB, as_bounds
+
+Boxes = Union[Sequence[AABB], np.ndarray]
+
+
+def morton_codes(points: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Morton (Z-order) codes of (N, D) points quantized inside the [lo, hi] box."""
+    n, d = points.shape
+    bits = min(21, 63 // d)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    q = ((points - lo) / span * ((1 << bits) - 1)).astype(np.uint64)
+    codes = np.zeros(n, dtype=np.uint64)
+    for b in range(bits):
+        for axis in range(d):
+            codes |= ((q[:, axis] >> np.uint64(b)) & np.uint64(1)) << np.uint64(b * d + axis)
+    return codes
+
+
+class BVH:
+    def __init__(self, boxes: Boxes, leaf_size: int = 8):
+        """Build the hierarchy over boxes (a list of AABBs or an (M, 2, D) [min, max] array).
+
+        Query results are indices into boxes.
+        """
+        if leaf_size < 1:
+            raise ValueError(f"leaf_size must be at least 1, got {leaf_size}")
+        mins, maxs = as_bounds(boxes)
+        if len(mins) == 0:
+            raise ValueError("cannot build a BVH from zero boxes")
+        self.size, self.ndim = mins.shape
+        self.leaf_size = leaf_size
+        centers = (mins + maxs) * 0.5
+        lo = np.array([centers[:, i].min() for i in range(self.ndim)])
+        hi = np.array([centers[:, i].max() for i in range(self.ndim)])
+        # box order inside the tree -> index in the caller's list
+        self.order = np.argsort(morton_codes(centers, lo, hi), kind='stable')
+
+        num_leaves = -(-self.size // leaf_size)
+        self.num_leaves = 1 << max(0, (num_leaves - 1).bit_length())  # padded to a power of two
+        self.depth = self.num_leaves.bit_length() - 1
+        self.leaf_starts = np.arange(num_leaves) * leaf_size
+        self.node_min = np.empty((2 * self.num_leaves, self.ndim))
+        self.node_max = np.empty((2 * self.num_leaves, self.ndim))
+        self._set_bounds(mins, maxs)
+
+    def refit(self, boxes: Boxes):
+        """Update the bounds after boxes moved (same boxes, same order); the tree shape is kept.
+
+        Much cheaper than rebuilding, but queries slow down if boxes drift far
+        from where they were at build time; rebuild then.
+        """
+        mins, maxs = as_bounds(boxes, self.ndim)
+        if mins.shape != (self.size, self.ndim):
+            raise ValueError(f"refit needs {self.size} boxes of dimension {self.ndim}, got {mins.shape}")
+        self._set_bounds(mins, maxs)
+
+    def _set_bounds(self, mins: np.ndarray, maxs: np.ndarray):
+        self.mins = mins[self.order]
+        self.maxs = maxs[self.order]
+        p = self.num_leaves
+        n = len(self.leaf_starts)
+        # leaves: bounds of their run of boxes; padding leaves are empty (never hit)
+        self.node_min[p:p + n] = np.minimum.reduceat(self.mins, self.leaf_starts, axis=0)
+        self.node_max[p:p + n] = np.maximum.reduceat(self.maxs, self.leaf_starts, axis=0)
+        self.node_min[p + n:] = np.inf
+        self.node_max[p + n:] = -np.inf
+        # internal nodes, one level at a time from the bottom
+        lo = p
+        while lo > 1:
+            hi = lo
+            lo //= 2
+            np.minimum(self.node_min[2 * lo:2 * hi:2], self.node_min[2 * lo + 1:2 * hi:2], out=self.node_min[lo:hi])
+            np.maximum(self.node_max[2 * lo:2 * hi:2], self.node_max[2 * lo + 1:2 * hi:2], out=self.node_max[lo:hi])
+
+    def _leaves_hit(self, node_test) -> np.ndarray:
+        # walk down the levels keeping the nodes node_test accepts; returns leaf numbers
+        nodes = np.array([1])
+        for _ in range(self.depth + 1):
+            nodes = nodes[node_test(self.node_min[nodes], self.node_max[nodes])]
+            if nodes.size == 0 or nodes[0] >= self.num_leaves:
+                break
+            nodes = np.stack([2 * nodes, 2 * nodes + 1], axis=1).ravel()
+        return nodes - self.num_leaves
+
+    def _candidates(self, leaves: np.ndarray) -> np.ndarray:
+        # positions (in tree order) of the boxes stored in the given leaves
+        if leaves.size == 0:
+            return np.empty(0, dtype=np.int64)
+        offsets = np.arange(self.leaf_size)
+        slots = (self.leaf_starts[leaves][:, None] + offsets).ravel()
+        return slots[slots < self.size]
+
+    def query_point(self, point) -> np.ndarray:
+        """Indices of the boxes containing point (borders included)."""
+        p = np.asarray(point, dtype=np.float64)
+        test = lambda lo, hi: np.all((lo <= p) & (p <= hi), axis=1)  # noqa: E731
+        slots = self._candidates(self._leaves_hit(test))
+        return np.sort(self.order[slots[test(self.mins[slots], self.maxs[slots])]])
+
+    def query_box(self, box: AABB) -> np.ndarray:
+        """Indices of the boxes intersecting box (touching counts)."""
+        bmin = np.asarray(box.min, dtype=np.float64)
+        bmax = np.asarray(box.max, dtype=np.float64)
+        test = lambda lo, hi: np.all((lo <= bmax) & (bmin <= hi), axis=1)  # noqa: E731
+        slots = self._candidates(self._leaves_hit(test))
+        return np.sort(self.order[slots[test(self.mins[slots], self.maxs[slots])]])
+
+    def query_ray(self, origin, direction, t_max: float = np.inf,
+                  return_distances: bool = False):
+        """Indices of the boxes hit by origin + t * direction for 0 <= t <= t_max, nearest first.
+
+        With return_distances, also returns the entry t of each hit (0 for
+        boxes containing the origin).
+        """
+        o = np.asarray(origin, dtype=np.float64)
+        d = np.asarray(direction, dtype=np.float64)
+        with np.errstate(divide='ignore'):
+            inv = 1.0 / d
+        parallel = d == 0
+
+        def entry(lo, hi):
+            # slab test; rays parallel to an axis hit only if the origin lies in that slab
+            with np.errstate(invalid='ignore'):
+                t1 = (lo - o) * inv
+                t2 = (hi - o) * inv
+            near = np.where(parallel, np.where((lo <= o) & (o <= hi), -np.inf, np.inf), np.minimum(t1, t2))
+            far = np.where(parallel, np.where((lo <= o) & (o <= hi), np.inf, -np.inf), np.maximum(t1, t2))
+            t_enter = np.maximum(near.max(axis=1), 0.0)
+            t_exit = np.minimum(far.min(axis=1), t_max)
+            # empty (padding) nodes have min > max and would pass the slab test
+            return t_enter, (t_enter <= t_exit) & (lo[:, 0] <= hi[:, 0])
+
+        slots = self._candidates(self._leaves_hit(lambda lo, hi: entry(lo, hi)[1]))
+        t_enter, hit = entry(self.mins[slots], self.maxs[slots])
+        slots = slots[hit]
+        t_enter = t_enter[hit]
+        by_distance = np.argsort(t_enter, kind='stable')
+        ids = self.order[slots[by_distance]]
+        if return_distances:
+            return ids, t_enter[by_distance]
+        return ids
+
+    def nbytes(self) -> int:
+        """Bytes held by the tree's arrays."""
+        return (self.order.nbytes + self.mins.nbytes + self.maxs.nbytes + self.node_min.nbytes
+                + self.node_max.nbytes + self.leaf_starts.nbytes)
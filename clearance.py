@@ -0,0 +1,165 @@
+"""Clearance: the Euclidean distance from every cell to the nearest obstacle.
+
+distance_transform() computes an exact Euclidean distance transform with NumPy
+in two separable passes: the distance to the nearest obstacle in the same
+column (running maxima/minima of obstacle row indices), then, along the rows,
+the lower envelope of the parabolas (c - j)^2 + column_distance[j]^2
+(Felzenszwalb & Huttenlocher), built for all rows at once.
+
+ClearanceMap keeps the transform of a GridMap current: it listens to obstacle
+edits and recomputes only a window around the changed cells. Distances are
+capped at max_distance, which is what keeps that window small: a cell's capped
+distance only depends on obstacles within max_distance of it. The map border
+counts as an obstacle, like it does for the neighbor masks.
+
+For a robot wider than one cell, masks(min_clearance) are neighbor masks
+(see grid_map.passable_masks) in which only cells at least min_clearance from
+every obstacle are passable. The search loops use them unchanged, so
+clearance-aware planning costs the same per expansion as point-robot planning:
+    astar.astar_search(gmap, start, goal, min_clearance=2.5)
+"""
+import math
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from grid_map import GridMap, passable_masks
+
+# default cap of the distances a ClearanceMap tracks, in cells
+MAX_DISTANCE = 16.0
+
+
+def distance_transform(blocked: np.ndarray) -> np.ndarray:
+    """Euclidean distance (in cells, between cell centers) from each cell to the nearest True cell.
+
+    blocked is a 2-D boolean array; returns float32 of the same shape, inf
+    everywhere when nothing is blocked.
+    """
+    blocked = np.asarray(blocked, dtype=bool)
+    rows, cols = blocked.shape
+    if not blocked.any():
+        return np.full((rows, cols), np.inf, dtype=np.float32)
+    # vertical pass: rows to the nearest blocked cell above and below in the same column
+    far = rows + cols  # farther than any real distance, but finite so the envelope math stays finite
+    r = np.arange(rows)[:, None]
+    above = np.maximum.accumulate(np.where(blocked, r, -far), axis=0)
+    below = np.minimum.accumulate(np.where(blocked, r, 2 * far)[::-1], axis=0)[::-1]
+    column = np.minimum(r - above, below - r).astype(np.float64)
+    return np.sqrt(_lower_envelope(column * column)).astype(np.float32)
+
+
+def _lower_envelope(f: np.ndarray) -> np.ndarray:
+    """min over j of (q - j)^2 + f[:, j] for every q, each row independently."""
+    rows, n = f.shape
+    every = np.arange(rows)
+    fq = f + np.arange(n, dtype=np.float64) ** 2
+    v = np.zeros((rows, n), dtype=np.int64)       # parabolas in the envelope, per row
+    z = np.empty((rows, n + 1))                   # where each one starts
+    z[:, 0] = -np.inf
+    z[:, 1] = np.inf
+    k = np.zeros(rows, dtype=np.int64)            # index of the last parabola per row
+    for q in range(1, n):
+        vk = v[every, k]
+        s = (fq[:, q] - fq[every, vk]) / (2 * (q - vk))
+        hidden = np.flatnonzero(s <= z[every, k])
+        while len(hidden):
+            # the new parabola hides the last one of these rows: drop it and intersect again
+            k[hidden] -= 1
+            vk = v[hidden, k[hidden]]
+            s[hidden] = (fq[hidden, q] - fq[hidden, vk]) / (2 * (q - vk))
+            hidden = hidden[s[hidden] <= z[hidden, k[hidden]]]
+        k += 1
+        v[every, k] = q
+        z[every, k] = s
+        z[every, k + 1] = np.inf
+    # the parabola covering q is the number of boundaries z[1..] left of q; the rows are
+    # searched in one call by shifting each into its own range
+    bounds = np.clip(z[:, 1:], -1, n)
+    bounds[np.arange(n)[None, :] > k[:, None]] = n
+    offset = (n + 2) * every[:, None]
+    flat = (bounds + offset + 1).ravel()
+    q = np.arange(n)[None, :]
+    seg = np.searchsorted(flat, (q + offset + 1).ravel()).reshape(rows, n) - n * every[:, None]
+    j = v[every[:, None], seg]
+    return (q - j) ** 2 + f[every[:, None], j]
+
+
+class ClearanceMap:
+    def __init__(self, gmap: GridMap, max_distance: float = MAX_DISTANCE):
+        """Compute the clearance of gmap and start listening to its obstacle edits.
+
+        Call detach() when done with it (GridMap.clearance_map() manages one
+        for the searches).
+        """
+        if not max_distance > 0:
+            raise ValueError(f"max_distance must be positive, got {max_distance}")
+        self.gmap = gmap
+        self.max_distance = float(max_distance)
+        self._reach = int(math.ceil(self.max_distance))
+        self.distance = np.empty((gmap.rows, gmap.cols), dtype=np.float32)
+        self._masks: Dict[float, np.ndarray] = {}
+        self.updated_cells = 0  # cells recomputed after edits since creation
+        self._update(0, gmap.rows, 0, gmap.cols)
+        gmap.add_listener(self._on_map_change)
+
+    def detach(self):
+        """Stop listening to the map."""
+        self.gmap.remove_listener(self._on_map_change)
+
+    def clearance(self, row: int, col: int) -> float:
+        """Distance from the cell to the nearest obstacle or the map border, capped at max_distance."""
+        return float(self.distance[row, col])
+
+    def masks(self, min_clearance: float) -> memoryview:
+        """Neighbor masks in which only cells with clearance >= min_clearance are passable.
+
+        Built once per threshold and repaired with the distances after edits.
+        """
+        if min_clearance > self.max_distance:
+            raise ValueError(f"min_clearance {min_clearance} is above max_distance {self.max_distance}")
+        masks = self._masks.get(min_clearance)
+        if masks is None:
+            masks = passable_masks(self.distance >= min_clearance)
+            self._masks[min_clearance] = masks
+        # a view, so repairs after edits show up in it
+        return memoryview(masks.reshape(-1))
+
+    def nbytes(self) -> int:
+        return self.distance.nbytes + sum(masks.nbytes for masks in self._masks.values())
+
+    def _on_map_change(self, changed: Optional[Sequence[int]]):
+        if changed is None:
+            self._update(0, self.gmap.rows, 0, self.gmap.cols)
+            self.updated_cells += self.gmap.size
+            return
+        if len(changed) == 0:
+            return
+        rows, cols = np.divmod(np.asarray(changed), self.gmap.cols)
+        # distances within max_distance of a changed cell may change; nothing else does
+        reach = self._reach
+        r0, r1 = max(int(rows.min()) - reach, 0), min(int(rows.max()) + reach + 1, self.gmap.rows)
+        c0, c1 = max(int(cols.min()) - reach, 0), min(int(cols.max()) + reach + 1, self.gmap.cols)
+        self._update(r0, r1, c0, c1)
+        self.updated_cells += (r1 - r0) * (c1 - c0)
+
+    def _update(self, r0: int, r1: int, c0: int, c1: int):
+        """Recompute the distances of rows r0:r1, cols c0:c1 and the masks around them."""
+        gmap = self.gmap
+        reach = self._reach
+        # every obstacle within max_distance of the window, plus the border ring where the window meets it
+        a0, a1 = max(r0 - reach, 0), min(r1 + reach, gmap.rows)
+        b0, b1 = max(c0 - reach, 0), min(c1 + reach, gmap.cols)
+        blocked = gmap.occupancy_array()[a0:a1, b0:b1] != 0
+        pad = ((int(a0 == 0), int(a1 == gmap.rows)), (int(b0 == 0), int(b1 == gmap.cols)))
+        distance = distance_transform(np.pad(blocked, pad, constant_values=True))
+        top, left = r0 - a0 + pad[0][0], c0 - b0 + pad[1][0]
+        self.distance[r0:r1, c0:c1] = np.minimum(distance[top:top + r1 - r0, left:left + c1 - c0], self.max_distance)
+
+        # masks of the window and the ring around it, from the distances one cell further out
+        m0, m1 = max(r0 - 1, 0), min(r1 + 1, gmap.rows)
+        n0, n1 = max(c0 - 1, 0), min(c1 + 1, gmap.cols)
+        e0, e1 = max(m0 - 1, 0), min(m1 + 1, gmap.rows)
+        f0, f1 = max(n0 - 1, 0), min(n1 + 1, gmap.cols)
+        for min_clearance, masks in self._masks.items():
+            window = passable_masks(self.distance[e0:e1, f0:f1] >= min_clearance)
+            masks[m0:m1, n0:n1] = window[m0 - e0:m1 - e0, n0 - f0:n1 - f0]
@@ -0,0 +1,246 @@
+"""Incremental replanning with D* Lite over a GridMap.
+
+A DStarLite planner keeps its search state (g and rhs values of every cell and
+the priority queue) between calls to plan(). It searches backwards from the
+goal, so each cell's g is its cost-to-goal; when obstacles are painted or
+erased the planner is told through a GridMap listener and, on the next plan(),
+only the cells whose cost-to-goal actually changed are re-expanded. Moving the
+start (a robot driving along the path) is handled with the usual key modifier
+km and reuses everything. Moving the goal invalidates every cost-to-goal, so
+set_goal() starts over from scratch.
+
+Same movement model as astar.astar_search (8 moves, only the destination has to
+be free), so the paths cost the same as a fresh A* search on the edited map.
+A blocked start is no exception: obstacles can be left, just not entered.
+"""
+import heapq
+import itertools
+from array import array
+from typing import List, Optional, Sequence, Set, Tuple
+
+from astar import get_heuristic
+from grid_map import GridMap
+
+Pos = Tuple[int, int]
+
+INF = float('inf')
+# the first key is a sum of float step costs and heuristics, so two cells that
+# tie on it in exact arithmetic can differ in the last bits and the tie would
+# not be broken on the second key; it is rounded to this many decimals
+KEY_DIGITS = 9
+
+
+class DStarLite:
+    def __init__(self, gmap: GridMap, start: Pos, goal: Pos, heuristic='octile'):
+        """Set up a planner on gmap and start listening to its obstacle edits.
+
+        heuristic must be consistent for the repaired paths to stay optimal
+        (octile, the default, is). Call detach() when done with the planner.
+        """
+        self.gmap = gmap
+        self.h_func = get_heuristic(heuristic)
+        self.start = start
+        self.goal = goal
+        self.expanded = 0        # cells expanded by the last plan()
+        self.total_expanded = 0  # ... and by every plan() so far
+        self._changed: Set[int] = set()
+        self._stale = False
+        self._reset()
+        gmap.add_listener(self._on_map_change)
+
+    def detach(self):
+        """Stop listening to the map; the planner must not be used afterwards."""
+        self.gmap.remove_listener(self._on_map_change)
+
+    def move_start(self, start: Pos):
+        """The robot moved to start; the next plan() reuses the existing search."""
+        if start == self.start:
+            return
+        self._km += self._h(self.gmap.index(*start))
+        self.start = start
+
+    def set_goal(self, goal: Pos):
+        """Replan towards a new goal (this discards the search state)."""
+        if goal != self.goal:
+            self.goal = goal
+            self._stale = True
+
+    def plan(self) -> Optional[List[Pos]]:
+        """Bring the search up to date and return the path from start to goal (or None)."""
+        if self._stale:
+            self._reset()
+        elif self._changed:
+            for idx in self._changed:
+                self._cell_changed(idx)
+            self._changed.clear()
+        s = self.gmap.index(*self.start)
+        if self.gmap.occupancy[s] and s != self.gmap.index(*self.goal):
+            # nothing propagates into a blocked cell, so the start's rhs is kept here
+            self._rhs[s] = self._best_successor(s)
+            self._update_vertex(s)
+        self.expanded = self._compute_shortest_path()
+        self.total_expanded += self.expanded
+        return self._extract_path()
+
+    def cost(self) -> float:
+        """Cost of the path found by the last plan() (inf when unreachable)."""
+        return self._g[self.gmap.index(*self.start)]
+
+    def _on_map_change(self, changed: Optional[Sequence[int]]):
+        # only record the edits; they are applied in one go by the next plan()
+        if changed is None:
+            self._stale = True
+        else:
+            self._changed.update(changed)
+
+    def _reset(self):
+        size = self.gmap.size
+        self._g = array('d', [INF]) * size
+        self._rhs = array('d', [INF]) * size
+        self._heap: List[Tuple[float, float, int, int]] = []
+        self._queued = {}  # cell -> key of its live heap entry
+        self._counter = itertools.count()  # insertion order breaks key ties
+        self._km = 0.0
+        self._changed.clear()
+        self._stale = False
+        t = self.gmap.index(*self.goal)
+        self._rhs[t] = 0.0
+        self._update_vertex(t)
+
+    def _h(self, idx: int) -> float:
+        # heuristic from the current start to idx
+        row, col = divmod(idx, self.gmap.cols)
+        return self.h_func(abs(row - self.start[0]), abs(col - self.start[1]))
+
+    def _key(self, idx: int) -> Tuple[float, float]:
+        m = min(self._g[idx], self._rhs[idx])
+        return round(m + self._h(idx) + self._km, KEY_DIGITS), m
+
+    def _update_vertex(self, idx: int):
+        # queue a cell iff it is inconsistent; leftover heap entries are skipped
+        # lazily, and a cell already queued with the right key is left alone
+        g = self._g[idx]
+        rhs = self._rhs[idx]
+        if g == rhs:
+            self._queued.pop(idx, None)
+            return
+        m = rhs if rhs < g else g
+        row, col = divmod(idx, self.gmap.cols)
+        key = (round(m + self.h_func(abs(row - self.start[0]), abs(col - self.start[1])) + self._km,
+                     KEY_DIGITS), m)
+        if self._queued.get(idx) != key:
+            self._queued[idx] = key
+            heapq.heappush(self._heap, (key[0], key[1], next(self._counter), idx))
+
+    def _best_successor(self, idx: int) -> float:
+        # rhs = min over the free neighbors v of step + g[v]
+        g = self._g
+        best = INF
+        for offset, step, _, _ in self.gmap.move_table()[self.gmap.neighbor_masks()[idx]]:
+            cost = step + g[idx + offset]
+            if cost < best:
+                best = cost
+        return best
+
+    def _cell_changed(self, idx: int):
+        """Repair rhs around a cell whose occupancy flipped (masks are already updated)."""
+        g = self._g
+        rhs = self._rhs
+        t = self.gmap.index(*self.goal)
+        moves = self.gmap.move_table()[self.gmap.neighbor_masks()[idx]]
+        # idx can still be left either way; requeued with g = INF, it tells the
+        # neighbors about itself when expanded (if it is free)
+        g_old = g[idx]
+        g[idx] = INF
+        rhs[idx] = 0.0 if idx == t else self._best_successor(idx)
+        self._update_vertex(idx)
+        if self.gmap.occupancy[idx]:
+            # nothing can enter idx any more: neighbors that went through it look again
+            for offset, step, _, _ in moves:
+                u = idx + offset
+                if u != t and rhs[u] == step + g_old:
+                    rhs[u] = self._best_successor(u)
+                    self._update_vertex(u)
+
+    def _compute_shortest_path(self) -> int:
+        g = self._g
+        rhs = self._rhs
+        heap = self._heap
+        queued = self._queued
+        occupancy = self.gmap.occupancy
+        masks = self.gmap.neighbor_masks()
+        move_table = self.gmap.move_table()
+        update_vertex = self._update_vertex
+        key = self._key
+        km = self._km
+        s = self.gmap.index(*self.start)
+        t = self.gmap.index(*self.goal)
+        # a blocked start is not among its neighbors' predecessors: its rhs is
+        # refreshed whenever one of the cells it can step to is expanded
+        start_moves = set() if s == t or not occupancy[s] else {s + m[0] for m in move_table[masks[s]]}
+        expanded = 0
+
+        while heap:
+            k1, k2, _, u = heap[0]
+            if queued.get(u) != (k1, k2):
+                heapq.heappop(heap)  # stale entry
+                continue
+            # key of the start (its heuristic is 0)
+            m = min(g[s], rhs[s])
+            if (k1, k2) >= (round(m + km, KEY_DIGITS), m) and rhs[s] == g[s]:
+                break
+            expanded += 1
+            heapq.heappop(heap)
+            k_new = key(u)
+            if (k1, k2) < k_new:
+                # queued before the start moved (km grew); requeue with the current key
+                queued[u] = k_new
+                heapq.heappush(heap, (k_new[0], k_new[1], next(self._counter), u))
+                continue
+            del queued[u]
+            # predecessors of u are its free neighbors, unless nothing can enter u
+            preds = () if occupancy[u] else move_table[masks[u]]
+            if g[u] > rhs[u]:
+                g[u] = g_u = rhs[u]
+                for offset, step, _, _ in preds:
+                    p = u + offset
+                    if p != t and step + g_u < rhs[p]:
+                        rhs[p] = step + g_u
+                        update_vertex(p)
+            else:
+                g_old = g[u]
+                g[u] = INF
+                update_vertex(u)
+                for offset, step, _, _ in preds:
+                    p = u + offset
+                    if p != t and rhs[p] == step + g_old:
+                        rhs[p] = self._best_successor(p)
+                        update_vertex(p)
+            if u in start_moves:
+                rhs[s] = self._best_successor(s)
+                update_vertex(s)
+        return expanded
+
+    def _extract_path(self) -> Optional[List[Pos]]:
+        # follow the cheapest step + g downhill from the start
+        g = self._g
+        masks = self.gmap.neighbor_masks()
+        move_table = self.gmap.move_table()
+        current = self.gmap.index(*self.start)
+        t = self.gmap.index(*self.goal)
+        if g[current] == INF:
+            return None
+        path = [self.gmap.pos(current)]
+        while current != t:
+            best = INF
+            best_next = -1
+            for offset, step, _, _ in move_table[masks[current]]:
+                cost = step + g[current + offset]
+                if cost < best:
+                    best = cost
+                    best_next = current + offset
+            if best_next < 0 or len(path) > self.gmap.size:
+                return None
+            current = best_next
+            path.append(self.gmap.pos(current))
+        return path
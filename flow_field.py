@@ -0,0 +1,244 @@
+"""Flow fields: the cost to one goal from every cell, and the move to make from each.
+
+When many agents share a goal, one reverse Dijkstra pass from the goal
+answers all of them: FlowField holds the cost-to-goal of every cell and, per
+cell, the index into MOVES of the move that leads downhill, so an agent reads
+its next step in O(1) (next_steps() moves a whole fleet with one gather).
+Costs and moves are those of astar_search, including the cost layer and
+min_clearance, so following a field costs the same as the A* path.
+
+distance_field() settles cells in bands: every open cell closer than the
+nearest open cell plus the cheapest possible move is already final, so the
+whole band is settled and relaxed at once with NumPy. On open maps the band is
+the wavefront and a field costs a few hundred array passes; in corridors and
+mazes the front is a handful of cells, and the loop switches to a plain heap
+until it widens again.
+
+FlowFieldCache keeps the fields of the last few goals and drops them when an
+obstacle changes, through a map listener; they are rebuilt on the next
+request. Changes the listener does not see (set_costs) are noticed through
+GridMap.version, which every field records.
+"""
+import heapq
+import math
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from grid_map import MOVES, GridMap
+
+Pos = Tuple[int, int]
+
+NO_MOVE = -1  # direction of the goal and of cells that cannot reach it
+
+# open cells below which distance_field() runs on a heap, and the heap size that hands back to NumPy
+SMALL_FRONT = 128
+LARGE_FRONT = 512
+
+_MOVE_DELTAS = np.array([(dr, dc) for dr, dc, _ in MOVES], dtype=np.int32)
+
+
+def distance_field(gmap: GridMap, goal: Pos, min_clearance: float = 0.0) -> np.ndarray:
+    """Cost of the cheapest path from every cell to goal, as a (rows, cols) float64 array.
+
+    Cells that cannot reach the goal (and the cells a robot of min_clearance
+    cannot stand on) are inf. The goal must be on the map.
+    """
+    rows, cols = gmap.rows, gmap.cols
+    masks_buf = gmap.neighbor_masks(min_clearance)
+    masks = np.frombuffer(masks_buf, dtype=np.uint8)
+    move_table = gmap.move_table()
+    layer = gmap.cost_array()
+    # cost of entering each cell, per unit of step cost
+    enter = None if layer is None else layer.reshape(-1).astype(np.float64) * gmap.cost_scale
+    width = gmap.cost_scale * gmap.min_cost  # cheapest move there is
+
+    dist = array('d', [math.inf]) * gmap.size
+    settled = bytearray(gmap.size)
+    dist_np = np.frombuffer(dist, dtype=np.float64)
+    settled_np = np.frombuffer(settled, dtype=bool)
+    t = gmap.index(*goal)
+    dist[t] = 0.0
+    if not _passable(gmap, goal, min_clearance):
+        return dist_np.reshape(rows, cols)
+
+    moves = [(dr * cols + dc, step, k) for k, (dr, dc, step) in enumerate(MOVES)]
+    front = np.array([t], dtype=np.int64)
+    while len(front):
+        if len(front) < SMALL_FRONT:
+            front = _settle_heap(front, dist, settled, masks_buf, move_table, enter)
+            continue
+        d = dist_np[front]
+        final = d < d.min() + width
+        band = front[final]
+        settled_np[band] = True
+        band_d = d[final]
+        band_masks = masks[band]
+        reached = [front[~final]]
+        for offset, step, k in moves:
+            # neighbors of the band along move k, one step further from the goal
+            has = (band_masks >> k) & 1 == 1
+            cells = band[has] + offset
+            open_ = ~settled_np[cells]
+            cells = cells[open_]
+            cost = step if enter is None else step * enter[band[has][open_]]
+            np.minimum.at(dist_np, cells, band_d[has][open_] + cost)
+            reached.append(cells)
+        front = np.unique(np.concatenate(reached))
+    return dist_np.reshape(rows, cols)
+
+
+def _passable(gmap: GridMap, cell: Pos, min_clearance: float) -> bool:
+    if min_clearance > 0:
+        return gmap.clearance_map().clearance(*cell) >= min_clearance
+    return not gmap.is_obstacle(*cell)
+
+
+def _settle_heap(front: np.ndarray, dist: array, settled: bytearray, masks, move_table, enter) -> np.ndarray:
+    """Dijkstra from the open cells in front until the heap is LARGE_FRONT long; returns the cells left open."""
+    heap = [(dist[c], c) for c in front.tolist()]
+    heapq.heapify(heap)
+    while heap and len(heap) < LARGE_FRONT:
+        d, current = heapq.heappop(heap)
+        if settled[current]:
+            continue
+        settled[current] = 1
+        scale = 1.0 if enter is None else enter[current]
+        for offset, step, _, _ in move_table[masks[current]]:
+            neighbor = current + offset
+            if settled[neighbor]:
+                continue
+            nd = d + step * scale
+            if nd < dist[neighbor]:
+                dist[neighbor] = nd
+                heapq.heappush(heap, (nd, neighbor))
+    return np.unique(np.array([c for _, c in heap if not settled[c]], dtype=np.int64))
+
+
+class FlowField:
+    def __init__(self, gmap: GridMap, goal: Pos, min_clearance: float = 0.0):
+        """Compute the field of goal on gmap as it is now (it does not follow later edits)."""
+        self.goal = goal
+        self.min_clearance = min_clearance
+        self.rows, self.cols = gmap.rows, gmap.cols
+        self.version = gmap.version  # of the map the field was computed on
+        self.distance, self.directions = self._build(gmap, distance_field(gmap, goal, min_clearance))
+        self._flat = memoryview(self.directions.reshape(-1))
+
+    def _build(self, gmap: GridMap, dist: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """float32 costs and int8 directions: per cell, the neighbor move with the lowest cost to go."""
+        rows, cols = dist.shape
+        masks = np.frombuffer(gmap.neighbor_masks(self.min_clearance), dtype=np.uint8).reshape(rows, cols)
+        layer = gmap.cost_array()
+        enter = None if layer is None else layer.astype(np.float64) * gmap.cost_scale
+        best = np.full((rows, cols), np.inf)
+        directions = np.full((rows, cols), NO_MOVE, dtype=np.int8)
+        for k, (dr, dc, step) in enumerate(MOVES):
+            # cost to go through neighbor (r + dr, c + dc), for the cells where that move stays on the map
+            src = (slice(max(-dr, 0), rows - max(dr, 0)), slice(max(-dc, 0), cols - max(dc, 0)))
+            dst = (slice(max(dr, 0), rows - max(-dr, 0)), slice(max(dc, 0), cols - max(-dc, 0)))
+            via = dist[dst] + (step if enter is None else step * enter[dst])
+            better = (via < best[src]) & ((masks[src] >> k) & 1 == 1)
+            best[src][better] = via[better]
+            directions[src][better] = k
+        # cells the robot cannot stand on keep the way out of them, as a search started there would take
+        stuck = np.isinf(dist)
+        dist = np.where(stuck, best, dist)
+        directions[~np.isfinite(dist)] = NO_MOVE
+        directions[self.goal] = NO_MOVE
+        return dist.astype(np.float32), directions
+
+    def cost(self, row: int, col: int) -> float:
+        """Cost of the cheapest path from the cell to the goal (inf when there is none)."""
+        return float(self.distance[row, col])
+
+    def next_step(self, row: int, col: int) -> Optional[Pos]:
+        """The cell to move to from (row, col), or None at the goal and where the goal is unreachable."""
+        k = self._flat[row * self.cols + col]
+        if k == NO_MOVE:
+            return None
+        dr, dc, _ = MOVES[k]
+        return row + dr, col + dc
+
+    def next_steps(self, positions: np.ndarray) -> np.ndarray:
+        """next_step for an (n, 2) array of (row, col) at once; agents with no move stay where they are."""
+        positions = np.asarray(positions, dtype=np.int32).reshape(-1, 2)
+        k = self.directions[positions[:, 0], positions[:, 1]]
+        moving = k != NO_MOVE
+        out = positions.copy()
+        out[moving] += _MOVE_DELTAS[k[moving]]
+        return out
+
+    def path(self, start: Pos) -> Optional[List[Pos]]:
+        """Follow the field from start to the goal; None when the goal is unreachable from start."""
+        if tuple(start) == tuple(self.goal):
+            return [tuple(start)]
+        if self._flat[start[0] * self.cols + start[1]] == NO_MOVE:
+            return None
+        path = [tuple(start)]
+        step = self.next_step(*start)
+        while step is not None:
+            path.append(step)
+            step = self.next_step(*step)
+        return path
+
+    def nbytes(self) -> int:
+        return self.distance.nbytes + self.directions.nbytes
+
+
+class FlowFieldCache:
+    def __init__(self, gmap: GridMap, max_fields: int = 8, min_clearance: float = 0.0):
+        """Keep the fields of up to max_fields goals of gmap, least recently used dropped first.
+
+        Every map change drops all of them. Call detach() when done with it.
+        """
+        if max_fields < 1:
+            raise ValueError(f"max_fields must be at least 1, got {max_fields}")
+        self.gmap = gmap
+        self.max_fields = max_fields
+        self.min_clearance = min_clearance
+        self._fields: 'OrderedDict[Pos, FlowField]' = OrderedDict()
+        self.builds = 0  # fields computed since creation
+        gmap.add_listener(self._on_map_change)
+
+    def detach(self):
+        """Stop listening to the map."""
+        self.gmap.remove_listener(self._on_map_change)
+
+    def field(self, goal: Pos) -> FlowField:
+        """The field of goal, computed now if it is not cached."""
+        goal = tuple(goal)
+        field = self._fields.get(goal)
+        if field is not None and field.version == self.gmap.version:
+            self._fields.move_to_end(goal)
+            return field
+        field = FlowField(self.gmap, goal, self.min_clearance)
+        self.builds += 1
+        self._fields[goal] = field
+        self._fields.move_to_end(goal)
+        if len(self._fields) > self.max_fields:
+            self._fields.popitem(last=False)
+        return field
+
+    def next_step(self, start: Pos, goal: Pos) -> Optional[Pos]:
+        return self.field(goal).next_step(*start)
+
+    def clear(self):
+        """Drop every cached field."""
+        self._fields.clear()
+
+    def __contains__(self, goal: Pos) -> bool:
+        return tuple(goal) in self._fields
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def nbytes(self) -> int:
+        return sum(field.nbytes() for field in self._fields.values())
+
+    def _on_map_change(self, changed):
+        # any edit can lengthen or shorten paths to every goal
+        if changed is None or len(changed):
+            self._fields.clear()
@@ -0,0 +1,278 @@
+"""Headless, array-backed occupancy grid used by the search code.
+
+Nothing in here imports pygame. Cells are addressed by a flat index
+(idx = row * cols + col) into compact arrays instead of one Python object per
+cell, so a 4096x4096 map costs ~16 MB of occupancy plus the per-search
+scratch arrays (float32 g-scores and int32 parents), which are only allocated
+the first time a search runs on the map.
+
+The neighborhood of every cell is precomputed as an 8-bit mask of its passable
+neighbors (bit k set when move MOVES[k] stays on the map and lands on a free
+cell; the map border acts like a ring of obstacles). Together with the per-map
+move table, which lists for each possible mask the (index offset, step cost,
+d_row, d_col) of its moves, this lets the search loops visit exactly the
+passable neighbors of a cell with one lookup and no bounds or obstacle
+checks. Masks are kept up to date by set_obstacle/clear; code that writes the
+occupancy buffer directly must call invalidate() afterwards.
+
+neighbor_masks(min_clearance) gives the same kind of masks for a robot wider
+than a cell: only cells at least min_clearance from every obstacle count as
+passable. They come from the map's clearance.ClearanceMap (an incrementally
+maintained distance transform, see clearance_map()).
+
+An optional cost layer (set_costs) gives every cell a traversal cost: entering
+a cell costs the move's step cost times the cell's cost. It is kept as a
+compact float32 or uint8 array and read by astar_search / astar_steps
+directly in their inner loop; the other planners plan as if every cell cost 1.
+
+Planners that keep state between searches register a listener with
+add_listener(); it is called after every obstacle edit with the list of flat
+indices that changed, or with None when the change is unknown (invalidate()
+without a list of changed cells). version counts the changes to the map
+(obstacle edits and set_costs, which does not call listeners), so state
+derived from it can tell whether it missed one.
+"""
+from array import array
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ORTHOGONAL_COST = 1.0
+DIAGONAL_COST = 1.414  # sqrt(2) for diagonal movement, same value Cell.g_cost uses
+
+# (d_row, d_col, step cost) for the 8 moves, in the order get_neighbors visits them
+MOVES = tuple(
+    (dr, dc, ORTHOGONAL_COST if dr == 0 or dc == 0 else DIAGONAL_COST)
+    for dr in (-1, 0, 1)
+    for dc in (-1, 0, 1)
+    if dr != 0 or dc != 0
+)
+
+NO_PARENT = -1
+
+# listener(changed flat indices, or None for "anything may have changed")
+MapListener = Callable[[Optional[Sequence[int]]], None]
+
+
+def passable_masks(free: np.ndarray) -> np.ndarray:
+    """(rows, cols) uint8 masks of the free neighbors of every cell of the boolean array free.
+
+    Bit k is set when MOVES[k] lands on a free cell; cells off the array count
+    as blocked.
+    """
+    rows, cols = free.shape
+    masks = np.zeros((rows, cols), dtype=np.uint8)
+    for k, (dr, dc, _) in enumerate(MOVES):
+        # free[r + dr, c + dc], False off the map
+        shifted = np.zeros_like(free)
+        shifted[max(-dr, 0):rows - max(dr, 0), max(-dc, 0):cols - max(dc, 0)] = \
+            free[max(dr, 0):rows - max(-dr, 0), max(dc, 0):cols - max(-dc, 0)]
+        masks |= shifted.astype(np.uint8) << k
+    return masks
+
+
+class GridMap:
+    def __init__(self, rows: int, cols: int, occupancy=None):
+        """Create an empty rows x cols map.
+
+        occupancy may be an existing buffer of rows * cols bytes (bytearray,
+        memoryview, mmap...) where non-zero means obstacle; it is used as-is,
+        not copied.
+        """
+        if rows <= 0 or cols <= 0:
+            raise ValueError(f"grid must be at least 1x1, got {rows}x{cols}")
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        if occupancy is None:
+            occupancy = bytearray(self.size)
+        elif len(occupancy) != self.size:
+            raise ValueError(f"occupancy has {len(occupancy)} cells, expected {self.size}")
+        self.occupancy = occupancy
+        # per-search scratch, see search_arrays()
+        self.g: Optional[array] = None
+        self.parent: Optional[array] = None
+        # second set for the backward half of bidirectional searches
+        self.g_back: Optional[array] = None
+        self.parent_back: Optional[array] = None
+        # traversal cost layer, see set_costs(); None for a binary map
+        self.costs: Optional[memoryview] = None
+        self.cost_scale = 1.0
+        self.min_cost = 1.0
+        self._cost_array: Optional[np.ndarray] = None
+        # derived lookup tables, see neighbor_masks() / move_table() / clearance_map()
+        self._masks: Optional[bytearray] = None
+        self._clearance = None
+        self._move_table = None
+        self._listeners: List[MapListener] = []
+        self.version = 0  # bumped by every change, see the module docstring
+
+    def index(self, row: int, col: int) -> int:
+        return row * self.cols + col
+
+    def pos(self, idx: int) -> Tuple[int, int]:
+        return divmod(idx, self.cols)
+
+    def in_bounds(self, row: int, col: int) -> bool:
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def is_obstacle(self, row: int, col: int) -> bool:
+        return self.occupancy[row * self.cols + col] != 0
+
+    def set_obstacle(self, row: int, col: int, blocked: bool = True):
+        idx = row * self.cols + col
+        if (self.occupancy[idx] != 0) == blocked:
+            return
+        self.occupancy[idx] = 1 if blocked else 0
+        self.version += 1
+        masks = self._masks
+        if masks is not None:
+            # flip the bit that points at this cell in each neighbor's mask
+            for k, (dr, dc, _) in enumerate(MOVES):
+                r = row - dr
+                c = col - dc
+                if 0 <= r < self.rows and 0 <= c < self.cols:
+                    if blocked:
+                        masks[r * self.cols + c] &= ~(1 << k) & 0xFF
+                    else:
+                        masks[r * self.cols + c] |= 1 << k
+        if self._listeners:
+            self._notify([idx])
+
+    def clear(self):
+        """Remove every obstacle."""
+        occ = self.occupancy_array()
+        changed = np.flatnonzero(occ)
+        occ[:] = 0
+        self._masks = None
+        if len(changed):
+            self.version += 1
+            if self._listeners:
+                self._notify(changed.tolist())
+
+    def invalidate(self, changed: Optional[Sequence[int]] = None):
+        """Drop data derived from the occupancy; call after writing it directly.
+
+        Pass the flat indices that were written as changed (a list or a NumPy
+        array) when they are known, so listeners can repair only those cells
+        instead of everything.
+        """
+        self._masks = None
+        self.version += 1
+        if self._listeners:
+            self._notify(changed.tolist() if isinstance(changed, np.ndarray) else changed)
+
+    def add_listener(self, listener: MapListener):
+        """Call listener(changed) after every obstacle edit (see module docstring)."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: MapListener):
+        self._listeners.remove(listener)
+
+    def _notify(self, changed: Optional[Sequence[int]]):
+        for listener in list(self._listeners):
+            listener(changed)
+
+    def occupancy_array(self) -> np.ndarray:
+        """A (rows, cols) uint8 NumPy view of the occupancy (no copy)."""
+        return np.frombuffer(self.occupancy, dtype=np.uint8).reshape(self.rows, self.cols)
+
+    def set_costs(self, costs: Optional[np.ndarray], scale: float = 1.0):
+        """Use costs, a (rows, cols) array of positive values, as the cost layer; None removes it.
+
+        Entering a cell costs the move's step cost times scale * costs[row, col],
+        so a uint8 layer with e.g. scale=0.1 covers costs 0.1 to 25.5 in a byte
+        per cell. float32 and uint8 arrays are used without a copy (anything
+        else is converted to float32); call set_costs again after changing
+        values in place so min_cost, which keeps the heuristic admissible, is
+        up to date.
+        """
+        self.version += 1
+        if costs is None:
+            self.costs = self._cost_array = None
+            self.cost_scale = self.min_cost = 1.0
+            return
+        layer = np.asarray(costs)
+        if layer.shape != (self.rows, self.cols):
+            raise ValueError(f"cost layer has shape {layer.shape}, expected {(self.rows, self.cols)}")
+        if layer.dtype != np.uint8:
+            layer = layer.astype(np.float32, copy=False)
+        layer = np.ascontiguousarray(layer)
+        lowest = float(layer.min()) * scale
+        if not lowest > 0:
+            raise ValueError(f"costs must be positive, lowest is {lowest}")
+        self._cost_array = layer
+        self.costs = memoryview(layer.reshape(-1))
+        self.cost_scale = float(scale)
+        self.min_cost = float(layer.min())
+
+    def cost_array(self) -> Optional[np.ndarray]:
+        """The (rows, cols) cost layer as given to set_costs (None for a binary map)."""
+        return self._cost_array
+
+    def neighbor_masks(self, min_clearance: float = 0.0) -> bytearray:
+        """Per-cell bitmask of passable neighbors (bit k <-> MOVES[k]), built on first use.
+
+        With min_clearance > 0 only neighbors at least that far from every
+        obstacle count as passable (see clearance_map()).
+        """
+        if min_clearance > 0:
+            return self.clearance_map().masks(min_clearance)
+        if self._masks is None:
+            self._masks = bytearray(passable_masks(self.occupancy_array() == 0).tobytes())
+        return self._masks
+
+    def clearance_map(self, max_distance: Optional[float] = None):
+        """The map's clearance.ClearanceMap, built on first use and kept current through a listener.
+
+        max_distance (default clearance.MAX_DISTANCE) caps the distances it
+        tracks; asking for a different cap rebuilds it.
+        """
+        from clearance import MAX_DISTANCE, ClearanceMap  # clearance imports this module
+        max_distance = max_distance or MAX_DISTANCE
+        if self._clearance is None or self._clearance.max_distance != max_distance:
+            if self._clearance is not None:
+                self._clearance.detach()
+            self._clearance = ClearanceMap(self, max_distance)
+        return self._clearance
+
+    def move_table(self) -> tuple:
+        """move_table()[mask] = tuple of (index offset, step cost, d_row, d_col) per set bit."""
+        if self._move_table is None:
+            moves = [(dr * self.cols + dc, cost, dr, dc) for dr, dc, cost in MOVES]
+            self._move_table = tuple(
+                tuple(moves[k] for k in range(8) if mask >> k & 1) for mask in range(256)
+            )
+        return self._move_table
+
+    def search_arrays(self, backward: bool = False) -> Tuple[array, array]:
+        """Return (g, parent) reset to (inf, NO_PARENT), allocating them on first use.
+
+        backward=True returns the separate (g_back, parent_back) pair used by
+        the goal side of a bidirectional search.
+        """
+        g = self.g_back if backward else self.g
+        if g is None:
+            g = array('f', [float('inf')]) * self.size
+            parent = array('i', [NO_PARENT]) * self.size
+            if backward:
+                self.g_back, self.parent_back = g, parent
+            else:
+                self.g, self.parent = g, parent
+        else:
+            parent = self.parent_back if backward else self.parent
+            np.frombuffer(g, dtype=np.float32).fill(np.inf)
+            np.frombuffer(parent, dtype=np.int32).fill(NO_PARENT)
+        return g, parent
+
+    def nbytes(self) -> int:
+        """Bytes held by the map's arrays (occupancy, cost layer, masks and search scratch once built)."""
+        total = len(self.occupancy)
+        if self._cost_array is not None:
+            total += self._cost_array.nbytes
+        if self._masks is not None:
+            total += len(self._masks)
+        for g, parent in ((self.g, self.parent), (self.g_back, self.parent_back)):
+            if g is not None:
+                total += g.itemsize * len(g) + parent.itemsize * len(parent)
+        return total
@@ -0,0 +1,460 @@
+"""Hierarchical pathfinding (HPA*) over a GridMap.
+
+The map is split into square clusters of cluster_size x cluster_size cells.
+Along every border between two clusters, each maximal run of cell pairs that
+are free on both sides is an entrance: short runs get one transition in the
+middle, runs of ENTRANCE_SPLIT cells or more get one at each end. The cells on
+either side of a transition are the nodes of the abstract graph; nodes of the
+same cluster are joined by their shortest distance inside the cluster, and the
+two cells of a transition by a single straight step.
+
+A query connects start and goal to the nodes of their clusters, runs A* on the
+abstract graph and (unless refine=False) turns each abstract edge back into
+cells with a search confined to one cluster. Paths follow the usual movement
+model but are not always optimal (they pass through transition cells), and
+moves that cross a cluster corner diagonally are not in the abstract graph.
+Queries whose ends are less than a cluster apart, where such detours would
+cost the most, are answered with a flat A* instead, and so are queries the
+abstract graph has no path for, so reachability is never misreported.
+Both plan on the binary map: a cost layer (GridMap.set_costs) is ignored, so
+paths and costs are in the same units whichever one answered.
+
+Each cluster stores only its node cells and a float32 distance table, so the
+abstract graph is small enough to save to disk and load back. A CRC of every
+cluster's occupancy is kept with it: obstacle edits (seen through a GridMap
+listener) and cells that differ from a loaded file only rebuild the clusters
+they touch and those of their neighbors whose entrances changed.
+"""
+import heapq
+import pickle
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+import astar
+from astar import octile
+from grid_map import MOVES, GridMap
+
+Pos = Tuple[int, int]
+
+INF = float('inf')
+# entrances at least this long get two transitions instead of one
+ENTRANCE_SPLIT = 6
+FORMAT_VERSION = 1
+
+
+class HPAGraph:
+    def __init__(self, gmap: GridMap, cluster_size: int = 32):
+        """Build the abstract graph of gmap and start listening to its obstacle edits.
+
+        Call detach() when done with the graph.
+        """
+        self._setup(gmap, cluster_size)
+        self._rebuild(range(self.num_clusters))
+        gmap.add_listener(self._on_map_change)
+
+    def _setup(self, gmap: GridMap, cluster_size: int):
+        if cluster_size < 2:
+            raise ValueError(f"cluster_size must be at least 2, got {cluster_size}")
+        self.gmap = gmap
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-gmap.rows // cluster_size)
+        self.cluster_cols = -(-gmap.cols // cluster_size)
+        self.num_clusters = self.cluster_rows * self.cluster_cols
+        # per cluster: sorted node cells and their k x k distance table
+        self._nodes: List[Tuple[int, ...]] = [()] * self.num_clusters
+        self._is_node = bytearray(gmap.size)  # per cell: 1 if it is a node of its cluster
+        self._dist: List[array] = [array('f')] * self.num_clusters
+        self._crc = array('I', [0]) * self.num_clusters
+        # cid -> edges of its nodes, built when a query first reaches the cluster
+        self._adjacency: Dict[int, Dict[int, Tuple[Tuple[int, float], ...]]] = {}
+        self._dirty: Set[int] = set()
+        self._recheck = False
+
+        # neighbor masks with the moves that leave the cell's cluster removed,
+        # so cluster-local searches need no bounds checks
+        c = cluster_size
+        keep = np.zeros((c, c), dtype=np.uint8)
+        local_r = np.arange(c)[:, None]
+        local_c = np.arange(c)[None, :]
+        for k, (dr, dc, _) in enumerate(MOVES):
+            inside = (0 <= local_r + dr) & (local_r + dr < c) & (0 <= local_c + dc) & (local_c + dc < c)
+            keep |= inside.astype(np.uint8) << k
+        self._keep = keep
+        self._local_masks = bytearray(gmap.size)
+
+    def detach(self):
+        """Stop listening to the map."""
+        self.gmap.remove_listener(self._on_map_change)
+
+    # -- clusters ---------------------------------------------------------
+
+    def cluster_of(self, idx: int) -> int:
+        row, col = divmod(idx, self.gmap.cols)
+        return (row // self.cluster_size) * self.cluster_cols + col // self.cluster_size
+
+    def _bounds(self, cid: int) -> Tuple[int, int, int, int]:
+        cr, cc = divmod(cid, self.cluster_cols)
+        r0 = cr * self.cluster_size
+        c0 = cc * self.cluster_size
+        return r0, min(r0 + self.cluster_size, self.gmap.rows), c0, min(c0 + self.cluster_size, self.gmap.cols)
+
+    def _neighbor_clusters(self, cid: int) -> List[int]:
+        cr, cc = divmod(cid, self.cluster_cols)
+        out = []
+        if cr > 0:
+            out.append(cid - self.cluster_cols)
+        if cr < self.cluster_rows - 1:
+            out.append(cid + self.cluster_cols)
+        if cc > 0:
+            out.append(cid - 1)
+        if cc < self.cluster_cols - 1:
+            out.append(cid + 1)
+        return out
+
+    def _cluster_crc(self, occ: np.ndarray, cid: int) -> int:
+        r0, r1, c0, c1 = self._bounds(cid)
+        return zlib.crc32(occ[r0:r1, c0:c1].tobytes())
+
+    def _find_nodes(self, occ: np.ndarray, cid: int) -> Tuple[int, ...]:
+        """Transition cells on cid's side of its four borders."""
+        r0, r1, c0, c1 = self._bounds(cid)
+        cols = self.gmap.cols
+        nodes = set()
+        # (cells along the border inside cid, the cells across it, index of one of ours)
+        sides = []
+        if r0 > 0:
+            sides.append((occ[r0, c0:c1], occ[r0 - 1, c0:c1], lambda i: r0 * cols + c0 + i))
+        if r1 < self.gmap.rows:
+            sides.append((occ[r1 - 1, c0:c1], occ[r1, c0:c1], lambda i: (r1 - 1) * cols + c0 + i))
+        if c0 > 0:
+            sides.append((occ[r0:r1, c0], occ[r0:r1, c0 - 1], lambda i: (r0 + i) * cols + c0))
+        if c1 < cols:
+            sides.append((occ[r0:r1, c1 - 1], occ[r0:r1, c1], lambda i: (r0 + i) * cols + c1 - 1))
+        for ours, theirs, cell in sides:
+            both_free = ((ours == 0) & (theirs == 0)).tolist()
+            i = 0
+            n = len(both_free)
+            while i < n:
+                if not both_free[i]:
+                    i += 1
+                    continue
+                j = i
+                while j + 1 < n and both_free[j + 1]:
+                    j += 1
+                if j - i + 1 >= ENTRANCE_SPLIT:
+                    nodes.add(cell(i))
+                    nodes.add(cell(j))
+                else:
+                    nodes.add(cell((i + j) // 2))
+                i = j + 1
+        return tuple(sorted(nodes))
+
+    def _rebuild(self, dirty: Iterable[int]):
+        """Rebuild the given clusters, and their neighbors whose entrances changed."""
+        dirty = set(dirty)
+        if not dirty:
+            return
+        occ = self.gmap.occupancy_array()
+        global_masks = np.frombuffer(self.gmap.neighbor_masks(), dtype=np.uint8).reshape(occ.shape)
+        local_masks = np.frombuffer(self._local_masks, dtype=np.uint8).reshape(occ.shape)
+        for cid in dirty:
+            r0, r1, c0, c1 = self._bounds(cid)
+            local_masks[r0:r1, c0:c1] = global_masks[r0:r1, c0:c1] & self._keep[:r1 - r0, :c1 - c0]
+            self._crc[cid] = self._cluster_crc(occ, cid)
+
+        affected = set(dirty)
+        for cid in dirty:
+            affected.update(self._neighbor_clusters(cid))
+        for cid in sorted(affected):
+            nodes = self._find_nodes(occ, cid)
+            if cid in dirty or nodes != self._nodes[cid]:
+                self._set_nodes(cid, nodes)
+                self._dist[cid] = self._distance_table(nodes)
+                # their transitions may point at nodes that just changed
+                self._adjacency.pop(cid, None)
+                for other in self._neighbor_clusters(cid):
+                    self._adjacency.pop(other, None)
+
+    def _set_nodes(self, cid: int, nodes: Tuple[int, ...]):
+        for v in self._nodes[cid]:
+            self._is_node[v] = 0
+        for v in nodes:
+            self._is_node[v] = 1
+        self._nodes[cid] = nodes
+
+    def _distance_table(self, nodes: Sequence[int]) -> array:
+        # paths between free cells can be walked both ways, so the table is
+        # symmetric and each search only needs the nodes after its source
+        k = len(nodes)
+        dist = array('f', [INF]) * (k * k)
+        for i in range(k):
+            dist[i * k + i] = 0.0
+            if i + 1 < k:
+                found = self._cluster_dijkstra(nodes[i], nodes[i + 1:])
+                for j in range(i + 1, k):
+                    d = found.get(nodes[j], INF)
+                    dist[i * k + j] = dist[j * k + i] = d
+        return dist
+
+    def _cluster_dijkstra(self, source: int, targets: Sequence[int]) -> Dict[int, float]:
+        """Costs from source to the targets reachable inside its cluster."""
+        masks = self._local_masks
+        move_table = self.gmap.move_table()
+        remaining = set(targets)
+        found = {}
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        while heap and remaining:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue  # stale entry
+            if u in remaining:
+                remaining.discard(u)
+                found[u] = d
+            for offset, step, _, _ in move_table[masks[u]]:
+                v = u + offset
+                nd = d + step
+                if nd < dist.get(v, INF):
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        return found
+
+    def _cluster_path(self, source: int, target: int) -> Optional[List[int]]:
+        """Cells of a shortest path from source to target inside source's cluster (A*)."""
+        masks = self._local_masks
+        move_table = self.gmap.move_table()
+        cols = self.gmap.cols
+        tr, tc = divmod(target, cols)
+        g = {source: 0.0}
+        parent = {source: -1}
+        sr, sc = divmod(source, cols)
+        heap = [(octile(abs(sr - tr), abs(sc - tc)), 0.0, source)]
+        closed = set()
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == target:
+                path = []
+                while u != -1:
+                    path.append(u)
+                    u = parent[u]
+                path.reverse()
+                return path
+            closed.add(u)
+            row, col = divmod(u, cols)
+            for offset, step, dr, dc in move_table[masks[u]]:
+                v = u + offset
+                nd = d + step
+                if v in closed or nd >= g.get(v, INF):
+                    continue
+                g[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd + octile(abs(row + dr - tr), abs(col + dc - tc)), nd, v))
+        return None
+
+    # -- updates and persistence -----------------------------------------
+
+    def _on_map_change(self, changed: Optional[Sequence[int]]):
+        # only record the edits; they are applied by the next update()/search()
+        if changed is None:
+            self._recheck = True
+        else:
+            self._dirty.update(self.cluster_of(idx) for idx in changed)
+
+    def update(self) -> int:
+        """Rebuild the clusters touched by edits since the last update; returns how many."""
+        dirty = self._dirty
+        if self._recheck:
+            occ = self.gmap.occupancy_array()
+            dirty.update(cid for cid in range(self.num_clusters)
+                         if self._cluster_crc(occ, cid) != self._crc[cid])
+            self._recheck = False
+        count = len(dirty)
+        self._rebuild(dirty)
+        self._dirty = set()
+        return count
+
+    def save(self, path: str):
+        """Write the abstract graph to path (pickle); see load()."""
+        self.update()
+        data = {
+            'format': FORMAT_VERSION,
+            'rows': self.gmap.rows,
+            'cols': self.gmap.cols,
+            'cluster_size': self.cluster_size,
+            'crc': self._crc.tobytes(),
+            'nodes': self._nodes,
+            'dist': [d.tobytes() for d in self._dist],
+        }
+        with open(path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str, gmap: GridMap) -> 'HPAGraph':
+        """Load a graph saved by save() for gmap.
+
+        Clusters whose occupancy differs from when the graph was saved are
+        rebuilt; the rest is used as-is. Raises ValueError if the file was
+        saved for a map of another size.
+        """
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('format') != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported HPA graph format {data.get('format')!r}")
+        if (data['rows'], data['cols']) != (gmap.rows, gmap.cols):
+            raise ValueError(f"{path} was saved for a {data['rows']}x{data['cols']} map, "
+                             f"not {gmap.rows}x{gmap.cols}")
+        graph = cls.__new__(cls)
+        graph._setup(gmap, data['cluster_size'])
+        for cid, nodes in enumerate(data['nodes']):
+            graph._set_nodes(cid, tuple(nodes))
+        graph._dist = [array('f', d) for d in data['dist']]
+        saved_crc = array('I', data['crc'])
+
+        occ = gmap.occupancy_array()
+        global_masks = np.frombuffer(gmap.neighbor_masks(), dtype=np.uint8).reshape(occ.shape)
+        local_masks = np.frombuffer(graph._local_masks, dtype=np.uint8).reshape(occ.shape)
+        keep = np.tile(graph._keep, (graph.cluster_rows, graph.cluster_cols))[:gmap.rows, :gmap.cols]
+        np.bitwise_and(global_masks, keep, out=local_masks)
+        dirty = []
+        for cid in range(graph.num_clusters):
+            graph._crc[cid] = graph._cluster_crc(occ, cid)
+            if graph._crc[cid] != saved_crc[cid]:
+                dirty.append(cid)
+        graph._rebuild(dirty)
+        gmap.add_listener(graph._on_map_change)
+        return graph
+
+    def num_nodes(self) -> int:
+        return sum(len(nodes) for nodes in self._nodes)
+
+    # -- queries ----------------------------------------------------------
+
+    def search(self, start: Pos, goal: Pos, refine: bool = True, fallback: bool = True,
+               stats: Optional[dict] = None) -> Optional[List[Pos]]:
+        """Find a (near-optimal) path from start to goal ((row, col) tuples).
+
+        Returns the path as a list of (row, col); with refine=False only the
+        abstract waypoints (start, transition cells, goal) are returned, which
+        skips the per-cluster searches. Queries with start and goal less than
+        a cluster apart, and (if fallback is set) queries the abstract graph
+        has no path for, are answered by a flat astar_search. If stats is
+        given it gets 'expanded' (abstract nodes), 'cost' (of the abstract or
+        flat path) and 'flat' (whether a flat search answered).
+        """
+        self.update()
+        gmap = self.gmap
+        cols = gmap.cols
+        s = gmap.index(*start)
+        t = gmap.index(*goal)
+        if stats is not None:
+            stats.update(expanded=0, cost=None, flat=False)
+        if gmap.occupancy[t] and s != t:
+            return None  # nothing can move into an obstacle
+        if abs(start[0] - goal[0]) < self.cluster_size and abs(start[1] - goal[1]) < self.cluster_size:
+            return self._flat_search(start, goal, 0, stats)
+
+        s_cluster = self.cluster_of(s)
+        t_cluster = self.cluster_of(t)
+        # connect start and goal to the nodes of their clusters (and to each
+        # other when they share one)
+        start_targets = list(self._nodes[s_cluster])
+        if s_cluster == t_cluster:
+            start_targets.append(t)
+        start_edges = self._cluster_dijkstra(s, start_targets)
+        goal_edges = self._cluster_dijkstra(t, self._nodes[t_cluster])
+
+        goal_row, goal_col = goal
+        g = {s: 0.0}
+        parent = {s: -1}
+        heap = [(octile(abs(start[0] - goal_row), abs(start[1] - goal_col)), 0.0, s)]
+        closed = set()
+        expanded = 0
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            expanded += 1
+            if u == t:
+                break
+            closed.add(u)
+            if u == s:
+                edges = list(start_edges.items()) + self._transitions(s)
+            else:
+                edges = self._cluster_edges(self.cluster_of(u))[u]
+            if u in goal_edges:
+                edges = list(edges) + [(t, goal_edges[u])]
+            for v, cost in edges:
+                nd = d + cost
+                if v in closed or nd >= g.get(v, INF):
+                    continue
+                g[v] = nd
+                parent[v] = u
+                vr, vc = divmod(v, cols)
+                heapq.heappush(heap, (nd + octile(abs(vr - goal_row), abs(vc - goal_col)), nd, v))
+
+        if t not in g:
+            if not fallback:
+                if stats is not None:
+                    stats['expanded'] = expanded
+                return None
+            return self._flat_search(start, goal, expanded, stats)
+
+        if stats is not None:
+            stats.update(expanded=expanded, cost=g[t])
+        waypoints = []
+        u = t
+        while u != -1:
+            waypoints.append(u)
+            u = parent[u]
+        waypoints.reverse()
+        if not refine:
+            return [gmap.pos(u) for u in waypoints]
+
+        cells = [s]
+        for u, v in zip(waypoints, waypoints[1:]):
+            if self.cluster_of(u) != self.cluster_of(v):
+                cells.append(v)  # a transition: one straight step across the border
+            else:
+                cells.extend(self._cluster_path(u, v)[1:])
+        return [gmap.pos(u) for u in cells]
+
+    def _flat_search(self, start: Pos, goal: Pos, expanded: int, stats: Optional[dict]) -> Optional[List[Pos]]:
+        flat_stats = {}
+        path = astar.astar_search(self.gmap, start, goal, stats=flat_stats, terrain=False)
+        if stats is not None:
+            stats.update(expanded=expanded, cost=flat_stats['cost'], flat=True)
+        return path
+
+    def _cluster_edges(self, cid: int) -> Dict[int, Tuple[Tuple[int, float], ...]]:
+        """node -> its (neighbor, cost) edges: inside the cluster and across transitions."""
+        edges = self._adjacency.get(cid)
+        if edges is None:
+            nodes = self._nodes[cid]
+            dist = self._dist[cid]
+            k = len(nodes)
+            edges = {}
+            for i, u in enumerate(nodes):
+                out = [(nodes[j], dist[i * k + j]) for j in range(k) if j != i and dist[i * k + j] != INF]
+                out.extend(self._transitions(u))
+                edges[u] = tuple(out)
+            self._adjacency[cid] = edges
+        return edges
+
+    def _transitions(self, u: int) -> List[Tuple[int, float]]:
+        """Straight steps from u onto a node of a neighboring cluster."""
+        cols = self.gmap.cols
+        row, col = divmod(u, cols)
+        size = self.cluster_size
+        out = []
+        for v, across in ((u - cols, row % size == 0 and row > 0),
+                          (u + cols, row % size == size - 1 and row + 1 < self.gmap.rows),
+                          (u - 1, col % size == 0 and col > 0),
+                          (u + 1, col % size == size - 1 and col + 1 < cols)):
+            if across and self._is_node[v]:
+                out.append((v, 1.0))
+        return out
@@ -0,0 +1,166 @@
+"""Instrumentation for astar_search / astar_steps: counters, phase timings, callbacks and a trace.
+
+Pass a SearchProbe as probe=. Without one the search runs exactly its plain
+loop: the probe calls sit on the branch the loop only takes when it records
+changes for the visualizer, so instrumentation can stay wired into production
+code at no cost. One probe can be reused across searches; counters and
+timings add up.
+
+The optional trace is a fixed-size ring buffer of 13-byte events (kind, flat
+cell index, g, h) in the same terms as astar.CellChange, so a run can be saved
+to a compact binary file and replayed by the visualizer afterwards. When it
+fills up the oldest events are overwritten.
+"""
+import struct
+from array import array
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from astar import EXPANDED, OPENED, CellChange
+
+TRACE_MAGIC = b'TRCE'
+TRACE_VERSION = 1
+# magic, version, rows, cols, event count, events dropped
+_TRACE_HEADER = struct.Struct('<4sHIIQQ')
+
+# one event on disk / in events(): 1 + 4 + 4 + 4 bytes, no padding
+EVENT_DTYPE = np.dtype([('kind', 'u1'), ('idx', '<i4'), ('g', '<f4'), ('h', '<f4')])
+
+
+class TraceBuffer:
+    def __init__(self, capacity: int, rows: int = 0, cols: int = 0):
+        """Ring buffer for the last capacity events; rows/cols are stored with it for replay."""
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.rows = rows
+        self.cols = cols
+        self._kind = bytearray(capacity)
+        self._idx = array('i', [0]) * capacity
+        self._g = array('f', [0.0]) * capacity
+        self._h = array('f', [0.0]) * capacity
+        self._next = 0  # slot the next event goes to
+        self.total = 0  # events ever appended
+
+    def append(self, kind: int, idx: int, g: float, h: float):
+        i = self._next
+        self._kind[i] = kind
+        self._idx[i] = idx
+        self._g[i] = g
+        self._h[i] = h
+        self._next = 0 if i + 1 == self.capacity else i + 1
+        self.total += 1
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        """Events overwritten because the buffer was full."""
+        return self.total - len(self)
+
+    def clear(self):
+        self._next = 0
+        self.total = 0
+
+    def events(self) -> np.ndarray:
+        """The buffered events, oldest first, as an EVENT_DTYPE array."""
+        count = len(self)
+        first = (self._next - count) % self.capacity
+        order = (np.arange(count) + first) % self.capacity
+        events = np.empty(count, dtype=EVENT_DTYPE)
+        events['kind'] = np.frombuffer(self._kind, dtype=np.uint8)[order]
+        events['idx'] = np.frombuffer(self._idx, dtype=np.int32)[order]
+        events['g'] = np.frombuffer(self._g, dtype=np.float32)[order]
+        events['h'] = np.frombuffer(self._h, dtype=np.float32)[order]
+        return events
+
+    def changes(self) -> List[CellChange]:
+        """The buffered events as astar.CellChange tuples, oldest first."""
+        events = self.events()
+        return list(zip(events['idx'].tolist(), events['kind'].tolist(), events['g'].tolist(), events['h'].tolist()))
+
+    def save(self, path: str):
+        """Write the buffered events to path (header + packed EVENT_DTYPE records)."""
+        events = self.events()
+        with open(path, 'wb') as f:
+            f.write(_TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, self.rows, self.cols, len(events), self.dropped))
+            f.write(events.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'TraceBuffer':
+        """Read a trace written by save(); raises ValueError for anything else."""
+        with open(path, 'rb') as f:
+            header = f.read(_TRACE_HEADER.size)
+            if len(header) < _TRACE_HEADER.size:
+                raise ValueError(f"{path}: file too short for a trace header")
+            magic, version, rows, cols, count, dropped = _TRACE_HEADER.unpack(header)
+            if magic != TRACE_MAGIC or version != TRACE_VERSION:
+                raise ValueError(f"{path}: not a version {TRACE_VERSION} search trace")
+            events = np.frombuffer(f.read(count * EVENT_DTYPE.itemsize), dtype=EVENT_DTYPE)
+        if len(events) != count:
+            raise ValueError(f"{path}: truncated, expected {count} events")
+        trace = cls(max(count, 1), rows, cols)
+        trace._kind[:count] = events['kind'].tobytes()
+        trace._idx[:count] = array('i', events['idx'].tobytes())
+        trace._g[:count] = array('f', events['g'].tobytes())
+        trace._h[:count] = array('f', events['h'].tobytes())
+        trace._next = count % trace.capacity
+        trace.total = count + dropped
+        return trace
+
+
+class SearchProbe:
+    def __init__(self, trace: Optional[TraceBuffer] = None,
+                 on_expand: Optional[Callable[[int, float, float], None]] = None,
+                 on_push: Optional[Callable[[int, float, float, bool], None]] = None):
+        """Collect counters and timings of the searches it is passed to.
+
+        trace records every expansion and push; on_expand(idx, g, h) and
+        on_push(idx, g, h, reopened) are called as they happen.
+        """
+        self.trace = trace
+        self.on_expand = on_expand
+        self.on_push = on_push
+        self.searches = 0
+        self.expanded = 0   # cells popped and expanded
+        self.pushed = 0     # heap entries pushed (the start included)
+        self.reopened = 0   # pushes for a cell already in the open set, now with a better g
+        self.stale = 0      # outdated heap entries popped and skipped
+        self.max_heap = 0   # largest open-set heap seen at an expansion
+        self.timings: Dict[str, float] = {'setup': 0.0, 'search': 0.0, 'path': 0.0}
+
+    def expand(self, idx: int, g: float, h: float, heap_size: int):
+        self.expanded += 1
+        if heap_size > self.max_heap:
+            self.max_heap = heap_size
+        if self.trace is not None:
+            self.trace.append(EXPANDED, idx, g, h)
+        if self.on_expand is not None:
+            self.on_expand(idx, g, h)
+
+    def push(self, idx: int, g: float, h: float, reopened: bool):
+        self.pushed += 1
+        if reopened:
+            self.reopened += 1
+        if self.trace is not None:
+            self.trace.append(OPENED, idx, g, h)
+        if self.on_push is not None:
+            self.on_push(idx, g, h, reopened)
+
+    def timed(self, phase: str, seconds: float):
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+        """Counters and timings, e.g. for JSON output."""
+        return {'searches': self.searches, 'expanded': self.expanded, 'pushed': self.pushed,
+                'reopened': self.reopened, 'stale': self.stale, 'max_heap': self.max_heap,
+                'timings': dict(self.timings),
+                'trace_events': len(self.trace) if self.trace is not None else 0}
+
+    def summary(self) -> str:
+        """One line for humans."""
+        ms = ', '.join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in self.timings.items())
+        return (f"{self.searches} search(es): expanded {self.expanded}, pushed {self.pushed}, "
+                f"reopened {self.reopened}, stale {self.stale}, max heap {self.max_heap}; {ms}")
@@ -0,0 +1,261 @@
+"""Jump Point Search over a GridMap.
+
+Same movement model as astar.astar_search: 8-directional moves that only need
+the destination cell to be free (diagonals may cut corners), costing 1.0
+straight and 1.414 diagonal. On uniform-cost grids most cells lie on one of
+many equally short paths; JPS skips them by "jumping" along straight and
+diagonal lines and only expands cells where a path may have to turn (jump
+points), so it returns optimal paths while expanding far fewer cells.
+
+Straight jumps are answered in O(1) from precomputed tables (the straight half
+of JPS+): a JumpTable stores, for every cell and each of the 4 straight
+directions, the next cell that stops a jump (an obstacle or a cell with a
+forced neighbor). Diagonal jumps step cell by cell and consult those tables.
+The tables are built on a copy of the occupancy padded with a one-cell
+obstacle border, so jumps need no bounds checks. Build one JumpTable per map
+and pass it to every jps_search on that map; rebuild it after editing
+obstacles.
+"""
+import heapq
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from astar import octile
+from grid_map import GridMap
+
+Pos = Tuple[int, int]
+
+
+class JumpTable:
+    def __init__(self, gmap: GridMap):
+        """Precompute the padded occupancy and the straight jump tables of gmap."""
+        self.rows = gmap.rows
+        self.cols = gmap.cols
+        self.width = width = gmap.cols + 2
+        blocked = np.pad(gmap.occupancy_array() != 0, 1, constant_values=True)
+        self.occ = bytearray(blocked.astype(np.uint8).tobytes())
+
+        # forced-neighbor tests of the straight jumps, for every padded cell
+        up = np.ones_like(blocked)
+        up[1:] = blocked[:-1]        # cell above is blocked
+        down = np.ones_like(blocked)
+        down[:-1] = blocked[1:]      # cell below is blocked
+        left = np.ones_like(blocked)
+        left[:, 1:] = blocked[:, :-1]
+        right = np.ones_like(blocked)
+        right[:, :-1] = blocked[:, 1:]
+
+        def shifted(a, dr, dc):
+            # a[r + dr, c + dc] (True outside the grid)
+            out = np.ones_like(a)
+            h, w = a.shape
+            out[max(-dr, 0):h - max(dr, 0), max(-dc, 0):w - max(dc, 0)] = \
+                a[max(dr, 0):h - max(-dr, 0), max(dc, 0):w - max(-dc, 0)]
+            return out
+
+        stop_east = blocked | (down & ~shifted(blocked, 1, 1)) | (up & ~shifted(blocked, -1, 1))
+        stop_west = blocked | (down & ~shifted(blocked, 1, -1)) | (up & ~shifted(blocked, -1, -1))
+        stop_south = blocked | (right & ~shifted(blocked, 1, 1)) | (left & ~shifted(blocked, 1, -1))
+        stop_north = blocked | (right & ~shifted(blocked, -1, 1)) | (left & ~shifted(blocked, -1, -1))
+
+        h, w = blocked.shape
+        cols = np.arange(w)
+        rows = np.arange(h)[:, None]
+        big = np.iinfo(np.int32).max
+
+        # first stop strictly after / before each cell along its row or column;
+        # the obstacle border guarantees one exists for every interior cell
+        nxt = np.minimum.accumulate(np.where(stop_east, cols, big)[:, ::-1], axis=1)[:, ::-1]
+        east = np.full((h, w), big, dtype=np.int64)
+        east[:, :-1] = nxt[:, 1:]
+        east = rows * w + east
+        prv = np.maximum.accumulate(np.where(stop_west, cols, -1), axis=1)
+        west = np.full((h, w), -1, dtype=np.int64)
+        west[:, 1:] = prv[:, :-1]
+        west = rows * w + west
+        nxt = np.minimum.accumulate(np.where(stop_south, rows, big)[::-1], axis=0)[::-1]
+        south = np.full((h, w), big, dtype=np.int64)
+        south[:-1] = nxt[1:]
+        south = south * w + cols
+        prv = np.maximum.accumulate(np.where(stop_north, rows, -1), axis=0)
+        north = np.full((h, w), -1, dtype=np.int64)
+        north[1:] = prv[:-1]
+        north = north * w + cols
+
+        # keyed by the padded index offset of the direction; border cells hold
+        # garbage but are never jumped from
+        self.next_stop = {}
+        for offset, table in ((1, east), (-1, west), (width, south), (-width, north)):
+            table = np.clip(table, 0, h * w - 1).astype(np.int32)
+            self.next_stop[offset] = array('i', table.tobytes())
+
+
+def jps_search(gmap: GridMap, start: Pos, goal: Pos, stats: Optional[dict] = None,
+               table: Optional[JumpTable] = None) -> Optional[List[Pos]]:
+    """Find an optimal path from start to goal ((row, col) tuples) with JPS.
+
+    Returns every cell of the path from start to goal (like astar_search, not
+    just the jump points), or None when the goal is unreachable. table is the
+    map's JumpTable (built here if not given). If stats is given it gets
+    'expanded' (jump points popped) and 'cost'.
+    """
+    if table is None:
+        table = JumpTable(gmap)
+    width = table.width
+    occ = table.occ
+    east = table.next_stop[1]
+    west = table.next_stop[-1]
+    south = table.next_stop[width]
+    north = table.next_stop[-width]
+    s = (start[0] + 1) * width + start[1] + 1
+    t = (goal[0] + 1) * width + goal[1] + 1
+    goal_row, goal_col = goal[0] + 1, goal[1] + 1
+    goal_row_start = goal_row * width
+    goal_row_end = goal_row_start + width
+
+    def heuristic(i):
+        return octile(abs(i // width - goal_row), abs(i % width - goal_col))
+
+    def jump_straight(i, d):
+        # next jump point from i along straight offset d, or -1 (hit a wall)
+        if d == 1:
+            stop = east[i]
+            if i < t <= stop and i // width == goal_row:
+                return t
+        elif d == -1:
+            stop = west[i]
+            if stop <= t < i and i // width == goal_row:
+                return t
+        elif d > 0:
+            stop = south[i]
+            if i < t <= stop and i % width == goal_col:
+                return t
+        else:
+            stop = north[i]
+            if stop <= t < i and i % width == goal_col:
+                return t
+        return -1 if occ[stop] else stop
+
+    def jump_diagonal(i, dh, dv):
+        # walk diagonally (dh horizontal, dv vertical offset); a cell is a jump
+        # point if it has a forced neighbor or a straight jump from it succeeds
+        d = dh + dv
+        along_row = east if dh > 0 else west
+        along_col = south if dv > 0 else north
+        while True:
+            i += d
+            if occ[i]:
+                return -1
+            if i == t:
+                return i
+            if (occ[i - dh] and not occ[i - dh + dv]) or (occ[i - dv] and not occ[i - dv + dh]):
+                return i
+            if not occ[along_row[i]] or not occ[along_col[i]]:
+                return i
+            # both straight jumps hit a wall; they may still pass the goal
+            if goal_row_start <= i < goal_row_end or i % width == goal_col:
+                if jump_straight(i, dh) != -1 or jump_straight(i, dv) != -1:
+                    return i
+
+    def jump(i, dh, dv):
+        if dh and dv:
+            return jump_diagonal(i, dh, dv)
+        return jump_straight(i, dh or dv)
+
+    all_dirs = tuple((dh, dv) for dh in (-1, 0, 1) for dv in (-width, 0, width) if dh or dv)
+
+    def directions(i, parent):
+        # pruned set of (dh, dv) directions to jump in from i, coming from parent
+        if parent < 0:
+            return all_dirs
+        pr, pc = divmod(parent, width)
+        r, c = divmod(i, width)
+        dh = (c > pc) - (c < pc)
+        dv = ((r > pr) - (r < pr)) * width
+        dirs = []
+        if dh and dv:
+            dirs.append((dh, 0))
+            dirs.append((0, dv))
+            dirs.append((dh, dv))
+            if occ[i - dh]:
+                dirs.append((-dh, dv))
+            if occ[i - dv]:
+                dirs.append((dh, -dv))
+        elif dh:
+            dirs.append((dh, 0))
+            if occ[i + width]:
+                dirs.append((dh, width))
+            if occ[i - width]:
+                dirs.append((dh, -width))
+        else:
+            dirs.append((0, dv))
+            if occ[i + 1]:
+                dirs.append((1, dv))
+            if occ[i - 1]:
+                dirs.append((-1, dv))
+        return dirs
+
+    g: Dict[int, float] = {s: 0.0}
+    parent: Dict[int, int] = {s: -1}
+    closed = set()
+    h = heuristic(s)
+    open_heap = [(h, h, 0, s)]
+    count = 1
+    expanded = 0
+
+    while open_heap:
+        _, _, _, current = heapq.heappop(open_heap)
+        if current in closed:
+            continue  # stale entry left behind by a better path
+        expanded += 1
+        if current == t:
+            if stats is not None:
+                stats['expanded'] = expanded
+                stats['cost'] = g[t]
+            return _expand_path(gmap, parent, t, width)
+        closed.add(current)
+
+        current_g = g[current]
+        cr, cc = divmod(current, width)
+        for dh, dv in directions(current, parent[current]):
+            jp = jump(current, dh, dv)
+            if jp < 0 or jp in closed:
+                continue
+            jr, jc = divmod(jp, width)
+            # jump points are reached along a straight or diagonal line
+            tentative_g = current_g + octile(abs(jr - cr), abs(jc - cc))
+            if tentative_g >= g.get(jp, float('inf')):
+                continue
+            g[jp] = tentative_g
+            parent[jp] = current
+            h = heuristic(jp)
+            heapq.heappush(open_heap, (tentative_g + h, h, count, jp))
+            count += 1
+
+    if stats is not None:
+        stats['expanded'] = expanded
+        stats['cost'] = None
+    return None
+
+
+def _expand_path(gmap: GridMap, parent: Dict[int, int], goal_idx: int, width: int) -> List[Pos]:
+    """Turn the chain of jump points into the full cell path (unpadded (row, col))."""
+    jump_points = []
+    current = goal_idx
+    while current != -1:
+        jump_points.append(divmod(current, width))
+        current = parent[current]
+    jump_points.reverse()
+
+    r, c = jump_points[0]
+    path = [(r - 1, c - 1)]
+    for nr, nc in jump_points[1:]:
+        dr = (nr > r) - (nr < r)
+        dc = (nc > c) - (nc < c)
+        while (r, c) != (nr, nc):
+            r += dr
+            c += dc
+            path.append((r - 1, c - 1))
+    return path
@@ -0,0 +1,91 @@
+"""Seeded map and query generators for benchmarks and experiments."""
+import random
+from typing import List, Tuple
+
+import numpy as np
+
+from grid_map import GridMap
+
+Pos = Tuple[int, int]
+
+
+def random_map(rows: int, cols: int, density: float, seed: int = 0) -> GridMap:
+    """Map with each cell blocked independently with probability density."""
+    gmap = GridMap(rows, cols)
+    rng = np.random.default_rng(seed)
+    gmap.occupancy_array()[:] = rng.random((rows, cols)) < density
+    return gmap
+
+
+def random_free_cell(gmap: GridMap, rng: random.Random) -> Pos:
+    while True:
+        row = rng.randrange(gmap.rows)
+        col = rng.randrange(gmap.cols)
+        if not gmap.is_obstacle(row, col):
+            return row, col
+
+
+def random_queries(gmap: GridMap, count: int, seed: int = 0) -> List[Tuple[Pos, Pos]]:
+    """count (start, goal) pairs of free cells."""
+    rng = random.Random(seed)
+    return [(random_free_cell(gmap, rng), random_free_cell(gmap, rng)) for _ in range(count)]
+
+
+def maze_map(rows: int, cols: int, seed: int = 0) -> GridMap:
+    """Perfect maze with 1-cell corridors (recursive backtracker).
+
+    Corridor cells sit on odd (row, col); walls fill the rest, so the pillars
+    at even/even positions also stop diagonal moves from slipping through.
+    """
+    gmap = GridMap(rows, cols)
+    occ = gmap.occupancy_array()
+    occ[:] = 1
+    rng = random.Random(seed)
+    cell_rows = (rows - 1) // 2
+    cell_cols = (cols - 1) // 2
+    if cell_rows == 0 or cell_cols == 0:
+        return gmap
+    visited = bytearray(cell_rows * cell_cols)
+    stack = [(0, 0)]
+    visited[0] = 1
+    occ[1, 1] = 0
+    while stack:
+        r, c = stack[-1]
+        options = [(r + dr, c + dc) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                   if 0 <= r + dr < cell_rows and 0 <= c + dc < cell_cols
+                   and not visited[(r + dr) * cell_cols + c + dc]]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc = rng.choice(options)
+        visited[nr * cell_cols + nc] = 1
+        occ[2 * nr + 1, 2 * nc + 1] = 0
+        occ[r + nr + 1, c + nc + 1] = 0  # knock down the wall between the two cells
+        stack.append((nr, nc))
+    return gmap
+
+
+def rooms_map(rows: int, cols: int, room_size: int = 16, door_width: int = 2, seed: int = 0) -> GridMap:
+    """Grid of square rooms separated by 1-cell walls, with one door in every wall segment.
+
+    Every room opens onto each of its neighbors, so all free cells are
+    connected; doors sit at random offsets along their wall.
+    """
+    gmap = GridMap(rows, cols)
+    occ = gmap.occupancy_array()
+    rng = random.Random(seed)
+    step = room_size + 1
+    occ[::step, :] = 1
+    occ[:, ::step] = 1
+    width = min(door_width, room_size)
+    for wall in range(step, rows, step):  # horizontal walls: one door per room above them
+        for left in range(1, cols, step):
+            span = min(room_size, cols - left)
+            at = left + rng.randrange(max(1, span - width + 1))
+            occ[wall, at:at + width] = 0
+    for wall in range(step, cols, step):  # vertical walls: one door per room left of them
+        for top in range(1, rows, step):
+            span = min(room_size, rows - top)
+            at = top + rng.randrange(max(1, span - width + 1))
+            occ[at:at + width, wall] = 0
+    return gmap
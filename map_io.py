@@ -0,0 +1,196 @@
+"""Saving and loading maps: a compact binary format and Moving AI benchmark files.
+
+The binary format (.gmap) is a 64-byte header followed by a layer table and
+64-byte aligned data blocks, all little-endian:
+
+    header   magic b'GMAP', version, flags, rows, cols, start, goal, layer count
+    table    per cost layer: 32-byte utf-8 name, data offset
+    data     occupancy, then one (rows, cols) float32 block per cost layer
+
+The occupancy is bit-packed by default (one bit per cell, 8x smaller than the
+GridMap's one byte per cell) and unpacked in one vectorized call on load. Maps
+saved with packed=False keep one byte per cell instead, and load_map() then
+hands the GridMap a copy-on-write view of the memory-mapped file: opening
+takes the same time whatever the map size, pages are read on first touch, and
+edits stay in memory without touching the file. Cost layers are always
+returned as lazy memory-mapped views.
+
+Moving AI (movingai.com) .map and .scen files can be read and written to run
+the standard scenario sets. Their optimal lengths assume sqrt(2) diagonals and
+no corner cutting, while the planners here use 1.414 and only require the
+destination cell to be free, so their costs are not directly comparable.
+"""
+import mmap
+import struct
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from grid_map import GridMap
+
+Pos = Tuple[int, int]
+
+MAGIC = b'GMAP'
+FORMAT_VERSION = 1
+FLAG_PACKED = 1
+ALIGN = 64
+LAYER_NAME_BYTES = 32
+
+# magic, version, flags, rows, cols, start row/col, goal row/col (-1 when unset), layer count
+_HEADER = struct.Struct('<4sHHIIiiiiH')
+_LAYER = struct.Struct(f'<{LAYER_NAME_BYTES}sQ')
+
+# Moving AI terrain: '.', 'G' ground and 'S' swamp are passable; trees, out of bounds and water are not
+MOVINGAI_PASSABLE = b'.GS'
+
+
+class MapFile:
+    """What load_map() returns: the GridMap, start/goal (None when not saved) and the cost layers by name.
+
+    With a memory-mapped occupancy or layers, the file stays mapped for as
+    long as the GridMap or a layer array is alive.
+    """
+
+    def __init__(self, gmap: GridMap, start: Optional[Pos], goal: Optional[Pos], layers: Dict[str, np.ndarray]):
+        self.gmap = gmap
+        self.start = start
+        self.goal = goal
+        self.layers = layers
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def save_map(path: str, gmap: GridMap, start: Optional[Pos] = None, goal: Optional[Pos] = None,
+             layers: Optional[Dict[str, np.ndarray]] = None, packed: bool = True):
+    """Write gmap (plus start/goal and named (rows, cols) cost layers) to path.
+
+    packed=False stores one byte per cell so load_map() can map the occupancy
+    without reading it; see the module docstring.
+    """
+    layers = layers or {}
+    shape = (gmap.rows, gmap.cols)
+    occ = gmap.occupancy_array()
+    occupancy = np.packbits(occ.ravel() != 0, bitorder='little') if packed else (occ != 0).astype(np.uint8).ravel()
+    blocks = [occupancy]
+    table = []
+    offset = _aligned(_HEADER.size + len(layers) * _LAYER.size)
+    offsets = [offset]
+    offset = _aligned(offset + occupancy.nbytes)
+    for name, layer in layers.items():
+        encoded = name.encode('utf-8')
+        if len(encoded) > LAYER_NAME_BYTES:
+            raise ValueError(f"layer name {name!r} is longer than {LAYER_NAME_BYTES} bytes")
+        layer = np.asarray(layer, dtype='<f4')
+        if layer.shape != shape:
+            raise ValueError(f"layer {name!r} has shape {layer.shape}, expected {shape}")
+        table.append(_LAYER.pack(encoded, offset))
+        blocks.append(layer)
+        offsets.append(offset)
+        offset = _aligned(offset + layer.nbytes)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_PACKED if packed else 0, gmap.rows, gmap.cols,
+                             *(start or (-1, -1)), *(goal or (-1, -1)), len(layers)))
+        f.write(b''.join(table))
+        for block, at in zip(blocks, offsets):
+            f.seek(at)
+            f.write(np.ascontiguousarray(block).data)
+        f.truncate(offset)
+
+
+def load_map(path: str) -> MapFile:
+    """Open a map written by save_map(); raises ValueError for anything else."""
+    with open(path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    if len(mapping) < _HEADER.size:
+        raise ValueError(f"{path}: file too short for a map header")
+    magic, version, flags, rows, cols, sr, sc, gr, gc, num_layers = _HEADER.unpack_from(mapping)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a map file (bad magic {magic!r})")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported map format version {version}")
+    size = rows * cols
+    data_start = _aligned(_HEADER.size + num_layers * _LAYER.size)
+    if flags & FLAG_PACKED:
+        packed = np.frombuffer(mapping, dtype=np.uint8, count=-(-size // 8), offset=data_start)
+        occupancy = bytearray(np.unpackbits(packed, count=size, bitorder='little').data)
+    else:
+        occupancy = memoryview(mapping)[data_start:data_start + size]
+    layers = {}
+    for i in range(num_layers):
+        name, offset = _LAYER.unpack_from(mapping, _HEADER.size + i * _LAYER.size)
+        layer = np.frombuffer(mapping, dtype='<f4', count=size, offset=offset).reshape(rows, cols)
+        layers[name.rstrip(b'\0').decode('utf-8')] = layer
+    start = (sr, sc) if sr >= 0 else None
+    goal = (gr, gc) if gr >= 0 else None
+    return MapFile(GridMap(rows, cols, occupancy), start, goal, layers)
+
+
+# -- Moving AI benchmark files ---------------------------------------------
+
+class Scenario(NamedTuple):
+    bucket: int
+    map_name: str
+    width: int
+    height: int
+    start: Pos  # (row, col); the file stores x (column) first
+    goal: Pos
+    optimal_length: float
+
+
+def read_movingai_map(path: str) -> GridMap:
+    """Load a Moving AI .map file ('type octile' header, then one line per row)."""
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines()
+    header = {}
+    for i, line in enumerate(lines):
+        if line.strip() == b'map':
+            break
+        key, _, value = line.partition(b' ')
+        header[key.strip()] = value.strip()
+    else:
+        raise ValueError(f"{path}: no 'map' line found")
+    try:
+        rows, cols = int(header[b'height']), int(header[b'width'])
+    except (KeyError, ValueError):
+        raise ValueError(f"{path}: missing or invalid height/width") from None
+    body = lines[i + 1:i + 1 + rows]
+    if len(body) != rows or any(len(line) < cols for line in body):
+        raise ValueError(f"{path}: expected {rows} rows of {cols} cells")
+    cells = np.frombuffer(b''.join(line[:cols] for line in body), dtype=np.uint8)
+    passable = np.isin(cells, np.frombuffer(MOVINGAI_PASSABLE, dtype=np.uint8))
+    return GridMap(rows, cols, bytearray((~passable).astype(np.uint8).data))
+
+
+def write_movingai_map(path: str, gmap: GridMap):
+    """Write gmap as a Moving AI .map file ('.' free, '@' blocked)."""
+    chars = np.where(gmap.occupancy_array() != 0, ord('@'), ord('.')).astype(np.uint8)
+    with open(path, 'wb') as f:
+        f.write(b'type octile\nheight %d\nwidth %d\nmap\n' % (gmap.rows, gmap.cols))
+        f.write(b'\n'.join(row.tobytes() for row in chars))
+        f.write(b'\n')
+
+
+def read_scen(path: str) -> List[Scenario]:
+    """Load a Moving AI .scen file (version 1 tab-separated rows)."""
+    scenarios = []
+    with open(path) as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 9:
+                continue  # 'version 1' header and blank lines
+            bucket, map_name, width, height, sx, sy, gx, gy, optimal = fields[:9]
+            scenarios.append(Scenario(int(bucket), map_name, int(width), int(height),
+                                      (int(sy), int(sx)), (int(gy), int(gx)), float(optimal)))
+    return scenarios
+
+
+def write_scen(path: str, scenarios: List[Scenario]):
+    """Write scenarios as a Moving AI version 1 .scen file."""
+    with open(path, 'w') as f:
+        f.write('version 1\n')
+        for s in scenarios:
+            f.write(f"{s.bucket}\t{s.map_name}\t{s.width}\t{s.height}\t{s.start[1]}\t{s.start[0]}\t"
+                    f"{s.goal[1]}\t{s.goal[0]}\t{s.optimal_length:.8f}\n")
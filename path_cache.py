@@ -0,0 +1,235 @@
+"""LRU cache of A* results on a GridMap, kept valid across obstacle edits.
+
+PathCache answers repeated (start, goal) queries from memory and runs
+astar_search only on a miss. With optimal searches (weight 1 and an
+admissible heuristic) a query whose start and goal both lie, in that order,
+on a cached path is answered with the piece of that path between them: every
+subpath of an optimal path is optimal.
+
+Edits drop only the entries they can affect, through a map listener:
+  - a cell that became blocked drops the paths that cross it (an inverted
+    index maps every cell to the entries whose path uses it);
+  - a cell that became free drops the paths that a detour through it could
+    beat: those costing more than the octile distance from their start to
+    the cell and on to their goal (a lower bound on any path through it),
+    plus every cached "no path".
+Paths that stay are still valid and no worse than before. Edits that do not
+say which cells changed, edits freeing more than FLUSH_FREED cells at once,
+and changes the listener does not see (set_costs, noticed through
+GridMap.version) flush the whole cache.
+
+Counters for monitoring are in stats().
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import astar
+from grid_map import DIAGONAL_COST, GridMap
+
+Pos = Tuple[int, int]
+Key = Tuple[int, int]  # (flat start index, flat goal index)
+
+# returned by lookup() when the query is not cached (None means "cached: no path")
+MISS = object()
+
+# freed cells in one edit above which the cache is flushed instead of checked entry by entry
+FLUSH_FREED = 64
+
+
+class PathCache:
+    def __init__(self, gmap: GridMap, capacity: int = 1024, heuristic='octile', weight: float = 1.0,
+                 min_clearance: float = 0.0, reuse_subpaths: bool = True):
+        """Cache up to capacity results of astar_search(gmap, ...) with these search options.
+
+        reuse_subpaths only takes effect for optimal searches (weight 1 and
+        a heuristic from astar.ADMISSIBLE). Call detach() when done with it.
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.gmap = gmap
+        self.capacity = capacity
+        self.heuristic = heuristic
+        self.weight = weight
+        self.min_clearance = min_clearance
+        self.reuse_subpaths = reuse_subpaths and weight == 1.0 and heuristic in astar.ADMISSIBLE
+        # key -> (flat indices of the path, or None when unreachable; its cost)
+        self._entries: 'OrderedDict[Key, Tuple[Optional[List[int]], float]]' = OrderedDict()
+        # cell -> {key: position of the cell in that entry's path}
+        self._index: Dict[int, Dict[Key, int]] = {}
+        # a changed cell affects cells up to this far away (the clearance of those cells may change)
+        self._reach = int(np.ceil(min_clearance))
+        self._version = gmap.version
+        self.hits = self.subpath_hits = self.misses = 0
+        self.evictions = self.invalidations = self.flushes = 0
+        gmap.add_listener(self._on_map_change)
+
+    def detach(self):
+        """Stop listening to the map."""
+        self.gmap.remove_listener(self._on_map_change)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def path(self, start: Pos, goal: Pos) -> Optional[List[Pos]]:
+        """The path from start to goal, as astar_search returns it, from the cache when possible."""
+        cached = self.lookup(start, goal)
+        if cached is not MISS:
+            return cached
+        path = astar.astar_search(self.gmap, start, goal, heuristic=self.heuristic, weight=self.weight,
+                                  min_clearance=self.min_clearance)
+        self.put(start, goal, path)
+        return path
+
+    def lookup(self, start: Pos, goal: Pos):
+        """The cached path (a list of (row, col)), None for a cached "no path", or MISS."""
+        self._sync()
+        s, t = self.gmap.index(*start), self.gmap.index(*goal)
+        entry = self._entries.get((s, t))
+        if entry is not None:
+            self._entries.move_to_end((s, t))
+            self.hits += 1
+            return self._cells(entry[0])
+        if self.reuse_subpaths:
+            sub = self._subpath(s, t)
+            if sub is not None:
+                self.subpath_hits += 1
+                return self._cells(sub)
+        self.misses += 1
+        return MISS
+
+    def put(self, start: Pos, goal: Pos, path: Optional[Sequence[Pos]], cost: Optional[float] = None):
+        """Store a search result for the current map (path None: unreachable); cost defaults to the path's."""
+        self._sync()
+        key = (self.gmap.index(*start), self.gmap.index(*goal))
+        if key in self._entries:
+            self._drop(key)
+        if path is None:
+            cells, cost = None, float('inf')
+        else:
+            cells = [self.gmap.index(row, col) for row, col in path]
+            if cost is None:
+                cost = astar.path_cost(list(path), self.gmap)
+            for i, cell in enumerate(cells):
+                self._index.setdefault(cell, {})[key] = i
+        self._entries[key] = (cells, cost)
+        while len(self._entries) > self.capacity:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        self._entries.clear()
+        self._index.clear()
+
+    def stats(self) -> dict:
+        """Counters since creation: hits (exact and subpath), misses, evictions, invalidations, flushes."""
+        lookups = self.hits + self.subpath_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'subpath_hits': self.subpath_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.subpath_hits) / lookups if lookups else 0.0,
+            'evictions': self.evictions,          # dropped to make room, least recently used first
+            'invalidations': self.invalidations,  # dropped because an edit could change them
+            'flushes': self.flushes,              # whole-cache drops
+            'version': self._version,
+        }
+
+    def _cells(self, cells: Optional[List[int]]) -> Optional[List[Pos]]:
+        if cells is None:
+            return None
+        cols = self.gmap.cols
+        return [divmod(cell, cols) for cell in cells]
+
+    def _subpath(self, s: int, t: int) -> Optional[List[int]]:
+        """The piece from s to t of a cached path that visits s and then t, if there is one."""
+        from_s = self._index.get(s)
+        to_t = self._index.get(t)
+        if not from_s or not to_t:
+            return None
+        if len(to_t) < len(from_s):
+            candidates = [key for key in to_t if key in from_s]
+        else:
+            candidates = [key for key in from_s if key in to_t]
+        for key in candidates:
+            i, j = from_s[key], to_t[key]
+            if i <= j:
+                self._entries.move_to_end(key)
+                return self._entries[key][0][i:j + 1]
+        return None
+
+    def _drop(self, key: Key):
+        cells, _ = self._entries.pop(key)
+        for cell in cells or ():
+            users = self._index[cell]
+            del users[key]
+            if not users:
+                del self._index[cell]
+
+    def _flush(self):
+        self.invalidations += len(self._entries)
+        self.clear()
+        self.flushes += 1
+
+    def _sync(self):
+        # a version the listener did not see means a change it was not told about (set_costs)
+        if self.gmap.version != self._version:
+            self._flush()
+            self._version = self.gmap.version
+
+    def _on_map_change(self, changed: Optional[Sequence[int]]):
+        if changed is None:
+            self._flush()
+        elif len(changed):
+            occ = self.gmap.occupancy
+            freed = [cell for cell in changed if not occ[cell]]
+            if len(freed) > FLUSH_FREED:
+                self._flush()
+            else:
+                for cell in changed:
+                    if occ[cell]:
+                        self._blocked(cell)
+                for cell in freed:
+                    self._freed(cell)
+        self._version = self.gmap.version
+
+    def _blocked(self, cell: int):
+        """Drop the paths through cell, or within reach of it for a robot with clearance."""
+        row, col = divmod(cell, self.gmap.cols)
+        reach = self._reach
+        hit = set()
+        for r in range(max(row - reach, 0), min(row + reach + 1, self.gmap.rows)):
+            for c in range(max(col - reach, 0), min(col + reach + 1, self.gmap.cols)):
+                users = self._index.get(r * self.gmap.cols + c)
+                if users:
+                    hit.update(users)
+        for key in hit:
+            self._drop(key)
+        self.invalidations += len(hit)
+
+    def _freed(self, cell: int):
+        """Drop the entries a path through cell (or the cells it frees for the robot) could improve."""
+        if not self._entries:
+            return
+        keys = list(self._entries)
+        ends = np.array(keys, dtype=np.int64)
+        costs = np.array([cost for _, cost in self._entries.values()])
+        row, col = divmod(cell, self.gmap.cols)
+        s_rows, s_cols = np.divmod(ends[:, 0], self.gmap.cols)
+        t_rows, t_cols = np.divmod(ends[:, 1], self.gmap.cols)
+        # octile(start -> cell) + octile(cell -> goal), less the slack of cells up to reach away
+        bound = (_octile(np.abs(s_rows - row), np.abs(s_cols - col)) + _octile(np.abs(t_rows - row), np.abs(t_cols - col))
+                 - 2 * DIAGONAL_COST * self._reach) * (self.gmap.cost_scale * self.gmap.min_cost)
+        stale = np.flatnonzero(costs > bound - 1e-6)
+        for i in stale.tolist():
+            self._drop(keys[i])
+        self.invalidations += len(stale)
+
+
+def _octile(dr: np.ndarray, dc: np.ndarray) -> np.ndarray:
+    """astar.octile for arrays of deltas."""
+    return np.maximum(dr, dc) + (DIAGONAL_COST - 1.0) * np.minimum(dr, dc)
@@ -0,0 +1,120 @@
+"""Bulk loading of obstacle boxes and point clouds into a GridMap.
+
+World coordinates map to cells through a resolution (world units per cell)
+and an origin (world position of the corner of cell (0, 0)); axis 0 is the
+row and axis 1 the column, like the 2D AABBs used with the grid. 3D boxes and
+clouds are projected onto the grid, optionally keeping only what overlaps a
+height band (axis 2), e.g. the robot's height above the floor.
+
+Boxes are painted with a 2D difference array: +1/-1 at the four corners of
+every box's cell range, then one cumulative sum per axis, so the cost does not
+depend on how many cells each box covers. Inflation by the robot radius
+dilates the result with a disk, one prefix-sum run test per disk row.
+Listeners registered on the map are told exactly which cells became blocked.
+"""
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ABBB_Class import AABB, as_bounds
+from grid_map import GridMap
+
+Boxes = Union[Sequence[AABB], np.ndarray]
+
+
+def rasterize_boxes(gmap: GridMap, boxes: Boxes, resolution: float = 1.0,
+                    origin: Tuple[float, float] = (0.0, 0.0), inflate: float = 0.0,
+                    height_range: Optional[Tuple[float, float]] = None) -> int:
+    """Mark every cell overlapped by a box as an obstacle; returns how many cells became blocked.
+
+    boxes is a sequence of AABBs or an (M, 2, D) array of [min, max] rows
+    (D >= 2). inflate grows the obstacles by that distance in world units.
+    """
+    mins, maxs = as_bounds(boxes)
+    if len(mins) == 0:
+        return 0
+    if mins.shape[1] < 2:
+        raise ValueError(f"expected boxes with D >= 2, got D = {mins.shape[1]}")
+    bounds = np.stack([mins, maxs], axis=1)
+    if height_range is not None:
+        _check_3d(bounds.shape[2])
+        bounds = bounds[_in_band(bounds[:, 0, 2], bounds[:, 1, 2], height_range)]
+    rows, cols = gmap.rows, gmap.cols
+    org = np.asarray(origin, dtype=np.float64)
+    lo = np.floor((bounds[:, 0, :2] - org) / resolution).astype(np.int64)
+    hi = np.ceil((bounds[:, 1, :2] - org) / resolution).astype(np.int64) - 1
+    hi = np.maximum(hi, lo)  # zero-size boxes still cover the cell they sit in
+    # drop boxes that are entirely off the map, clip the rest
+    on_map = (hi[:, 0] >= 0) & (lo[:, 0] < rows) & (hi[:, 1] >= 0) & (lo[:, 1] < cols)
+    lo = np.maximum(lo[on_map], 0)
+    hi = np.minimum(hi[on_map], [rows - 1, cols - 1])
+
+    width = cols + 1
+    r0, c0 = lo[:, 0], lo[:, 1]
+    r1, c1 = hi[:, 0] + 1, hi[:, 1] + 1
+    corners = np.concatenate([r0 * width + c0, r0 * width + c1, r1 * width + c0, r1 * width + c1])
+    signs = np.repeat(np.array([1, -1, -1, 1], dtype=np.int64), len(r0))
+    diff = np.bincount(corners, weights=signs, minlength=(rows + 1) * width).reshape(rows + 1, width)
+    covered = diff.cumsum(axis=0).cumsum(axis=1)[:rows, :cols] > 0
+    return _paint(gmap, covered, inflate / resolution)
+
+
+def rasterize_points(gmap: GridMap, points, resolution: float = 1.0,
+                     origin: Tuple[float, float] = (0.0, 0.0), inflate: float = 0.0,
+                     height_range: Optional[Tuple[float, float]] = None) -> int:
+    """Mark every cell containing a point of an (N, D) cloud as an obstacle; returns how many became blocked."""
+    points = np.asarray(points)
+    if points.ndim != 2 or points.shape[1] < 2:
+        raise ValueError(f"expected an (N, 2) or (N, 3) array of points, got shape {points.shape}")
+    if height_range is not None:
+        _check_3d(points.shape[1])
+        points = points[_in_band(points[:, 2], points[:, 2], height_range)]
+    cells = np.floor((points[:, :2] - np.asarray(origin)) / resolution).astype(np.int64)
+    on_map = (cells[:, 0] >= 0) & (cells[:, 0] < gmap.rows) & (cells[:, 1] >= 0) & (cells[:, 1] < gmap.cols)
+    covered = np.zeros((gmap.rows, gmap.cols), dtype=bool)
+    covered.ravel()[cells[on_map, 0] * gmap.cols + cells[on_map, 1]] = True
+    return _paint(gmap, covered, inflate / resolution)
+
+
+def dilate(mask: np.ndarray, radius: float) -> np.ndarray:
+    """Dilate a 2D boolean mask by a disk of radius cells (cell centers within radius)."""
+    reach = int(np.floor(radius))
+    if reach <= 0:
+        return mask.copy()
+    rows, cols = mask.shape
+    # prefix[r, reach + c] = blocked cells in mask[r, :c], padded with its edge values
+    prefix = np.zeros((rows, cols + 1 + 2 * reach), dtype=np.int32)
+    np.cumsum(mask, axis=1, out=prefix[:, reach + 1:reach + 1 + cols])
+    prefix[:, reach + 1 + cols:] = prefix[:, reach + cols:reach + 1 + cols]
+    out = np.zeros_like(mask)
+    runs = {}  # half-width -> mask of cells with a blocked cell within that many columns
+    for dr in range(-min(reach, rows - 1), min(reach, rows - 1) + 1):
+        half = int(np.floor(np.sqrt(radius * radius - dr * dr)))
+        if half not in runs:
+            runs[half] = prefix[:, reach + half + 1:reach + half + 1 + cols] > prefix[:, reach - half:reach - half + cols]
+        # out[r] |= runs[half][r + dr]
+        src = runs[half][max(dr, 0):rows + min(dr, 0)]
+        out[max(-dr, 0):rows - max(dr, 0)] |= src
+    return out
+
+
+def _paint(gmap: GridMap, covered: np.ndarray, radius: float) -> int:
+    if radius > 0:
+        covered = dilate(covered, radius)
+    occ = gmap.occupancy_array()
+    new = covered & (occ == 0)
+    changed = np.flatnonzero(new)
+    if changed.size == 0:
+        return 0
+    occ[new] = 1
+    gmap.invalidate(changed)
+    return int(changed.size)
+
+
+def _check_3d(ndim: int):
+    if ndim < 3:
+        raise ValueError(f"height_range needs 3D data, got {ndim}D")
+
+
+def _in_band(lo: np.ndarray, hi: np.ndarray, band: Tuple[float, float]) -> np.ndarray:
+    return (hi >= band[0]) & (lo <= band[1])
@@ -0,0 +1,85 @@
+"""Replay of a recorded A* search, rendered as one image blit per frame.
+
+The search runs at full speed with an instrument.TraceBuffer attached; Replay
+turns its events into per-cell "opened at" / "expanded at" event numbers, so
+the state after any number of expansions is a couple of vectorized
+comparisons. That makes scrubbing backwards as cheap as playing forwards.
+A frame is an array of palette indices; render() maps it to RGB, writes it to
+a one-pixel-per-cell surface with pygame.surfarray and scales that onto the
+grid area in one blit instead of drawing a rectangle per cell.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from astar import EXPANDED
+from grid_map import GridMap
+
+Pos = Tuple[int, int]
+
+# palette indices of a frame
+EMPTY, OBSTACLE, OPEN, VISITED, PATH, START, GOAL = range(7)
+# the visualizer's Cell colors, by palette index
+PALETTE = np.array([
+    (0, 0, 0),        # empty
+    (255, 255, 255),  # obstacle
+    (0, 255, 255),    # open set
+    (255, 165, 0),    # visited
+    (255, 0, 255),    # path
+    (0, 255, 0),      # start
+    (0, 0, 255),      # goal
+], dtype=np.uint8)
+
+
+class Replay:
+    def __init__(self, events: np.ndarray, gmap: GridMap, start: Pos, goal: Pos,
+                 path: Optional[List[Pos]] = None):
+        """Replay events (instrument.EVENT_DTYPE, oldest first) of a search from start to goal on gmap.
+
+        The obstacles are copied, so later edits of gmap do not show up in
+        the replay. The path, if given, is shown on the last step.
+        """
+        self.rows, self.cols = gmap.rows, gmap.cols
+        n = self.rows * self.cols
+        kinds = events['kind']
+        idx = events['idx']
+        # event number of the first open / expansion of each cell, len(events) if never
+        self.opened_at = np.full(n, len(events), dtype=np.int64)
+        self.expanded_at = np.full(n, len(events), dtype=np.int64)
+        for at, kind in ((self.expanded_at, kinds == EXPANDED), (self.opened_at, kinds != EXPANDED)):
+            cells, first = np.unique(idx[kind], return_index=True)
+            at[cells] = np.flatnonzero(kind)[first]
+        # step k shows the events before the (k + 1)-th expansion; the last step shows them all
+        self.ends = np.append(np.flatnonzero(kinds == EXPANDED), len(events))
+
+        self.base = np.where(gmap.occupancy_array().ravel() != 0, OBSTACLE, EMPTY).astype(np.uint8)
+        self.fixed = np.array([start[0] * self.cols + start[1], goal[0] * self.cols + goal[1]])
+        self.base[self.fixed] = (START, GOAL)
+        self.path = np.array([r * self.cols + c for r, c in path or []], dtype=np.int64)
+        self._surface = None
+
+    @property
+    def steps(self) -> int:
+        """Index of the last step (all events applied, path shown): the number of expansions."""
+        return len(self.ends) - 1
+
+    def frame(self, step: int) -> np.ndarray:
+        """(rows, cols) uint8 palette indices of the grid after step expansions."""
+        step = min(max(step, 0), self.steps)
+        end = self.ends[step]
+        frame = self.base.copy()
+        frame[self.opened_at < end] = OPEN
+        frame[self.expanded_at < end] = VISITED
+        if step == self.steps:
+            frame[self.path] = PATH
+        frame[self.fixed] = self.base[self.fixed]
+        return frame.reshape(self.rows, self.cols)
+
+    def render(self, win: pygame.Surface, step: int, rect: pygame.Rect):
+        """Draw the frame of step scaled to rect on win."""
+        if self._surface is None:
+            self._surface = pygame.Surface((self.cols, self.rows))
+        # surfarray arrays are indexed [x, y]
+        pygame.surfarray.blit_array(self._surface, PALETTE[self.frame(step)].transpose(1, 0, 2))
+        win.blit(pygame.transform.scale(self._surface, rect.size), rect)
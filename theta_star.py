@@ -0,0 +1,227 @@
+"""Any-angle paths over a GridMap: Theta*, Lazy Theta* and string pulling.
+
+Grid paths turn in 45-degree steps, so even a straight run across open space
+comes back as a staircase of cells. Theta* searches the same 8-connected grid
+but lets a cell take the parent of its predecessor whenever the straight line
+between them is clear, so paths are chains of straight segments between
+corners. Lazy Theta* assumes the line is clear when a cell is generated and
+only checks it when the cell is expanded, which needs one line-of-sight test
+per expansion instead of one per neighbor. smooth_path() does the same for a
+path that already exists (e.g. from astar_search): it keeps only the cells
+where the path has to turn.
+
+Paths are returned as (k, 2) int32 NumPy arrays of (row, col) waypoints;
+expand_waypoints() turns them back into adjacent cells when a grid consumer
+needs them. Segment costs are Euclidean lengths between cell centers (a
+diagonal step costs sqrt(2) here, not 1.414), and the heuristic is the
+straight-line distance. The cost layer and min_clearance of astar_search are
+not used.
+
+line_of_sight() walks the cells the segment crosses with integer arithmetic
+and stops at the first obstacle. Where the segment passes exactly through a
+grid corner, the two cells touching that corner are not checked, matching
+the movement model: a diagonal move only needs its destination free.
+"""
+import heapq
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from grid_map import GridMap
+
+Pos = Tuple[int, int]
+
+SQRT2 = math.sqrt(2)
+
+
+def line_of_sight(gmap: GridMap, a: Pos, b: Pos) -> bool:
+    """True when no obstacle lies on the segment between the centers of cells a and b (b itself included)."""
+    occ = gmap.occupancy
+    cols = gmap.cols
+    row, col = a
+    dr = b[0] - row
+    dc = b[1] - col
+    step_r = 1 if dr > 0 else -1
+    step_c = 1 if dc > 0 else -1
+    adr = abs(dr)
+    adc = abs(dc)
+    # sign of err says whether the segment crosses a column or a row boundary next
+    err = adc - adr
+    left = adr + adc
+    while left > 0:
+        if err > 0:
+            col += step_c
+            err -= 2 * adr
+            left -= 1
+        elif err < 0:
+            row += step_r
+            err += 2 * adc
+            left -= 1
+        else:
+            # exactly through a corner: straight to the diagonal cell
+            row += step_r
+            col += step_c
+            err += 2 * (adc - adr)
+            left -= 2
+        if occ[row * cols + col]:
+            return False
+    return True
+
+
+def line_cells(a: Pos, b: Pos) -> np.ndarray:
+    """The cells from a to b that line_of_sight() checks, a included, as a (k, 2) int32 array."""
+    row, col = a
+    dr = b[0] - row
+    dc = b[1] - col
+    step_r = 1 if dr > 0 else -1
+    step_c = 1 if dc > 0 else -1
+    adr = abs(dr)
+    adc = abs(dc)
+    err = adc - adr
+    left = adr + adc
+    cells = [(row, col)]
+    while left > 0:
+        if err > 0:
+            col += step_c
+            err -= 2 * adr
+            left -= 1
+        elif err < 0:
+            row += step_r
+            err += 2 * adc
+            left -= 1
+        else:
+            row += step_r
+            col += step_c
+            err += 2 * (adc - adr)
+            left -= 2
+        cells.append((row, col))
+    return np.array(cells, dtype=np.int32)
+
+
+def theta_star_search(gmap: GridMap, start: Pos, goal: Pos, lazy: bool = True,
+                      stats: Optional[dict] = None) -> Optional[np.ndarray]:
+    """Any-angle path from start to goal as a (k, 2) int32 array of waypoints, or None.
+
+    lazy=True runs Lazy Theta* (one line-of-sight test per expansion),
+    lazy=False the original Theta* (one per generated neighbor); both give
+    paths of about the same length. If stats is given it gets 'expanded',
+    'los_checks' and 'cost' (None when unreachable).
+    """
+    masks = gmap.neighbor_masks()
+    move_table = gmap.move_table()
+    g, parent = gmap.search_arrays()
+    closed = bytearray(gmap.size)
+    cols = gmap.cols
+    goal_row, goal_col = goal
+    s = gmap.index(*start)
+    t = gmap.index(goal_row, goal_col)
+
+    g[s] = 0.0
+    parent[s] = s  # the start is its own parent, so every cell has one
+    h = math.hypot(start[0] - goal_row, start[1] - goal_col)
+    open_heap = [(h, h, 0, s)]
+    count = 1
+    expanded = checks = 0
+    found = False
+    while open_heap:
+        _, _, _, current = heapq.heappop(open_heap)
+        if closed[current]:
+            continue
+        row, col = divmod(current, cols)
+        p = parent[current]
+        if lazy and p != current:
+            checks += 1
+            if not line_of_sight(gmap, divmod(p, cols), (row, col)):
+                # the assumed shortcut is blocked: take the best expanded neighbor instead
+                best = math.inf
+                for offset, _, dr, dc in move_table[masks[current]]:
+                    neighbor = current + offset
+                    if closed[neighbor]:
+                        via = g[neighbor] + (SQRT2 if dr and dc else 1.0)
+                        if via < best:
+                            best = via
+                            p = neighbor
+                g[current] = best
+                parent[current] = p
+        expanded += 1
+        if current == t:
+            found = True
+            break
+        closed[current] = 1
+
+        p_row, p_col = divmod(p, cols)
+        g_p = g[p]
+        g_current = g[current]
+        for offset, _, dr, dc in move_table[masks[current]]:
+            neighbor = current + offset
+            if closed[neighbor]:
+                continue
+            n_row = row + dr
+            n_col = col + dc
+            if lazy:
+                via = p
+                tentative_g = g_p + math.hypot(n_row - p_row, n_col - p_col)
+            else:
+                if p != current:
+                    checks += 1
+                if p != current and line_of_sight(gmap, (p_row, p_col), (n_row, n_col)):
+                    via = p
+                    tentative_g = g_p + math.hypot(n_row - p_row, n_col - p_col)
+                else:
+                    via = current
+                    tentative_g = g_current + (SQRT2 if dr and dc else 1.0)
+            if tentative_g >= g[neighbor]:
+                continue
+            g[neighbor] = tentative_g
+            parent[neighbor] = via
+            h = math.hypot(n_row - goal_row, n_col - goal_col)
+            heapq.heappush(open_heap, (tentative_g + h, h, count, neighbor))
+            count += 1
+
+    if stats is not None:
+        stats.update(expanded=expanded, los_checks=checks, cost=float(g[t]) if found else None)
+    if not found:
+        return None
+    waypoints = [t]
+    while parent[waypoints[-1]] != waypoints[-1]:
+        waypoints.append(parent[waypoints[-1]])
+    waypoints.reverse()
+    return np.array([divmod(idx, cols) for idx in waypoints], dtype=np.int32)
+
+
+def smooth_path(gmap: GridMap, path: Sequence[Pos]) -> np.ndarray:
+    """String-pull a path of cells (list of (row, col) or (k, 2) array) into waypoints.
+
+    From each kept waypoint the path is followed as long as the straight line
+    back to it stays clear; the last cell that could still see it becomes the
+    next waypoint. Returns a (k, 2) int32 array that starts and ends where
+    path does and is never longer.
+    """
+    points = np.asarray(path, dtype=np.int32).reshape(-1, 2)
+    if len(points) <= 2:
+        return points.copy()
+    cells: List[Pos] = [tuple(p) for p in points.tolist()]
+    kept = [0]
+    for i in range(2, len(cells)):
+        if not line_of_sight(gmap, cells[kept[-1]], cells[i]):
+            kept.append(i - 1)
+    kept.append(len(cells) - 1)
+    return points[kept]
+
+
+def expand_waypoints(waypoints: np.ndarray) -> np.ndarray:
+    """The cells along the segments between waypoints, each once, as a (k, 2) int32 array."""
+    waypoints = np.asarray(waypoints, dtype=np.int32).reshape(-1, 2)
+    if len(waypoints) <= 1:
+        return waypoints.copy()
+    pairs = waypoints.tolist()
+    parts = [line_cells(a, b)[:-1] for a, b in zip(pairs, pairs[1:])]
+    parts.append(waypoints[-1:])
+    return np.concatenate(parts)
+
+
+def waypoint_cost(waypoints: np.ndarray) -> float:
+    """Euclidean length of the polyline through the waypoints, in cells."""
+    steps = np.diff(np.asarray(waypoints, dtype=np.float64).reshape(-1, 2), axis=0)
+    return float(np.hypot(steps[:, 0], steps[:, 1]).sum())
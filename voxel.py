@@ -0,0 +1,320 @@
+"""Sparse 3D voxel maps built from point clouds, and 26-connected A* over them.
+
+A VoxelMap covers an axis-aligned world volume (an ABBB_Class.AABB) with
+cubic voxels of side resolution, but only stores the occupied ones, in a hash
+of 8x8x8 bricks: a dict from brick key to a 512-bit Python int with one bit
+per voxel. Memory grows with the number of bricks that hold an obstacle (a
+couple of hundred bytes each), not with the volume: an empty 512^3 map costs
+nothing, and a surface scanned by LiDAR costs a few bytes per occupied voxel,
+against one byte per voxel of the whole volume for a dense grid. Clouds are
+inserted with one vectorized pass (floor, bounds test, one OR per 64-bit word
+of each brick) and can be inflated by a radius so a drone of that size can
+be planned as a point.
+
+Voxels are addressed by a key packing the coordinates into 21 bits each
+(key = x << 42 | y << 21 | z), so a neighbor is the key plus a constant
+offset, as with GridMap's flat index, and its brick is the key with the low
+three bits of every coordinate cleared.
+
+voxel_astar searches the 26-connected neighborhood (1.0 for a face move,
+1.414 along a face diagonal as on the 2D grid, 1.732 through a corner) with
+the matching 3D octile heuristic. Like diagonal moves on the grid, a move
+only needs its destination free. g-scores, parents and the closed set are
+dicts and sets keyed by voxel, so search memory grows with the voxels
+visited, not with the volume; max_expansions bounds a search whose goal is
+walled off, which would otherwise flood the whole volume.
+"""
+import heapq
+import math
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ABBB_Class import AABB
+from grid_map import DIAGONAL_COST, ORTHOGONAL_COST
+
+Voxel = Tuple[int, int, int]
+
+CORNER_COST = 1.732  # sqrt(3) for a move through a voxel corner, rounded like DIAGONAL_COST
+
+# (dx, dy, dz, step cost) for the 26 moves
+MOVES_3D = tuple(
+    (dx, dy, dz, (ORTHOGONAL_COST, DIAGONAL_COST, CORNER_COST)[abs(dx) + abs(dy) + abs(dz) - 1])
+    for dx in (-1, 0, 1)
+    for dy in (-1, 0, 1)
+    for dz in (-1, 0, 1)
+    if dx or dy or dz
+)
+
+# voxel keys: 21 bits per coordinate
+AXIS_BITS = 21
+MAX_SIDE = 1 << AXIS_BITS
+_Y_SHIFT = AXIS_BITS
+_X_SHIFT = 2 * AXIS_BITS
+_AXIS_MASK = MAX_SIDE - 1
+# clears the position inside the brick (low 3 bits of each coordinate)
+BRICK_MASK = ~(7 | 7 << _Y_SHIFT | 7 << _X_SHIFT)
+
+
+def _bit(key: int) -> int:
+    """Position of a voxel in its brick's 512-bit mask: z | y << 3 | x << 6 (low 3 bits of each)."""
+    return key & 7 | key >> (_Y_SHIFT - 3) & 56 | key >> (_X_SHIFT - 6) & 448
+
+
+def octile_3d(dx: int, dy: int, dz: int) -> float:
+    """Exact obstacle-free cost under the 26-way move model (deltas >= 0); admissible and consistent."""
+    low, mid, high = sorted((dx, dy, dz))
+    return high + (DIAGONAL_COST - ORTHOGONAL_COST) * (mid - low) + (CORNER_COST - ORTHOGONAL_COST) * low
+
+
+class VoxelMap:
+    def __init__(self, bounds: AABB, resolution: float = 1.0):
+        """An empty map of the 3D box bounds (world units) cut into voxels of side resolution."""
+        if bounds.ndim != 3:
+            raise ValueError(f"bounds must be 3D, got {bounds.ndim}D")
+        if not resolution > 0:
+            raise ValueError(f"resolution must be positive, got {resolution}")
+        self.bounds = bounds
+        self.resolution = float(resolution)
+        self.shape = tuple(int(n) for n in np.maximum(np.ceil((bounds.max - bounds.min) / resolution), 1))
+        if max(self.shape) > MAX_SIDE:
+            raise ValueError(f"at most {MAX_SIDE} voxels per axis, got {self.shape}")
+        self.bricks: Dict[int, int] = {}
+        self._count = 0
+
+    @classmethod
+    def from_points(cls, points, resolution: float = 1.0, bounds: Optional[AABB] = None,
+                    inflate: float = 0.0, margin: Optional[float] = None) -> 'VoxelMap':
+        """A map with every voxel holding a point of the (N, 3) cloud occupied.
+
+        bounds defaults to the cloud's AABB grown by margin on every side
+        (default: inflate plus one voxel, so there is room to fly around the
+        cloud). inflate grows the obstacles by that distance in world units.
+        """
+        points = np.asarray(points)
+        if bounds is None:
+            box = AABB.from_points(points)
+            grow = inflate + resolution if margin is None else margin
+            bounds = AABB(box.min - grow, box.max + grow)
+        vmap = cls(bounds, resolution)
+        vmap.add_points(points, inflate)
+        return vmap
+
+    def __len__(self) -> int:
+        """Number of occupied voxels."""
+        return self._count
+
+    def in_bounds(self, voxel: Voxel) -> bool:
+        return all(0 <= v < n for v, n in zip(voxel, self.shape))
+
+    @staticmethod
+    def key(voxel: Voxel) -> int:
+        return int(voxel[0]) << _X_SHIFT | int(voxel[1]) << _Y_SHIFT | int(voxel[2])
+
+    @staticmethod
+    def voxel(key: int) -> Voxel:
+        return key >> _X_SHIFT, key >> _Y_SHIFT & _AXIS_MASK, key & _AXIS_MASK
+
+    @staticmethod
+    def voxels(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(x, y, z) arrays of an array of voxel keys."""
+        return keys >> _X_SHIFT, keys >> _Y_SHIFT & _AXIS_MASK, keys & _AXIS_MASK
+
+    def voxel_of(self, point) -> Voxel:
+        """The voxel containing a world point (it may be out of bounds)."""
+        v = np.floor((np.asarray(point, dtype=np.float64) - self.bounds.min) / self.resolution)
+        return int(v[0]), int(v[1]), int(v[2])
+
+    def center(self, voxel: Voxel) -> np.ndarray:
+        """World position of the center of a voxel."""
+        return self.bounds.min + (np.asarray(voxel, dtype=np.float64) + 0.5) * self.resolution
+
+    def is_occupied(self, voxel: Voxel) -> bool:
+        key = self.key(voxel)
+        return bool(self.bricks.get(key & BRICK_MASK, 0) >> _bit(key) & 1)
+
+    def set_occupied(self, voxel: Voxel, occupied: bool = True):
+        if not self.in_bounds(voxel):
+            raise ValueError(f"voxel {voxel} is outside the map {self.shape}")
+        key = self.key(voxel)
+        brick = key & BRICK_MASK
+        old = self.bricks.get(brick, 0)
+        new = old | 1 << _bit(key) if occupied else old & ~(1 << _bit(key))
+        if new:
+            self.bricks[brick] = new
+        elif old:
+            del self.bricks[brick]
+        self._count += new.bit_count() - old.bit_count()
+
+    def add_points(self, points, inflate: float = 0.0) -> int:
+        """Occupy every voxel holding a point of the (N, 3) cloud; returns how many became occupied.
+
+        Points outside the bounds are ignored. inflate also occupies every
+        voxel whose center lies within that distance (world units) of an
+        occupied voxel's center.
+        """
+        points = np.asarray(points)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError(f"expected an (N, 3) array of points, got shape {points.shape}")
+        cells = np.floor((points - self.bounds.min) / self.resolution).astype(np.int64)
+        cells = np.unique(self._keys(cells[self._inside(cells)]))
+        reach = inflate / self.resolution
+        if reach < 1:
+            return self._merge(*_brick_words(cells))
+        cells = np.stack(self.voxels(cells), axis=1)
+        r = int(np.floor(reach))
+        groups, words = [], []
+        for dx in range(-r, r + 1):
+            # one slab of the ball at a time, reduced before the next to bound the memory
+            moved = [cells + (dx, dy, dz) for dy in range(-r, r + 1) for dz in range(-r, r + 1)
+                     if dx * dx + dy * dy + dz * dz <= reach * reach]
+            moved = np.concatenate(moved)
+            group, word = _brick_words(self._keys(moved[self._inside(moved)]))
+            groups.append(group)
+            words.append(word)
+        return self._merge(*_reduce_words(np.concatenate(groups), np.concatenate(words)))
+
+    def _inside(self, cells: np.ndarray) -> np.ndarray:
+        return np.all((cells >= 0) & (cells < np.array(self.shape)), axis=1)
+
+    @staticmethod
+    def _keys(cells: np.ndarray) -> np.ndarray:
+        return cells[:, 0] << _X_SHIFT | cells[:, 1] << _Y_SHIFT | cells[:, 2]
+
+    def _merge(self, groups: np.ndarray, words: np.ndarray) -> int:
+        """OR 64-bit words into the bricks (see _brick_words); returns how many voxels became occupied."""
+        bricks = self.bricks
+        added = 0
+        for group, word in zip(groups.tolist(), words.tolist()):
+            brick = group & ~7
+            old = bricks.get(brick, 0)
+            new = old | word << 64 * (group & 7)
+            if new != old:
+                bricks[brick] = new
+                added += new.bit_count() - old.bit_count()
+        self._count += added
+        return added
+
+    def occupied_voxels(self) -> np.ndarray:
+        """(n, 3) int64 array of the occupied voxels, brick by brick."""
+        out = []
+        for brick in sorted(self.bricks):
+            mask = self.bricks[brick]
+            bits = np.flatnonzero(np.unpackbits(np.frombuffer(mask.to_bytes(64, 'little'), dtype=np.uint8),
+                                                bitorder='little'))
+            # bit = z | y << 3 | x << 6 inside the brick
+            out.append(np.column_stack([(brick >> _X_SHIFT) + (bits >> 6), (brick >> _Y_SHIFT & _AXIS_MASK) + (bits >> 3 & 7),
+                                        (brick & _AXIS_MASK) + (bits & 7)]))
+        if not out:
+            return np.empty((0, 3), dtype=np.int64)
+        return np.concatenate(out).astype(np.int64)
+
+    def nbytes(self) -> int:
+        """Memory of the brick hash: the dict's table plus the key and mask objects of every brick."""
+        return (self.bricks.__sizeof__() + sum(sys.getsizeof(mask) for mask in self.bricks.values())
+                + sys.getsizeof(MAX_SIDE << _X_SHIFT) * len(self.bricks))
+
+    def dense_nbytes(self) -> int:
+        """What a dense byte-per-voxel grid of the same volume would take."""
+        nx, ny, nz = self.shape
+        return nx * ny * nz
+
+
+def _brick_words(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Group voxel keys by brick and x inside the brick: (brick key | x, uint64 word of y * 8 + z bits)."""
+    groups = keys & BRICK_MASK | keys >> _X_SHIFT & 7
+    bits = np.left_shift(np.uint64(1), (keys >> (_Y_SHIFT - 3) & 56 | keys & 7).astype(np.uint64))
+    return _reduce_words(groups, bits)
+
+
+def _reduce_words(groups: np.ndarray, words: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """OR together the words of equal groups."""
+    unique, inverse = np.unique(groups, return_inverse=True)
+    out = np.zeros(len(unique), dtype=np.uint64)
+    np.bitwise_or.at(out, inverse, words)
+    return unique, out
+
+
+def voxel_astar(vmap: VoxelMap, start: Voxel, goal: Voxel, stats: Optional[dict] = None,
+                max_expansions: Optional[int] = None) -> Optional[List[Voxel]]:
+    """Find a 26-connected path of voxels from start to goal ((x, y, z) tuples).
+
+    Returns the voxels from start to goal, or None when the goal is occupied,
+    unreachable, or not reached within max_expansions expansions. If stats is
+    given it gets 'expanded', 'visited' (voxels given a g-score) and 'cost'
+    (None when no path was found).
+    """
+    for voxel in (start, goal):
+        if not vmap.in_bounds(voxel):
+            raise ValueError(f"voxel {voxel} is outside the map {vmap.shape}")
+    nx, ny, nz = vmap.shape
+    bricks = vmap.bricks
+    moves = [((dx << _X_SHIFT) + (dy << _Y_SHIFT) + dz, step, dx, dy, dz) for dx, dy, dz, step in MOVES_3D]
+    s = vmap.key(start)
+    t = vmap.key(goal)
+    gx, gy, gz = goal
+
+    g = {s: 0.0}
+    parent = {s: s}
+    closed = set()
+    h = octile_3d(abs(start[0] - gx), abs(start[1] - gy), abs(start[2] - gz))
+    open_heap = [(h, h, 0, s)]
+    count = 1
+    expanded = 0
+    found = False
+    if vmap.is_occupied(goal):
+        open_heap.clear()
+    while open_heap:
+        _, _, _, current = heapq.heappop(open_heap)
+        if current in closed:
+            continue  # stale entry left behind by a better path
+        expanded += 1
+        if current == t:
+            found = True
+            break
+        if max_expansions is not None and expanded > max_expansions:
+            break
+        closed.add(current)
+
+        x, y, z = current >> _X_SHIFT, current >> _Y_SHIFT & _AXIS_MASK, current & _AXIS_MASK
+        current_g = g[current]
+        if 0 < x < nx - 1 and 0 < y < ny - 1 and 0 < z < nz - 1:
+            candidates = moves
+        else:
+            # on a face of the volume: keep the moves that stay inside
+            candidates = [move for move in moves
+                          if 0 <= x + move[2] < nx and 0 <= y + move[3] < ny and 0 <= z + move[4] < nz]
+        for offset, step, dx, dy, dz in candidates:
+            neighbor = current + offset
+            if neighbor in closed:
+                continue
+            brick = bricks.get(neighbor & BRICK_MASK)
+            if brick and brick >> (neighbor & 7 | neighbor >> 18 & 56 | neighbor >> 36 & 448) & 1:
+                continue  # occupied (the shifts are _bit(), inlined)
+            tentative_g = current_g + step
+            if tentative_g >= g.get(neighbor, math.inf):
+                continue  # not a better path
+            g[neighbor] = tentative_g
+            parent[neighbor] = current
+            h = octile_3d(abs(x + dx - gx), abs(y + dy - gy), abs(z + dz - gz))
+            heapq.heappush(open_heap, (tentative_g + h, h, count, neighbor))
+            count += 1
+
+    if stats is not None:
+        stats.update(expanded=expanded, visited=len(g), cost=g[t] if found else None)
+    if not found:
+        return None
+    path = [t]
+    while path[-1] != s:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return [vmap.voxel(key) for key in path]
+
+
+def voxel_path_cost(path: List[Voxel]) -> float:
+    """Cost of a path of adjacent voxels under the 26-way move model."""
+    cost = 0.0
+    for a, b in zip(path, path[1:]):
+        cost += (ORTHOGONAL_COST, DIAGONAL_COST, CORNER_COST)[sum(u != v for u, v in zip(a, b)) - 1]
+    return cost